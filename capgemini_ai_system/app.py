@@ -6,12 +6,17 @@ Point d'entrée de l'application Streamlit.
 import streamlit as st
 from pathlib import Path
 import os
+import uuid
+from concurrent.futures import wait as wait_futures
 from typing import Dict, List, Any, Optional
 
 # Import des composants de l'application
-from ui.state import initialize_session_state, add_message, set_processing, get_current_mode, clear_session
-from ui.layout import setup_page_config, render_sidebar, render_header, render_conversation, render_progress, render_results, render_context_debug, render_footer
+from ui.state import initialize_session_state, add_message, save_turn, set_processing, set_current_results, get_current_mode, clear_session
+from ui.layout import setup_page_config, render_sidebar, render_header, render_conversation, render_progress, render_results, render_context_debug, render_extraction_cache_debug, render_memory_debug, render_footer
 from core.orchestrator import Orchestrator
+from core.cancellation import cancel_request
+from config.settings import CANCELLATION_POLL_SECONDS
+from core.thread_reaper import start_thread_reaper
 from utils.text_extraction import extract_text_from_multiple_files
 
 def main():
@@ -19,6 +24,9 @@ def main():
     # Initialisation de l'état de session
     initialize_session_state()
     
+    # Suppression en arrière-plan des threads expirés (une seule fois par processus)
+    start_thread_reaper()
+    
     # Configuration de la page
     setup_page_config()
     
@@ -35,8 +43,8 @@ def main():
         # Affichage de la conversation
         render_conversation()
         
-        # Affichage de la barre de progression
-        render_progress()
+        # Affichage de la barre de progression (et du bouton d'annulation pendant une requête)
+        refresh_progress = render_progress()
         
         # Affichage des résultats actuels
         render_results()
@@ -44,6 +52,12 @@ def main():
         # Affichage des informations de débogage du contexte
         render_context_debug()
         
+        # Affichage des statistiques du cache d'extraction
+        render_extraction_cache_debug()
+        
+        # Affichage de la mémoire occupée par la session
+        render_memory_debug()
+        
         # Checkbox pour activer l'OCR
         ocr_enabled = st.checkbox("Activer l'OCR pour les PDF scannés", key="ocr_enabled")
         
@@ -56,50 +70,72 @@ def main():
         
         # Traitement de l'entrée utilisateur
         if user_input:
-            user_text = user_input["text"]
-            user_files = user_input["files"]
-            
-            # Afficher le message utilisateur immédiatement
-            add_message("user", user_text)
-            st.rerun()  # Forcer le rafraîchissement pour afficher le message utilisateur
-            
-            # Démarrer le traitement
+            # Afficher le message utilisateur immédiatement ; la requête est traitée à l'exécution
+            # suivante, qui affiche la progression et le bouton d'annulation
+            add_message("user", user_input["text"])
+            st.session_state.pending_request = {
+                "id": uuid.uuid4().hex,
+                "text": user_input["text"],
+                "files": user_input["files"],
+                "ocr_enabled": ocr_enabled
+            }
             set_processing(True, "Initialisation du traitement...", 0.1)
-            
+            st.rerun()
+        
+        pending_request = st.session_state.pending_request
+        if pending_request:
             try:
-                # Initialisation de l'orchestrateur
-                orchestrator = Orchestrator()
-                
-                # Déterminer le mode et les paramètres appropriés
-                mode, mode_params = get_current_mode()
-                
-                # Construire les arguments pour l'orchestrateur
-                orchestration_args = {
-                    "query": user_text,
-                    "mode": mode,
-                    "files": user_files,
-                    "ocr_enabled": ocr_enabled
-                }
-                
-                # Ajouter les paramètres spécifiques au mode
-                if mode == "sequence":
-                    orchestration_args["agent_sequence"] = mode_params
-                elif mode == "single":
-                    orchestration_args["single_agent"] = mode_params
+                future = pending_request.get("future")
+                if future is None:
+                    # Initialisation de l'orchestrateur
+                    orchestrator = Orchestrator()
+                    
+                    # Déterminer le mode et les paramètres appropriés
+                    mode, mode_params = get_current_mode()
+                    
+                    # Construire les arguments pour l'orchestrateur
+                    orchestration_args = {
+                        "query": pending_request["text"],
+                        "mode": mode,
+                        "files": pending_request["files"],
+                        "ocr_enabled": pending_request["ocr_enabled"],
+                        "request_id": pending_request["id"]
+                    }
+                    
+                    # Ajouter les paramètres spécifiques au mode
+                    if mode == "sequence":
+                        orchestration_args["agent_sequence"] = mode_params
+                        orchestration_args["handoff_policy"] = st.session_state.get("handoff_policy")
+                    elif mode == "single":
+                        orchestration_args["single_agent"] = mode_params
+                    
+                    # Exécuter l'orchestration en arrière-plan : une interaction avec la page relance
+                    # le script, dont l'exécution suivante reprend l'attente de la même requête
+                    future = orchestrator.submit(**orchestration_args)
+                    pending_request["future"] = future
                 
-                # Exécuter l'orchestration
-                result = orchestrator.orchestrate(**orchestration_args)
+                while not future.done():
+                    # Annulation demandée par le bouton (voir request_cancellation)
+                    if pending_request.get("cancel_requested") and not pending_request.get("cancel_sent"):
+                        pending_request["cancel_sent"] = cancel_request(pending_request["id"])
+                    if refresh_progress is not None:
+                        refresh_progress()
+                    wait_futures([future], timeout=CANCELLATION_POLL_SECONDS)
+                result = future.result()
                 
                 # Fin du traitement
+                st.session_state.pending_request = None
                 set_processing(False)
                 
                 # Gestion des erreurs
-                if "error" in result:
+                if result.get("cancelled"):
+                    add_message("assistant", result["error"])
+                elif "error" in result:
                     st.error(result["error"])
                     add_message("assistant", f"Erreur: {result['error']}")
                 else:
                     # Enregistrer les résultats
-                    st.session_state.current_results = result
+                    set_current_results(result)
                     
                     # Ajouter la réponse à l'historique de conversation
                     if "combined" in result:
@@ -118,18 +154,23 @@ def main():
                             message_attrs["selection_method"] = result["selection_method"]
                         if "router_response" in result:
                             message_attrs["router_response"] = result["router_response"]
+                        if "metrics" in result:
+                            message_attrs["metrics"] = result["metrics"]
                         
                         add_message("assistant", result["combined"], **message_attrs)
                 
-                # Rafraîchir l'interface
-                st.rerun()
-                
             except Exception as e:
                 # Gestion des exceptions
+                st.session_state.pending_request = None
                 set_processing(False)
                 st.error(f"Erreur lors du traitement: {str(e)}")
                 add_message("assistant", f"Erreur lors du traitement: {str(e)}")
-                st.rerun()
+            
+            # Enregistrer le tour (messages, threads et historiques des agents) en une seule écriture
+            save_turn()
+            
+            # Rafraîchir l'interface
+            st.rerun()
     
     # Affichage du pied de page
     render_footer()
@@ -87,4 +87,57 @@ AGENT_CATEGORIES = {
     "comparaison": ["contracts_compare", "market_comparison"],
     "négociation": ["negotiation"],
     "conseil": ["manager"]
-}
\ No newline at end of file
+}
+
+# Politiques de contexte : quelle partie des documents chaque agent reçoit
+#   "question"     : la requête seule, sans documents ni analyse préliminaire
+#   "passages"     : plan des documents et passages pertinents (recherche BM25)
+#   "key_terms"    : fiche des termes clés extraits et passages commerciaux (prix, durée, préavis...)
+#   "clause_diff"  : seules les clauses qui diffèrent entre les documents (diff local)
+#   "market_stats" : passages pertinents et statistiques de marché de tous les contrats déjà traités
+#   "full"         : documents complets (analysés par extraits s'ils sont trop longs)
+AGENT_CONTEXT_POLICIES = {
+    "manager": "question",
+    "quality": "full",
+    "drafter": "passages",
+    "contracts_compare": "clause_diff",
+    "market_comparison": "market_stats",
+    "negotiation": "key_terms"
+}
+
+# Politiques de transmission en mode séquence : ce que chaque agent reçoit de la réponse de l'agent précédent
+#   "full"    : la réponse complète
+#   "extract" : un extrait structuré (titres, listes, tableaux, lignes chiffrées)
+#   "summary" : un résumé plafonné (titres et première phrase de chaque paragraphe)
+#   "needs"   : les seuls paragraphes qui portent sur les besoins déclarés de l'agent (AGENT_HANDOFF_NEEDS)
+AGENT_HANDOFF_POLICIES = {
+    "manager": "summary",
+    "quality": "extract",
+    "drafter": "needs",
+    "contracts_compare": "extract",
+    "market_comparison": "needs",
+    "negotiation": "needs"
+}
+
+# Besoins déclarés par chaque agent (termes recherchés dans la réponse de l'agent précédent)
+AGENT_HANDOFF_NEEDS = {
+    "drafter": ["clause", "article", "recommand", "modifi", "ajout", "risque", "manqu", "lacune"],
+    "market_comparison": ["prix", "tarif", "coût", "montant", "durée", "volume", "remise", "marché"],
+    "negotiation": ["prix", "montant", "durée", "résili", "préavis", "pénal", "risque", "levier", "écart", "recommand"]
+}
+
+# Requête utilisée pour retrouver les termes commerciaux (politique "key_terms")
+KEY_TERMS_QUERY = (
+    "prix montant paiement facturation tarif révision durée reconduction résiliation "
+    "préavis pénalité garantie responsabilité plafond indemnité volume remise"
+)
+
+# Agents dont l'analyse d'un contrat est conservée et mise à jour (par les seules différences)
+# lorsqu'une version quasi identique du contrat est de nouveau soumise avec la même demande
+REUSABLE_ANALYSIS_AGENTS = ["quality", "contracts_compare"]
+
+# Clé sous laquelle l'analyse préliminaire de qualité est conservée pour chaque lot de documents et requête
+PREANALYSIS_CACHE_KEY = "quality_preanalysis"
+
+# Agent chargé de résumer en arrière-plan les échanges les plus anciens de l'historique
+HISTORY_SUMMARY_AGENT = "manager"
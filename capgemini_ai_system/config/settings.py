@@ -14,6 +14,9 @@ AZURE_AI_PROJECT_CONNECTION_STRING = os.environ.get("AZURE_AI_PROJECT_CONNECTION
 AZURE_AI_AGENT_PROJECT_CONNECTION_STRING = os.environ.get("AZURE_AI_AGENT_PROJECT_CONNECTION_STRING")
 AZURE_AI_AGENT_MODEL_DEPLOYMENT_NAME = os.environ.get("AZURE_AI_AGENT_MODEL_DEPLOYMENT_NAME")
 
+# Utiliser le client simulé (integrations/mock_azure_client.py) au lieu d'Azure AI Foundry
+USE_MOCK = os.environ.get("USE_MOCK", "false").lower() == "true"
+
 # Configuration de l'application
 APP_TITLE = "Capgemini AI Multi-Agent System"
 APP_ICON = "☘️"
@@ -27,5 +30,91 @@ AGENT_CONFIG = {
 # Durée maximale d'attente pour les requêtes d'agents (en secondes)
 AGENT_TIMEOUT = 120
 
+# Exécution des workflows (voir core/workflow.py)
+WORKFLOW_AGENT_MAX_CONCURRENCY = 4  # Nombre d'agents sélectionnés exécutés simultanément
+WORKFLOW_AGENT_TIMEOUT = 10 * 60  # Délai maximal d'une étape d'agent (analyses par extraits comprises), en secondes
+
+# Durée pendant laquelle un thread d'agent est supposé exister sans vérification (en secondes).
+# Un thread expiré entre-temps est remplacé lorsque l'exécution échoue.
+THREAD_VALIDATION_TTL_SECONDS = int(os.environ.get("THREAD_VALIDATION_TTL_SECONDS", 15 * 60))
+
 # Configuration de l'OCR
-OCR_ENABLED_BY_DEFAULT = False
\ No newline at end of file
+OCR_ENABLED_BY_DEFAULT = False
+
+# Configuration du cache d'extraction de texte
+EXTRACTION_CACHE_DIR = os.environ.get(
+    "EXTRACTION_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache")
+)
+EXTRACTION_CACHE_MAX_BYTES = int(os.environ.get("EXTRACTION_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+# Configuration du découpage des documents longs (analyse map-reduce)
+DOCUMENT_MAX_CHARS = 10000  # Au-delà, le document est analysé par extraits
+CHUNK_MAX_CHARS = 8000  # Taille maximale d'un extrait envoyé à un agent
+MAP_REDUCE_MAX_CONCURRENCY = 4  # Nombre d'extraits analysés simultanément
+
+# Configuration de la recherche de passages (BM25) pour réduire la taille des prompts
+RETRIEVAL_TOP_K = 6  # Nombre de passages pertinents inclus dans le prompt
+PASSAGE_MAX_CHARS = 1500  # Taille maximale d'un passage indexé
+
+# Taille maximale du contexte documentaire construit pour un agent
+AGENT_CONTEXT_MAX_CHARS = 12000
+
+# Transmission de la réponse d'un agent au suivant (mode séquence, voir core/handoff.py)
+HANDOFF_DEFAULT_POLICY = "summary"  # "full", "extract", "summary" ou "needs" pour les agents non configurés
+HANDOFF_MAX_TOKENS = 400  # Taille maximale de la partie transmise (sauf politique "full")
+
+# Analyse préliminaire de qualité : ignorée pour les requêtes plus courtes (relances du type "et la durée ?")
+PREANALYSIS_MIN_QUERY_CHARS = 20
+
+# Configuration de la comparaison de plusieurs contrats
+COMPARISON_FANOUT_MIN_DOCUMENTS = 3  # À partir de ce nombre, une comparaison par paire de documents
+COMPARISON_MODE = "baseline"  # "baseline" (chaque document contre le premier) ou "pairwise" (toutes les paires)
+COMPARISON_MAX_CONCURRENCY = 4  # Nombre de comparaisons exécutées simultanément
+
+# Configuration de l'entrepôt colonnaire des termes clés (comparaison de marché)
+TERM_STORE_DIR = os.environ.get("TERM_STORE_DIR", os.path.join(EXTRACTION_CACHE_DIR, "term_store"))
+TERM_STORE_MAX_SEGMENTS = 32  # Au-delà, les segments sont fusionnés en un seul
+
+# Configuration du référentiel de contrats (persistant entre les sessions)
+CONTRACT_REPOSITORY_PATH = os.environ.get(
+    "CONTRACT_REPOSITORY_PATH", os.path.join(EXTRACTION_CACHE_DIR, "contracts.sqlite3")
+)
+CONTRACT_REPOSITORY_MMAP_BYTES = 256 * 1024 * 1024  # Taille de la projection mémoire de la base
+
+# Détection des contrats quasi identiques pour réutiliser les analyses précédentes
+NEAR_DUPLICATE_THRESHOLD = 0.95  # Similarité minimale (Jaccard estimé par MinHash)
+
+# Compression des textes volumineux de la session (documents extraits, réponses des agents)
+TEXT_COMPRESSION_MIN_CHARS = 4096  # Taille à partir de laquelle un texte est compressé
+SESSION_TEXT_MEMORY_MAX_BYTES = 4 * 1024 * 1024  # Au-delà, les textes les plus anciens sont déchargés sur disque
+TEXT_SPILL_DIR = os.path.join(EXTRACTION_CACHE_DIR, "spill")
+
+# Compactage de l'historique des conversations (mode contexte)
+HISTORY_MAX_MESSAGES = 50  # Taille du tampon circulaire de l'historique de chaque agent
+HISTORY_RECENT_MESSAGES = 4  # Derniers messages repris tels quels
+HISTORY_MESSAGE_MAX_TOKENS = 1000  # Taille maximale d'un message repris dans le contexte
+HISTORY_SUMMARY_MAX_TOKENS = int(os.environ.get("HISTORY_SUMMARY_MAX_TOKENS", 500))  # Taille maximale du résumé des échanges plus anciens
+HISTORY_SUMMARY_MIN_BATCH = 8  # Nombre minimal d'anciens messages non résumés pour lancer un résumé (une exécution d'agent)
+
+# Stockage durable des conversations (messages, threads et historiques des agents)
+CONVERSATION_STORE_PATH = os.environ.get(
+    "CONVERSATION_STORE_PATH", os.path.join(EXTRACTION_CACHE_DIR, "conversations.sqlite3")
+)
+CONVERSATION_PAGE_SIZE = 20  # Nombre de messages affichés (puis chargés à chaque page précédente)
+
+# Suppression en arrière-plan des threads distants (voir core/thread_reaper.py)
+THREAD_REGISTRY_PATH = os.environ.get(
+    "THREAD_REGISTRY_PATH", os.path.join(EXTRACTION_CACHE_DIR, "threads.sqlite3")
+)
+THREAD_RETENTION_SECONDS = int(os.environ.get("THREAD_RETENTION_SECONDS", 60 * 60))  # Threads d'une seule exécution (router, analyses)
+PERSISTENT_THREAD_RETENTION_SECONDS = int(
+    os.environ.get("PERSISTENT_THREAD_RETENTION_SECONDS", 7 * 24 * 60 * 60)
+)  # Threads persistants des agents, depuis leur dernière utilisation
+THREAD_REAPER_INTERVAL_SECONDS = 10 * 60  # Intervalle entre deux passes de suppression
+THREAD_REAPER_BATCH_SIZE = 20  # Nombre de threads supprimés simultanément
+THREAD_REAPER_MAX_DELETES_PER_SECOND = 10  # Débit maximal de suppression, pour ménager le quota du service
+
+# Annulation des requêtes (voir core/cancellation.py)
+CANCELLATION_POLL_SECONDS = 0.5  # Intervalle de rafraîchissement de l'interface pendant une requête
+CANCELLATION_DRAIN_TIMEOUT_SECONDS = 10  # Délai d'annulation des exécutions en cours à l'arrêt du processus
@@ -6,8 +6,11 @@ import re
 import asyncio
 from typing import List, Dict, Any, Tuple, Optional
 
-from integrations.azure_client import AzureAIFoundryClient
+from integrations.azure_client import AzureAIFoundryClient, get_agent_client
 from config.agents import AGENT_IDS, AGENT_METADATA, AGENT_KEYWORDS, AGENT_PATTERNS
+from config.settings import MAP_REDUCE_MAX_CONCURRENCY, AGENT_CONTEXT_MAX_CHARS
+from core.chunking import truncate_at_clause_boundary
+from core.handoff import get_handoff_policy, build_handoff, build_handoff_prompt
 
 class AgentManager:
     """
@@ -27,24 +30,27 @@ class AgentManager:
             AzureAIFoundryClient: Une instance du client
         """
         if self.client is None:
-            self.client = AzureAIFoundryClient()
+            self.client = get_agent_client()
         return self.client
     
-    async def execute_agent(self, agent_key: str, query: str) -> str:
+    async def execute_agent(self, agent_key: str, query: str, thread_id: Optional[str] = None) -> str:
         """
         Exécute un agent spécifique.
         
         Args:
             agent_key: La clé de l'agent à exécuter
             query: La requête à soumettre à l'agent
+            thread_id: Thread persistant de l'agent (voir ThreadManager.get_thread_for_agent) ;
+                les échanges précédents y sont déjà, seul le nouveau message est envoyé
             
         Returns:
             str: La réponse de l'agent
         """
         client = await self._get_client()
         
-        # Créer un nouveau thread pour l'agent
-        thread_id = await client.create_thread()
+        # Sans thread persistant, créer un nouveau thread pour l'agent
+        if thread_id is None:
+            thread_id = await client.create_thread()
         
         # Ajouter le message au thread
         await client.add_message(thread_id, query)
@@ -54,6 +60,98 @@ class AgentManager:
         
         return response
     
+    async def execute_agent_map_reduce(self, agent_key: str, query: str, chunks: List[Dict[str, str]]) -> str:
+        """
+        Exécute un agent sur chaque extrait des documents en parallèle, puis fusionne les analyses.
+        
+        Args:
+            agent_key: La clé de l'agent à exécuter
+            query: La requête à soumettre à l'agent, sans le contenu des documents
+            chunks: Les extraits des documents (nom, en-tête, contenu)
+            
+        Returns:
+            str: La réponse fusionnée de l'agent
+        """
+        semaphore = asyncio.Semaphore(MAP_REDUCE_MAX_CONCURRENCY)
+        
+        async def analyze_chunk(index: int, chunk: Dict[str, str]) -> str:
+            async with semaphore:
+                prompt = (
+                    f"{query}\n\n"
+                    f"--- EXTRAIT {index + 1}/{len(chunks)} du document {chunk['name']} "
+                    f"(à partir de: {chunk['heading']}) ---\n{chunk['content']}"
+                )
+                return await self.execute_agent(agent_key, prompt)
+        
+        # Étape map : analyse de chaque extrait
+        partial_results = await asyncio.gather(
+            *(analyze_chunk(i, chunk) for i, chunk in enumerate(chunks)),
+            return_exceptions=True
+        )
+        
+        partial_analyses = []
+        for chunk, result in zip(chunks, partial_results):
+            if isinstance(result, Exception):
+                result = f"Erreur d'exécution: {str(result)}"
+            partial_analyses.append(f"--- ANALYSE: {chunk['name']} (à partir de: {chunk['heading']}) ---\n{result}")
+        
+        if len(chunks) == 1 and not isinstance(partial_results[0], Exception):
+            return partial_results[0]
+        
+        # Étape reduce : fusion des analyses partielles
+        return await self._reduce_analyses(agent_key, query, partial_analyses, semaphore)
+    
+    async def _reduce_analyses(
+        self, agent_key: str, query: str, analyses: List[str], semaphore: asyncio.Semaphore
+    ) -> str:
+        """
+        Fusionne des analyses partielles avec un prompt limité à AGENT_CONTEXT_MAX_CHARS :
+        si elles dépassent cette taille, elles sont fusionnées par lots, puis les synthèses
+        intermédiaires le sont à leur tour.
+        
+        Args:
+            agent_key: La clé de l'agent à exécuter
+            query: La requête à soumettre à l'agent, sans le contenu des documents
+            analyses: Les analyses partielles
+            semaphore: Limite des exécutions simultanées
+            
+        Returns:
+            str: La réponse fusionnée de l'agent
+        """
+        header = (
+            f"{query}\n\n"
+            "Les documents attachés étant longs, ils ont été analysés par extraits. "
+            "Fusionnez les analyses partielles suivantes en une réponse unique, complète et cohérente, "
+            "sans répétitions:\n\n"
+        )
+        budget = max(AGENT_CONTEXT_MAX_CHARS - len(header), AGENT_CONTEXT_MAX_CHARS // 4)
+        # Chaque lot contient au moins deux analyses : le nombre d'analyses diminue à chaque niveau
+        analyses = [truncate_at_clause_boundary(analysis, budget // 2 - 2) for analysis in analyses]
+        
+        while True:
+            batches, size = [[]], 0
+            for analysis in analyses:
+                if batches[-1] and size + len(analysis) + 2 > budget:
+                    batches.append([])
+                    size = 0
+                batches[-1].append(analysis)
+                size += len(analysis) + 2
+            
+            if len(batches) == 1:
+                return await self.execute_agent(agent_key, header + "\n\n".join(batches[0]))
+            
+            async def reduce_batch(batch: List[str]) -> str:
+                async with semaphore:
+                    return await self.execute_agent(agent_key, header + "\n\n".join(batch))
+            
+            merged = await asyncio.gather(*(reduce_batch(batch) for batch in batches))
+            analyses = [
+                truncate_at_clause_boundary(
+                    f"--- SYNTHÈSE INTERMÉDIAIRE {i + 1}/{len(merged)} ---\n{result}", budget // 2 - 2
+                )
+                for i, result in enumerate(merged)
+            ]
+    
     def _heuristic_agent_selection(self, query: str) -> Tuple[List[str], str]:
         """
         Utilise des heuristiques pour déterminer les agents appropriés.
@@ -90,20 +188,26 @@ class AgentManager:
         
         return selected_agents, "Basé sur les occurrences de mots-clés"
     
-    async def determine_agents(self, query: str) -> Tuple[List[str], str, str]:
+    async def determine_agents(self, query: str, documents_descriptor: str = "") -> Tuple[List[str], str, str]:
         """
         Détermine les agents les plus appropriés pour une requête.
         
+        Le routage se fait sur la requête seule, accompagnée d'une description compacte
+        des documents attachés (noms, tailles), jamais sur leur contenu.
+        
         Args:
-            query: La requête utilisateur
+            query: La requête utilisateur, sans le contenu des documents
+            documents_descriptor: Description compacte des documents attachés
             
         Returns:
             Tuple[List[str], str, str]: Liste des agents, méthode de sélection, réponse brute du router
         """
+        routing_input = f"{query}\n\n{documents_descriptor}" if documents_descriptor else query
+        
         # D'abord, essayer avec le Router Agent
         try:
             client = await self._get_client()
-            selected_agents, raw_response = await client.router_analysis(query)
+            selected_agents, raw_response = await client.router_analysis(routing_input)
             
             self.last_router_response = raw_response
             
@@ -116,7 +220,7 @@ class AgentManager:
         except Exception as e:
             print(f"Erreur lors de l'utilisation du Router Agent: {str(e)}")
         
-        # Fallback sur la sélection heuristique
+        # Fallback sur la sélection heuristique (mots-clés de la requête seule, pas des documents)
         heuristic_agents, reason = self._heuristic_agent_selection(query)
         return heuristic_agents, f"Heuristique ({reason})", "Erreur du Router Agent - Fallback heuristique"
     
@@ -138,28 +242,40 @@ class AgentManager:
             print(f"Erreur lors de l'analyse préliminaire de qualité: {str(e)}")
             return None
     
-    async def execute_agents_in_sequence(self, query: str, agent_sequence: List[str]) -> Dict[str, str]:
+    def prepare_sequence_hop(
+        self,
+        query: str,
+        agent: str,
+        previous_agent: Optional[str] = None,
+        previous_response: Optional[str] = None,
+        handoff_policy: Optional[str] = None
+    ) -> Tuple[str, Optional[str], int]:
         """
-        Exécute une séquence d'agents, chacun prenant en compte la réponse du précédent.
+        Construit le prompt d'une étape de séquence : la requête, précédée de la partie
+        de la réponse précédente prévue par la politique de transmission de l'agent.
         
         Args:
             query: La requête initiale
-            agent_sequence: La séquence d'agents à exécuter
+            agent: L'agent de l'étape
+            previous_agent: L'agent de l'étape précédente (None pour la première étape)
+            previous_response: La réponse de l'agent précédent
+            handoff_policy: Politique de transmission imposée (celle de l'agent, voir AGENT_HANDOFF_POLICIES, si None)
             
         Returns:
-            Dict[str, str]: Réponses de chaque agent
+            Tuple[str, Optional[str], int]: Le prompt, la politique appliquée (None pour la première étape)
+            et la taille qu'aurait le prompt avec la réponse précédente complète
         """
-        responses = {}
-        current_context = query
-        
-        for agent in agent_sequence:
-            response = await self.execute_agent(agent, current_context)
-            responses[agent] = response
-            
-            # Mettre à jour le contexte pour l'agent suivant
-            current_context = f"Tenant compte de cette réponse: {response}\n\nQuestion initiale: {query}"
+        if previous_agent is None:
+            return query, None, len(query)
         
-        return responses
+        previous_name = AGENT_METADATA.get(previous_agent, {}).get('name')
+        full_prompt = build_handoff_prompt(query, previous_response, "full", previous_name)
+        policy = handoff_policy or get_handoff_policy(agent)
+        prompt = build_handoff_prompt(query, build_handoff(previous_response, policy, agent), policy, previous_name)
+        if len(prompt) >= len(full_prompt):
+            # Réponse courte : elle est transmise telle quelle
+            return full_prompt, "full", len(full_prompt)
+        return prompt, policy, len(full_prompt)
     
     async def execute_agents_in_parallel(self, query: str, agents: List[str]) -> Dict[str, str]:
         """
@@ -0,0 +1,183 @@
+"""
+Annulation des requêtes en cours : tâches asyncio de l'orchestration et exécutions
+distantes des agents, qui cessent ainsi de consommer le quota du service.
+"""
+
+import time
+import atexit
+import asyncio
+import threading
+import contextvars
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional, Set, Tuple
+
+from config.settings import CANCELLATION_DRAIN_TIMEOUT_SECONDS
+
+# Requête à laquelle appartiennent les exécutions lancées par la tâche courante
+# (copiée dans les sous-tâches asyncio, voir Orchestrator.orchestrate)
+current_request_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_request_id", default=None)
+
+class CancellationRegistry:
+    """
+    Recense, pour chaque requête, la tâche asyncio qui la traite et les exécutions distantes en cours.
+    Annuler une requête annule sa tâche ; chaque exécution interrompue est alors annulée
+    côté service (voir active_run). Partagé par les sessions du processus.
+    """
+
+    def __init__(self):
+        """Initialise le registre."""
+        self._lock = threading.Lock()
+        self._tasks: Dict[str, Tuple[asyncio.AbstractEventLoop, asyncio.Task]] = {}
+        self._runs: Dict[Tuple[str, str], Tuple[Optional[str], Any]] = {}
+        self._cancelled: Set[str] = set()
+
+    def attach(self, request_id: str, task: asyncio.Task) -> None:
+        """
+        Associe à une requête la tâche qui la traite (dans la boucle d'événements courante).
+
+        Args:
+            request_id: L'identifiant de la requête
+            task: La tâche
+        """
+        with self._lock:
+            self._tasks[request_id] = (asyncio.get_running_loop(), task)
+
+    def detach(self, request_id: str) -> None:
+        """
+        Retire une requête terminée.
+
+        Args:
+            request_id: L'identifiant de la requête
+        """
+        with self._lock:
+            self._tasks.pop(request_id, None)
+            self._cancelled.discard(request_id)
+
+    def cancel(self, request_id: str) -> bool:
+        """
+        Annule une requête, depuis n'importe quel thread. Une requête qui n'est pas (ou plus)
+        en cours n'est pas retenue : l'appelant peut réessayer tant qu'elle n'a pas démarré.
+
+        Args:
+            request_id: L'identifiant de la requête
+
+        Returns:
+            bool: True si la requête était en cours
+        """
+        with self._lock:
+            entry = self._tasks.get(request_id)
+            if entry is None:
+                return False
+            self._cancelled.add(request_id)
+        loop, task = entry
+        loop.call_soon_threadsafe(task.cancel)
+        return True
+
+    def is_cancelled(self, request_id: str) -> bool:
+        """
+        Indique si l'annulation d'une requête a été demandée.
+
+        Args:
+            request_id: L'identifiant de la requête
+
+        Returns:
+            bool: True si la requête a été annulée
+        """
+        with self._lock:
+            return request_id in self._cancelled
+
+    def active_runs(self) -> int:
+        """
+        Compte les exécutions distantes en cours.
+
+        Returns:
+            int: Le nombre d'exécutions
+        """
+        with self._lock:
+            return len(self._runs)
+
+    @asynccontextmanager
+    async def active_run(self, client: Any, thread_id: str, run_id: str):
+        """
+        Enregistre une exécution distante pendant son suivi ; si la tâche qui la suit est
+        annulée, l'exécution est annulée côté service.
+
+        Args:
+            client: Le client des agents (doit fournir cancel_run et cancel_run_sync)
+            thread_id: L'identifiant du thread
+            run_id: L'identifiant de l'exécution
+        """
+        key = (thread_id, run_id)
+        with self._lock:
+            self._runs[key] = (current_request_id.get(), client)
+        try:
+            yield
+        except asyncio.CancelledError:
+            try:
+                await client.cancel_run(thread_id, run_id)
+            except Exception as e:
+                print(f"Erreur lors de l'annulation de l'exécution {run_id}: {str(e)}")
+            raise
+        finally:
+            with self._lock:
+                self._runs.pop(key, None)
+
+    def drain(self, timeout: float = CANCELLATION_DRAIN_TIMEOUT_SECONDS) -> int:
+        """
+        Annule toutes les requêtes en cours, par exemple à l'arrêt du processus, et attend
+        que leurs exécutions distantes soient annulées. Celles qui restent au-delà du délai
+        sont annulées directement.
+
+        Args:
+            timeout: Délai d'attente en secondes
+
+        Returns:
+            int: Le nombre d'exécutions annulées directement
+        """
+        with self._lock:
+            request_ids = list(self._tasks)
+        for request_id in request_ids:
+            self.cancel(request_id)
+
+        deadline = time.monotonic() + timeout
+        while self.active_runs() and time.monotonic() < deadline:
+            time.sleep(0.1)
+
+        with self._lock:
+            remaining = list(self._runs.items())
+        for (thread_id, run_id), (_, client) in remaining:
+            try:
+                client.cancel_run_sync(thread_id, run_id)
+            except Exception as e:
+                print(f"Erreur lors de l'annulation de l'exécution {run_id}: {str(e)}")
+        return len(remaining)
+
+_cancellation_registry = None
+_cancellation_registry_lock = threading.Lock()
+
+def get_cancellation_registry() -> CancellationRegistry:
+    """
+    Obtient le registre des annulations partagé par le processus.
+    Les requêtes en cours sont annulées à l'arrêt du processus.
+
+    Returns:
+        CancellationRegistry: L'instance du registre
+    """
+    global _cancellation_registry
+    with _cancellation_registry_lock:
+        if _cancellation_registry is None:
+            _cancellation_registry = CancellationRegistry()
+            atexit.register(_cancellation_registry.drain)
+        return _cancellation_registry
+
+def cancel_request(request_id: str) -> bool:
+    """
+    Annule une requête en cours (tâches asyncio et exécutions distantes des agents).
+
+    Args:
+        request_id: L'identifiant de la requête
+
+    Returns:
+        bool: True si la requête était en cours
+    """
+    return get_cancellation_registry().cancel(request_id)
@@ -0,0 +1,206 @@
+"""
+Découpage des contrats selon leurs articles et clauses.
+"""
+
+import re
+from typing import List, Dict, Tuple
+
+from config.settings import CHUNK_MAX_CHARS
+
+# En-têtes d'articles et de clauses : "Article 3", "ARTICLE IV", "Clause 2.1", "2.3 Durée".
+# Une numérotation simple ("1. Objet") n'en est pas un : elle désigne aussi les éléments des listes
+CLAUSE_HEADING_PATTERN = re.compile(
+    r'^[ \t]*(?:'
+    r'(?i:article|clause|section|chapitre|titre|annexe)[ \t]+(?:\d+(?:\.\d+)*(?i:bis|ter)?|[IVXLC]+|(?i:premier|1er))\b'
+    r'|\d+(?:\.\d+)+[.)]?[ \t]+[A-ZÀ-Ý]'
+    r')',
+    re.MULTILINE
+)
+
+# Numérotation en tête d'un en-tête : "Article 3 -", "ARTICLE IV :", "2.1", "3."
+HEADING_NUMBER_PATTERN = re.compile(
+    r'^(?:(?:article|clause|section|chapitre|titre|annexe)\s+(?:\d+(?:\.\d+)*(?:bis|ter)?|[ivxlc]+|premier|1er)\b|\d+(?:\.\d+)*[.)]?)'
+    r'[\s\-–:.)]*',
+    re.IGNORECASE
+)
+
+TRUNCATION_MARKER = "...[CONTENU TRONQUÉ]..."
+
+def find_clause_spans(text: str) -> List[Tuple[int, int, str]]:
+    """
+    Repère les articles et clauses d'un document.
+
+    Args:
+        text: Le texte du document
+
+    Returns:
+        List[Tuple[int, int, str]]: Début, fin et en-tête de chaque clause
+    """
+    starts = [match.start() for match in CLAUSE_HEADING_PATTERN.finditer(text)]
+
+    # Le texte précédant le premier article (parties, préambule) forme sa propre clause
+    if not starts or starts[0] > 0:
+        starts.insert(0, 0)
+
+    spans = []
+    for i, start in enumerate(starts):
+        end = starts[i + 1] if i + 1 < len(starts) else len(text)
+        if not text[start:end].strip():
+            continue
+
+        newline = text.find("\n", start, end)
+        heading = text[start:newline if newline != -1 else end].strip()
+        if i == 0 and not CLAUSE_HEADING_PATTERN.match(text, start):
+            heading = "Préambule"
+        spans.append((start, end, heading[:120]))
+
+    return spans
+
+def normalize_heading(heading: str) -> str:
+    """
+    Normalise un en-tête de clause pour l'aligner entre documents ("Article 4 - Durée" -> "durée").
+
+    Args:
+        heading: L'en-tête de la clause
+
+    Returns:
+        str: Le titre de la clause sans numérotation, en minuscules
+    """
+    title = HEADING_NUMBER_PATTERN.sub("", heading.strip(), count=1)
+    title = " ".join(title.lower().split())
+    # Sans titre ("Article 4"), la numérotation reste le seul repère
+    return title or " ".join(heading.lower().split())
+
+def _oversized_spans(text: str, start: int, end: int, max_chars: int) -> List[Tuple[int, int]]:
+    """
+    Découpe une clause trop longue aux limites de paragraphe, puis de ligne.
+
+    Args:
+        text: Le texte du document
+        start: Début de la clause
+        end: Fin de la clause (exclue)
+        max_chars: Taille maximale d'un morceau
+
+    Returns:
+        List[Tuple[int, int]]: Début et fin de chaque morceau de la clause
+    """
+    spans = []
+    while end - start > max_chars:
+        cut = text.rfind("\n\n", start, start + max_chars)
+        if cut <= start:
+            cut = text.rfind("\n", start, start + max_chars)
+        if cut <= start:
+            cut = start + max_chars
+        spans.append((start, cut))
+        start = cut
+    if text[start:end].strip():
+        spans.append((start, end))
+    return spans
+
+def _split_oversized(text: str, max_chars: int) -> List[str]:
+    """
+    Découpe une clause trop longue aux limites de paragraphe, puis de ligne.
+
+    Args:
+        text: Le texte de la clause
+        max_chars: Taille maximale d'un morceau
+
+    Returns:
+        List[str]: Les morceaux de la clause
+    """
+    return [text[start:end] for start, end in _oversized_spans(text, 0, len(text), max_chars)]
+
+def split_clause_spans(text: str, max_chars: int = CHUNK_MAX_CHARS) -> List[Tuple[int, int, str]]:
+    """
+    Repère les clauses individuelles d'un document, les clauses trop longues étant scindées.
+
+    Args:
+        text: Le texte du document
+        max_chars: Taille maximale d'une clause
+
+    Returns:
+        List[Tuple[int, int, str]]: Début, fin et en-tête de chaque clause
+    """
+    return [
+        (piece_start, piece_end, heading)
+        for start, end, heading in find_clause_spans(text)
+        for piece_start, piece_end in _oversized_spans(text, start, end, max_chars)
+    ]
+
+def split_clauses(text: str, max_chars: int = CHUNK_MAX_CHARS) -> List[Dict[str, str]]:
+    """
+    Découpe un document en clauses individuelles, les clauses trop longues étant scindées.
+
+    Args:
+        text: Le texte du document
+        max_chars: Taille maximale d'une clause
+
+    Returns:
+        List[Dict[str, str]]: Clauses avec leur en-tête et leur contenu
+    """
+    return [
+        {'heading': heading, 'content': text[start:end]}
+        for start, end, heading in split_clause_spans(text, max_chars)
+    ]
+
+def chunk_text(text: str, max_chars: int = CHUNK_MAX_CHARS) -> List[Dict[str, str]]:
+    """
+    Regroupe les clauses consécutives d'un document en extraits de taille bornée.
+
+    Args:
+        text: Le texte du document
+        max_chars: Taille maximale d'un extrait
+
+    Returns:
+        List[Dict[str, str]]: Extraits avec leur en-tête de début et leur contenu
+    """
+    chunks = []
+    current, current_heading = "", None
+
+    for start, end, heading in find_clause_spans(text):
+        clause = text[start:end]
+
+        if len(clause) > max_chars:
+            # Clause trop longue : la fermer et la découper seule
+            if current:
+                chunks.append({'heading': current_heading, 'content': current})
+                current, current_heading = "", None
+            for piece in _split_oversized(clause, max_chars):
+                chunks.append({'heading': heading, 'content': piece})
+            continue
+
+        if current and len(current) + len(clause) > max_chars:
+            chunks.append({'heading': current_heading, 'content': current})
+            current, current_heading = "", None
+
+        if current_heading is None:
+            current_heading = heading
+        current += clause
+
+    if current:
+        chunks.append({'heading': current_heading, 'content': current})
+
+    return chunks
+
+def truncate_at_clause_boundary(text: str, max_chars: int) -> str:
+    """
+    Tronque un texte à la dernière limite de clause (ou de paragraphe) avant la taille maximale.
+
+    Args:
+        text: Le texte à tronquer
+        max_chars: Taille maximale, marqueur de troncature compris
+
+    Returns:
+        str: Le texte tronqué, ou le texte original s'il est assez court
+    """
+    if len(text) <= max_chars:
+        return text
+
+    limit = max_chars - len(TRUNCATION_MARKER)
+    cut = max((start for start, _, _ in find_clause_spans(text[:limit])), default=0)
+    if cut <= limit // 2:
+        cut = text.rfind("\n\n", 0, limit)
+    if cut <= limit // 2:
+        cut = limit
+
+    return text[:cut] + TRUNCATION_MARKER
@@ -0,0 +1,131 @@
+"""
+Comparaison de N contrats par paires exécutées en parallèle.
+"""
+
+import asyncio
+from itertools import combinations
+from typing import List, Dict, Any, Optional, Tuple
+
+from core.agent_manager import AgentManager
+from core.document import Document
+from core.contract_diff import diff_documents, format_diff_for_agent
+from utils.async_helpers import run_in_thread
+from config.settings import AGENT_CONTEXT_MAX_CHARS, COMPARISON_MODE, COMPARISON_MAX_CONCURRENCY
+
+class ComparisonRunner:
+    """
+    Répartit la comparaison de plusieurs contrats en appels courts de l'agent de comparaison,
+    puis fusionne les résultats dans une matrice de comparaison.
+    """
+
+    def __init__(self, agent_manager: AgentManager):
+        """
+        Initialise l'exécuteur de comparaisons.
+
+        Args:
+            agent_manager: Le gestionnaire d'agents utilisé pour chaque comparaison
+        """
+        self.agent_manager = agent_manager
+        self.last_prompt_chars = 0
+
+    @staticmethod
+    def get_pairs(document_count: int, mode: str = COMPARISON_MODE) -> List[Tuple[int, int]]:
+        """
+        Détermine les paires de documents à comparer.
+
+        Args:
+            document_count: Nombre de documents
+            mode: 'baseline' (chaque document contre le premier) ou 'pairwise' (toutes les paires)
+
+        Returns:
+            List[Tuple[int, int]]: Les paires d'indices de documents
+        """
+        if mode == "pairwise":
+            return list(combinations(range(document_count), 2))
+        return [(0, i) for i in range(1, document_count)]
+
+    async def compare_documents(
+        self,
+        query: str,
+        documents: List[Document],
+        analysis: Optional[str] = None,
+        agent_key: str = "contracts_compare"
+    ) -> str:
+        """
+        Compare plusieurs contrats par paires, avec un nombre borné d'appels simultanés.
+
+        Args:
+            query: La requête utilisateur, sans documents
+            documents: Les documents traités
+            analysis: Analyse préliminaire de qualité, le cas échéant
+            agent_key: L'agent chargé de chaque comparaison
+
+        Returns:
+            str: La matrice de comparaison suivie de l'analyse de chaque paire
+        """
+        pairs = self.get_pairs(len(documents))
+        # Les différences sont calculées dans des threads, sans bloquer la boucle d'événements
+        diff_results = await asyncio.gather(*(
+            run_in_thread(diff_documents, documents[i].content, documents[j].content)
+            for i, j in pairs
+        ))
+        diffs = dict(zip(pairs, diff_results))
+
+        semaphore = asyncio.Semaphore(COMPARISON_MAX_CONCURRENCY)
+        self.last_prompt_chars = 0
+
+        async def compare_pair(i: int, j: int) -> str:
+            prompt = (
+                f"{query}\n\nComparez ces deux contrats à partir de leurs différences clause par clause:\n\n"
+                + format_diff_for_agent(diffs[(i, j)], documents[i].name, documents[j].name, AGENT_CONTEXT_MAX_CHARS)
+            )
+            if analysis:
+                prompt = f"En tenant compte de cette analyse: {analysis}\n\n{prompt}"
+            self.last_prompt_chars += len(prompt)
+            async with semaphore:
+                return await self.agent_manager.execute_agent(agent_key, prompt)
+
+        results = await asyncio.gather(*(compare_pair(i, j) for i, j in pairs), return_exceptions=True)
+
+        return self._build_matrix(documents, pairs, diffs, results)
+
+    def _build_matrix(
+        self,
+        documents: List[Document],
+        pairs: List[Tuple[int, int]],
+        diffs: Dict[Tuple[int, int], Dict[str, Any]],
+        results: List[Any]
+    ) -> str:
+        """
+        Fusionne les comparaisons par paire en une matrice de comparaison.
+
+        Args:
+            documents: Les documents comparés
+            pairs: Les paires d'indices comparées
+            diffs: Les différences calculées localement pour chaque paire
+            results: Les réponses de l'agent (ou exceptions) pour chaque paire
+
+        Returns:
+            str: La matrice au format Markdown suivie des analyses par paire
+        """
+        matrix = (
+            "## Matrice de comparaison\n\n"
+            "| Document A | Document B | Identiques | Modifiées | Supprimées | Ajoutées |\n"
+            "|------------|------------|------------|-----------|------------|----------|\n"
+        )
+        details = ""
+
+        for (i, j), result in zip(pairs, results):
+            diff = diffs[(i, j)]
+            name_a, name_b = documents[i].name, documents[j].name
+            matrix += (
+                f"| {name_a} | {name_b} | {diff['identical']} | {len(diff['modified'])} | "
+                f"{len(diff['removed'])} | {len(diff['added'])} |\n"
+            )
+
+            # Une comparaison annulée (CancelledError) est signalée comme une erreur
+            if isinstance(result, BaseException):
+                result = f"Erreur d'exécution: {str(result) or type(result).__name__}"
+            details += f"\n### {name_a} / {name_b}\n\n{result}\n"
+
+        return matrix + details
@@ -0,0 +1,210 @@
+"""
+Construction du contexte documentaire propre à chaque agent.
+"""
+
+import streamlit as st
+from typing import Optional
+
+from core.chunking import truncate_at_clause_boundary
+from core.contract_diff import diff_documents, format_diff_for_agent
+from core.key_terms import format_term_sheets
+from core.contract_repository import get_contract_repository
+from core.term_store import get_term_store
+from core.document_processor import DocumentProcessor
+from config.agents import AGENT_CONTEXT_POLICIES, KEY_TERMS_QUERY
+from config.settings import AGENT_CONTEXT_MAX_CHARS
+
+class ContextBuilder:
+    """
+    Construit le prompt minimal dont chaque agent a besoin, selon sa politique de contexte.
+    """
+
+    def __init__(self, document_processor: DocumentProcessor):
+        """
+        Initialise le constructeur de contexte.
+
+        Args:
+            document_processor: Le processeur de documents de la session
+        """
+        self.document_processor = document_processor
+
+    def get_policy(self, agent_key: str) -> str:
+        """
+        Récupère la politique de contexte d'un agent.
+
+        Args:
+            agent_key: La clé de l'agent
+
+        Returns:
+            str: La politique de contexte ('passages' par défaut, 'full' pour tous en mode référence)
+        """
+        if self.is_baseline():
+            return "full"
+        return AGENT_CONTEXT_POLICIES.get(agent_key, "passages")
+
+    def is_baseline(self) -> bool:
+        """
+        Indique si la requête est exécutée en mode référence : documents complets pour tous
+        les agents, sans réutilisation d'analyses, pour comparer les latences (voir le mode debug).
+
+        Returns:
+            bool: True en mode référence
+        """
+        return st.session_state.get('full_context_baseline', False)
+
+    def build_agent_query(
+        self,
+        agent_key: str,
+        query: str,
+        processed_query: str,
+        analysis: Optional[str] = None
+    ) -> str:
+        """
+        Construit la requête d'un agent à partir de sa politique de contexte.
+
+        Args:
+            agent_key: La clé de l'agent
+            query: La requête utilisateur, sans documents
+            processed_query: La requête enrichie du contenu complet des documents
+            analysis: Analyse préliminaire de qualité, le cas échéant
+
+        Returns:
+            str: La requête à soumettre à l'agent
+        """
+        policy = self.get_policy(agent_key)
+
+        if policy == "question":
+            return query
+
+        if policy == "full":
+            agent_query = processed_query
+        elif policy == "key_terms":
+            agent_query = self.build_key_terms_context(query)
+        elif policy == "clause_diff":
+            agent_query = self.build_clause_diff_context(query)
+        elif policy == "market_stats":
+            agent_query = self.build_market_stats_context(query)
+        else:
+            agent_query = self.document_processor.construct_prompt_with_passages(query)
+
+        # Les faits extraits localement évitent aux agents de les re-déduire du texte
+        term_sheets = format_term_sheets(st.session_state.get('term_sheets'))
+        if term_sheets and policy != "key_terms":
+            agent_query += f"\n\nTermes clés extraits (JSON): {term_sheets}"
+
+        if analysis:
+            agent_query = f"En tenant compte de cette analyse: {analysis}\n\n{agent_query}"
+
+        return agent_query
+
+    def build_key_terms_context(self, query: str) -> str:
+        """
+        Construit un contexte limité aux termes commerciaux : fiche des termes clés
+        et passages commerciaux les plus pertinents.
+
+        Args:
+            query: La requête utilisateur
+
+        Returns:
+            str: La requête suivie des termes clés et des passages commerciaux
+        """
+        passage_index = st.session_state.get('passage_index')
+
+        if passage_index is None or not passage_index.passages:
+            return query
+
+        context = query
+        term_sheets = format_term_sheets(st.session_state.get('term_sheets'))
+        if term_sheets:
+            context += f"\n\nTermes clés extraits (JSON): {term_sheets}"
+        context += "\n\nPassages commerciaux des documents attachés:"
+        for passage in passage_index.search(f"{query} {KEY_TERMS_QUERY}", top_k=4):
+            context += f"\n--- {passage['name']} ({passage['heading']}) ---\n{passage['content'].strip()}\n"
+
+        return truncate_at_clause_boundary(context, AGENT_CONTEXT_MAX_CHARS)
+
+    def build_clause_diff_context(self, query: str) -> str:
+        """
+        Construit un contexte de comparaison limité aux clauses qui diffèrent entre les documents.
+        
+        Chaque document est comparé au premier document attaché, pris comme référence.
+
+        Args:
+            query: La requête utilisateur
+
+        Returns:
+            str: La requête suivie des différences clause par clause
+        """
+        docs = st.session_state.get('processed_documents', [])
+
+        if len(docs) < 2:
+            return self.document_processor.construct_prompt_with_passages(query)
+
+        base = docs[0]
+        budget = AGENT_CONTEXT_MAX_CHARS // (len(docs) - 1)
+
+        context = f"{query}\n\nDifférences clause par clause (référence: {base.name}):"
+        for doc in docs[1:]:
+            diff = diff_documents(base.content, doc.content)
+            context += "\n\n" + format_diff_for_agent(diff, base.name, doc.name, budget)
+
+        return context
+
+    def build_market_stats_context(self, query: str) -> str:
+        """
+        Construit un contexte de comparaison au marché : passages pertinents des documents
+        et statistiques agrégées sur l'ensemble des contrats déjà traités.
+
+        Args:
+            query: La requête utilisateur
+
+        Returns:
+            str: La requête suivie des passages et du tableau de statistiques
+        """
+        context = self.document_processor.construct_prompt_with_passages(query)
+
+        term_store = get_term_store()
+        statistics = term_store.statistics_table()
+        if statistics:
+            context += (
+                f"\n\nStatistiques de marché ({term_store.count()} contrats traités, "
+                f"durées en jours):\n{statistics}"
+            )
+
+        return context
+
+    def build_prior_analysis_update(self, query: str, prior_analysis: str) -> Optional[str]:
+        """
+        Construit une demande de mise à jour d'une analyse produite sur des versions quasi identiques
+        des documents : seules les différences avec ces versions sont transmises.
+
+        Args:
+            query: La requête utilisateur
+            prior_analysis: L'analyse produite sur les versions précédentes
+
+        Returns:
+            Optional[str]: La requête de mise à jour, ou None si les documents sont inchangés
+        """
+        docs = st.session_state.get('processed_documents', [])
+        matches = st.session_state.get('near_duplicates', [])
+        repository = get_contract_repository()
+
+        changes = ""
+        budget = AGENT_CONTEXT_MAX_CHARS // max(len(docs), 1)
+        for doc, match in zip(docs, matches):
+            if match['id'] == doc.id:
+                continue
+            prior = repository.get(match['id'])
+            if prior is None:
+                return self.document_processor.construct_prompt_with_passages(query)
+            diff = diff_documents(prior['content'], doc.content)
+            changes += "\n\n" + format_diff_for_agent(diff, f"version précédente ({prior['name']})", doc.name, budget)
+
+        if not changes:
+            return None
+
+        return (
+            f"{query}\n\nCette demande a déjà été traitée sur une version précédente des documents. "
+            f"Mettez à jour l'analyse précédente en tenant compte uniquement des différences ci-dessous.\n\n"
+            f"Analyse précédente:\n{prior_analysis}\n\nDifférences avec la version précédente:{changes}"
+        )
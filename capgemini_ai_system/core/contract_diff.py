@@ -0,0 +1,244 @@
+"""
+Comparaison locale de contrats clause par clause.
+"""
+
+import re
+import difflib
+from collections import Counter, defaultdict
+from typing import List, Dict, Any, Optional, Tuple
+
+from core.chunking import find_clause_spans, normalize_heading, truncate_at_clause_boundary
+
+SENTENCE_SPLIT_PATTERN = re.compile(r'(?<=[.;:!?])\s+|\n{2,}')
+WORD_PATTERN = re.compile(r'\w+')
+
+# Similarité minimale (Jaccard sur trigrammes de mots) pour apparier deux clauses d'en-têtes différents
+MIN_CLAUSE_SIMILARITY = 0.5
+
+def _normalize(text: str) -> str:
+    """
+    Normalise le texte d'une clause (casse et espaces) pour détecter les clauses identiques.
+
+    Args:
+        text: Le texte de la clause
+
+    Returns:
+        str: Le texte normalisé
+    """
+    return " ".join(text.lower().split())
+
+def _shingles(text: str) -> set:
+    """
+    Calcule l'ensemble des trigrammes de mots d'une clause.
+
+    Args:
+        text: Le texte normalisé de la clause
+
+    Returns:
+        set: Les empreintes des trigrammes
+    """
+    words = WORD_PATTERN.findall(text)
+    if len(words) < 3:
+        return {hash(tuple(words))} if words else set()
+    return {hash((words[i], words[i + 1], words[i + 2])) for i in range(len(words) - 2)}
+
+def _jaccard(a: set, b: set) -> float:
+    """
+    Calcule la similarité de Jaccard entre deux ensembles.
+
+    Args:
+        a: Premier ensemble
+        b: Second ensemble
+
+    Returns:
+        float: La similarité entre 0 et 1
+    """
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+def extract_clauses(text: str) -> List[Dict[str, Any]]:
+    """
+    Découpe un document en clauses prêtes à être comparées.
+
+    Args:
+        text: Le texte du document
+
+    Returns:
+        List[Dict[str, Any]]: Clauses avec en-tête, clé d'alignement, contenu et texte normalisé
+    """
+    clauses = []
+    for start, end, heading in find_clause_spans(text):
+        content = text[start:end].strip()
+        clauses.append({
+            'heading': heading,
+            'key': normalize_heading(heading),
+            'content': content,
+            'normalized': _normalize(content)
+        })
+    return clauses
+
+def align_clauses(
+    base: List[Dict[str, Any]],
+    other: List[Dict[str, Any]]
+) -> List[Tuple[Optional[int], Optional[int], float]]:
+    """
+    Aligne les clauses de deux documents : texte identique, puis même en-tête, puis similarité.
+
+    Args:
+        base: Clauses du document de référence
+        other: Clauses du document comparé
+
+    Returns:
+        List[Tuple[Optional[int], Optional[int], float]]: Paires d'indices (None si sans équivalent) et similarité
+    """
+    matches = {}
+    unmatched_other = set(range(len(other)))
+
+    # 1. Clauses au texte identique
+    by_text = defaultdict(list)
+    for j, clause in enumerate(other):
+        by_text[clause['normalized']].append(j)
+    for i, clause in enumerate(base):
+        candidates = by_text.get(clause['normalized'])
+        if candidates:
+            j = candidates.pop(0)
+            matches[i] = (j, 1.0)
+            unmatched_other.discard(j)
+
+    # 2. Clauses de même en-tête
+    by_key = defaultdict(list)
+    for j in sorted(unmatched_other):
+        by_key[other[j]['key']].append(j)
+    for i, clause in enumerate(base):
+        if i in matches:
+            continue
+        candidates = by_key.get(clause['key'])
+        if candidates:
+            j = candidates.pop(0)
+            matches[i] = (j, None)
+            unmatched_other.discard(j)
+
+    # 3. Clauses renommées ou renumérotées : similarité de contenu, via un index inversé des trigrammes
+    shingles_other = {j: _shingles(other[j]['normalized']) for j in unmatched_other}
+    postings = defaultdict(list)
+    for j, shingles in shingles_other.items():
+        for shingle in shingles:
+            postings[shingle].append(j)
+
+    for i, clause in enumerate(base):
+        if i in matches or not unmatched_other:
+            continue
+        shingles = _shingles(clause['normalized'])
+        overlaps = Counter()
+        for shingle in shingles:
+            for j in postings.get(shingle, ()):
+                if j in unmatched_other:
+                    overlaps[j] += 1
+        best, best_similarity = None, MIN_CLAUSE_SIMILARITY
+        for j, overlap in overlaps.most_common(5):
+            similarity = overlap / (len(shingles) + len(shingles_other[j]) - overlap)
+            if similarity >= best_similarity:
+                best, best_similarity = j, similarity
+        if best is not None:
+            matches[i] = (best, best_similarity)
+            unmatched_other.discard(best)
+
+    alignment = []
+    for i in range(len(base)):
+        if i in matches:
+            j, similarity = matches[i]
+            if similarity is None:
+                similarity = _jaccard(_shingles(base[i]['normalized']), _shingles(other[j]['normalized']))
+            alignment.append((i, j, similarity))
+        else:
+            alignment.append((i, None, 0.0))
+    for j in sorted(unmatched_other):
+        alignment.append((None, j, 0.0))
+
+    return alignment
+
+def diff_clauses(base_content: str, other_content: str) -> List[str]:
+    """
+    Calcule les différences entre deux versions d'une clause, phrase par phrase.
+
+    Args:
+        base_content: Texte de la clause de référence
+        other_content: Texte de la clause comparée
+
+    Returns:
+        List[str]: Lignes de différence préfixées par '-' (supprimé) ou '+' (ajouté)
+    """
+    base_sentences = [" ".join(s.split()) for s in SENTENCE_SPLIT_PATTERN.split(base_content) if s.strip()]
+    other_sentences = [" ".join(s.split()) for s in SENTENCE_SPLIT_PATTERN.split(other_content) if s.strip()]
+
+    return [
+        line for line in difflib.unified_diff(base_sentences, other_sentences, n=0, lineterm="")
+        if line[:1] in "-+" and not line.startswith(("---", "+++"))
+    ]
+
+def diff_documents(base_text: str, other_text: str) -> Dict[str, Any]:
+    """
+    Compare deux contrats clause par clause.
+
+    Args:
+        base_text: Texte du contrat de référence
+        other_text: Texte du contrat comparé
+
+    Returns:
+        Dict[str, Any]: Nombre de clauses identiques, clauses modifiées, supprimées et ajoutées
+    """
+    base = extract_clauses(base_text)
+    other = extract_clauses(other_text)
+
+    result = {'identical': 0, 'modified': [], 'removed': [], 'added': []}
+
+    for i, j, similarity in align_clauses(base, other):
+        if i is None:
+            result['added'].append({'heading': other[j]['heading'], 'content': other[j]['content']})
+        elif j is None:
+            result['removed'].append({'heading': base[i]['heading'], 'content': base[i]['content']})
+        elif base[i]['normalized'] == other[j]['normalized']:
+            result['identical'] += 1
+        else:
+            result['modified'].append({
+                'base_heading': base[i]['heading'],
+                'other_heading': other[j]['heading'],
+                'similarity': similarity,
+                'changes': diff_clauses(base[i]['content'], other[j]['content'])
+            })
+
+    return result
+
+def format_diff_for_agent(diff: Dict[str, Any], base_name: str, other_name: str, max_chars: int) -> str:
+    """
+    Formate le résultat d'une comparaison pour un agent : seules les différences sont transmises.
+
+    Args:
+        diff: Résultat de diff_documents
+        base_name: Nom du contrat de référence
+        other_name: Nom du contrat comparé
+        max_chars: Taille maximale du texte produit
+
+    Returns:
+        str: Les différences formatées
+    """
+    text = (
+        f"=== {base_name} → {other_name} ===\n"
+        f"Clauses identiques: {diff['identical']} | modifiées: {len(diff['modified'])} | "
+        f"supprimées: {len(diff['removed'])} | ajoutées: {len(diff['added'])}\n"
+    )
+
+    for clause in diff['modified']:
+        heading = clause['base_heading']
+        if normalize_heading(clause['other_heading']) != normalize_heading(heading):
+            heading += f" → {clause['other_heading']}"
+        text += f"\n[MODIFIÉE] {heading} (similarité {clause['similarity']:.0%})\n" + "\n".join(clause['changes']) + "\n"
+
+    for clause in diff['removed']:
+        text += f"\n[SUPPRIMÉE dans {other_name}] {clause['heading']}\n{clause['content']}\n"
+
+    for clause in diff['added']:
+        text += f"\n[AJOUTÉE dans {other_name}] {clause['heading']}\n{clause['content']}\n"
+
+    return truncate_at_clause_boundary(text, max_chars)
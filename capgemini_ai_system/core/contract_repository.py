@@ -0,0 +1,301 @@
+"""
+Référentiel local des contrats déjà traités, persistant entre les sessions et consultable en plein texte.
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import List, Dict, Any, Optional
+
+from utils.text_extraction import get_page_offsets
+from config.settings import CONTRACT_REPOSITORY_PATH, CONTRACT_REPOSITORY_MMAP_BYTES
+
+SEARCH_TOKEN_PATTERN = re.compile(r'\w{2,}')
+
+class ContractRepository:
+    """
+    Conserve le texte extrait, les débuts de pages et la fiche des termes clés de chaque contrat,
+    indexés par le SHA-256 de leur texte. L'index plein texte (SQLite FTS5) est mis à jour
+    à chaque ajout et lu par projection mémoire (mmap), sans chargement au démarrage.
+    """
+
+    def __init__(self, db_path: str = CONTRACT_REPOSITORY_PATH):
+        """
+        Initialise le référentiel.
+
+        Args:
+            db_path: Chemin de la base SQLite
+        """
+        self.db_path = db_path
+
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS contracts (
+                    seq INTEGER PRIMARY KEY,
+                    id TEXT NOT NULL UNIQUE,
+                    name TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    page_offsets TEXT NOT NULL,
+                    term_sheet TEXT,
+                    size INTEGER NOT NULL,
+                    added_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE VIRTUAL TABLE IF NOT EXISTS contracts_fts USING fts5(
+                    name, content, content='contracts', content_rowid='seq',
+                    tokenize='unicode61 remove_diacritics 2'
+                )
+                """
+            )
+            # Index incrémental : maintenu par déclencheurs à chaque modification du référentiel
+            conn.executescript(
+                """
+                CREATE TRIGGER IF NOT EXISTS contracts_ai AFTER INSERT ON contracts BEGIN
+                    INSERT INTO contracts_fts(rowid, name, content) VALUES (new.seq, new.name, new.content);
+                END;
+                CREATE TRIGGER IF NOT EXISTS contracts_ad AFTER DELETE ON contracts BEGIN
+                    INSERT INTO contracts_fts(contracts_fts, rowid, name, content)
+                    VALUES ('delete', old.seq, old.name, old.content);
+                END;
+                CREATE TRIGGER IF NOT EXISTS contracts_au AFTER UPDATE OF name, content ON contracts BEGIN
+                    INSERT INTO contracts_fts(contracts_fts, rowid, name, content)
+                    VALUES ('delete', old.seq, old.name, old.content);
+                    INSERT INTO contracts_fts(rowid, name, content) VALUES (new.seq, new.name, new.content);
+                END;
+                """
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Ouvre une connexion à la base du référentiel, avec lecture par projection mémoire.
+
+        Returns:
+            sqlite3.Connection: La connexion ouverte
+        """
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute(f"PRAGMA mmap_size={int(CONTRACT_REPOSITORY_MMAP_BYTES)}")
+        return conn
+
+    @staticmethod
+    def make_id(content: str) -> str:
+        """
+        Calcule l'identifiant d'un contrat.
+
+        Args:
+            content: Le texte du contrat
+
+        Returns:
+            str: Le SHA-256 du texte
+        """
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def add(self, name: str, content: str, term_sheet: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Enregistre un contrat ; un contrat déjà connu est seulement renommé et marqué comme utilisé.
+
+        Args:
+            name: Le nom du fichier
+            content: Le texte extrait
+            term_sheet: La fiche des termes clés
+
+        Returns:
+            str: L'identifiant du contrat
+        """
+        contract_id = self.make_id(content)
+        now = time.time()
+
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    """
+                    INSERT INTO contracts (id, name, content, page_offsets, term_sheet, size, added_at, last_used)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(id) DO UPDATE SET
+                        name = excluded.name,
+                        term_sheet = COALESCE(excluded.term_sheet, contracts.term_sheet),
+                        last_used = excluded.last_used
+                    """,
+                    (
+                        contract_id, name, content, json.dumps(get_page_offsets(content)),
+                        json.dumps(term_sheet, ensure_ascii=False) if term_sheet is not None else None,
+                        len(content), now, now
+                    )
+                )
+        except sqlite3.Error as e:
+            print(f"Erreur d'écriture dans le référentiel de contrats: {str(e)}")
+
+        return contract_id
+
+    def get(self, contract_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Récupère un contrat enregistré.
+
+        Args:
+            contract_id: L'identifiant du contrat
+
+        Returns:
+            Optional[Dict[str, Any]]: Identifiant, nom, contenu, débuts de pages et fiche des termes clés
+        """
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT id, name, content, page_offsets, term_sheet FROM contracts WHERE id = ?",
+                    (contract_id,)
+                ).fetchone()
+                if row is not None:
+                    conn.execute("UPDATE contracts SET last_used = ? WHERE id = ?", (time.time(), contract_id))
+        except sqlite3.Error as e:
+            print(f"Erreur de lecture du référentiel de contrats: {str(e)}")
+            return None
+
+        if row is None:
+            return None
+
+        return {
+            'id': row[0],
+            'name': row[1],
+            'content': row[2],
+            'page_offsets': json.loads(row[3]),
+            'term_sheet': json.loads(row[4]) if row[4] else None
+        }
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Recherche des contrats par nom ou contenu.
+
+        Args:
+            query: Les termes recherchés
+            limit: Nombre maximal de résultats
+
+        Returns:
+            List[Dict[str, Any]]: Identifiant, nom, taille et extrait de chaque contrat, du plus pertinent au moins pertinent
+        """
+        tokens = SEARCH_TOKEN_PATTERN.findall(query)
+        if not tokens:
+            return []
+
+        # Chaque terme est cité pour neutraliser la syntaxe FTS5 ; le dernier est recherché comme préfixe
+        match = " ".join(f'"{token}"' for token in tokens[:-1])
+        match = f'{match} "{tokens[-1]}"*'.strip()
+
+        try:
+            with self._connect() as conn:
+                rows = conn.execute(
+                    """
+                    SELECT c.id, c.name, c.size, snippet(contracts_fts, 1, '', '', '…', 16)
+                    FROM contracts_fts
+                    JOIN contracts c ON c.seq = contracts_fts.rowid
+                    WHERE contracts_fts MATCH ?
+                    ORDER BY bm25(contracts_fts, 10.0, 1.0)
+                    LIMIT ?
+                    """,
+                    (match, limit)
+                ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Erreur de recherche dans le référentiel de contrats: {str(e)}")
+            return []
+
+        return [{'id': row[0], 'name': row[1], 'size': row[2], 'snippet': " ".join(row[3].split())} for row in rows]
+
+    def list_recent(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Liste les contrats les plus récemment utilisés.
+
+        Args:
+            limit: Nombre maximal de contrats
+
+        Returns:
+            List[Dict[str, Any]]: Identifiant, nom et taille de chaque contrat
+        """
+        try:
+            with self._connect() as conn:
+                rows = conn.execute(
+                    "SELECT id, name, size FROM contracts ORDER BY last_used DESC LIMIT ?", (limit,)
+                ).fetchall()
+        except sqlite3.Error:
+            return []
+
+        return [{'id': row[0], 'name': row[1], 'size': row[2]} for row in rows]
+
+    def find_referenced(self, query: str, limit: int = 5) -> List[str]:
+        """
+        Trouve les contrats dont le nom de fichier est cité dans une requête.
+
+        Args:
+            query: La requête utilisateur
+            limit: Nombre maximal de contrats
+
+        Returns:
+            List[str]: Les identifiants des contrats cités
+        """
+        tokens = SEARCH_TOKEN_PATTERN.findall(query)
+        if not tokens:
+            return []
+
+        lowered = query.lower()
+        match = "name : (" + " OR ".join(f'"{token}"' for token in tokens) + ")"
+
+        try:
+            with self._connect() as conn:
+                rows = conn.execute(
+                    """
+                    SELECT c.id, c.name
+                    FROM contracts_fts
+                    JOIN contracts c ON c.seq = contracts_fts.rowid
+                    WHERE contracts_fts MATCH ?
+                    ORDER BY c.last_used DESC
+                    LIMIT 50
+                    """,
+                    (match,)
+                ).fetchall()
+        except sqlite3.Error:
+            return []
+
+        referenced = []
+        for contract_id, name in rows:
+            stem = name.rsplit(".", 1)[0].lower()
+            if name.lower() in lowered or (len(stem) >= 4 and stem in lowered):
+                referenced.append(contract_id)
+            if len(referenced) >= limit:
+                break
+        return referenced
+
+    def count(self) -> int:
+        """
+        Compte les contrats enregistrés.
+
+        Returns:
+            int: Le nombre de contrats
+        """
+        try:
+            with self._connect() as conn:
+                return conn.execute("SELECT COUNT(*) FROM contracts").fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+_contract_repository = None
+_contract_repository_lock = threading.Lock()
+
+def get_contract_repository() -> ContractRepository:
+    """
+    Obtient l'instance du référentiel partagée par le processus.
+
+    Returns:
+        ContractRepository: L'instance du référentiel
+    """
+    global _contract_repository
+    with _contract_repository_lock:
+        if _contract_repository is None:
+            _contract_repository = ContractRepository()
+        return _contract_repository
@@ -0,0 +1,239 @@
+"""
+Stockage durable des conversations (messages, threads et historiques des agents),
+qui survit au redémarrage de l'application et se lit page par page.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+
+from core.history_store import AgentHistory
+from utils.compressed_text import as_text
+from config.settings import CONVERSATION_STORE_PATH
+
+class ConversationStore:
+    """
+    Conserve chaque conversation dans SQLite (mode WAL) : les messages affichés,
+    le thread de chaque agent et son historique (avec le résumé des échanges anciens).
+    Les écritures d'un tour de conversation sont groupées dans une seule transaction.
+    """
+
+    def __init__(self, db_path: str = CONVERSATION_STORE_PATH):
+        """
+        Initialise le stockage.
+
+        Args:
+            db_path: Chemin de la base SQLite
+        """
+        self.db_path = db_path
+
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS messages (
+                    conversation_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    role TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    attributes TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (conversation_id, seq)
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS agent_threads (
+                    conversation_id TEXT NOT NULL,
+                    agent TEXT NOT NULL,
+                    thread_id TEXT NOT NULL,
+                    history TEXT NOT NULL,
+                    summary TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (conversation_id, agent)
+                )
+                """
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Ouvre une connexion à la base des conversations.
+
+        Returns:
+            sqlite3.Connection: La connexion ouverte
+        """
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        # En mode WAL, une synchronisation normale suffit : un tour est au pire perdu en cas de coupure
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def save_turn(
+        self,
+        conversation_id: str,
+        messages: List[Dict[str, Any]],
+        agent_threads: Dict[str, str],
+        thread_history: Dict[str, AgentHistory],
+        summaries: Dict[str, str]
+    ) -> bool:
+        """
+        Enregistre un tour de conversation en une seule transaction : nouveaux messages,
+        puis thread, historique et résumé de chaque agent.
+
+        Args:
+            conversation_id: Identifiant de la conversation
+            messages: Les messages du tour (rôle, contenu et attributs d'affichage)
+            agent_threads: Thread de chaque agent
+            thread_history: Historique de chaque agent
+            summaries: Résumé des échanges anciens de chaque agent
+
+        Returns:
+            bool: True si le tour a été enregistré
+        """
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                next_seq = conn.execute(
+                    "SELECT COALESCE(MAX(seq), -1) + 1 FROM messages WHERE conversation_id = ?",
+                    (conversation_id,)
+                ).fetchone()[0]
+                conn.executemany(
+                    """
+                    INSERT INTO messages (conversation_id, seq, role, content, attributes, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    [
+                        (
+                            conversation_id, next_seq + i, message['role'], as_text(message['content']),
+                            json.dumps(
+                                {key: value for key, value in message.items() if key not in ('role', 'content')},
+                                ensure_ascii=False, default=str
+                            ),
+                            now
+                        )
+                        for i, message in enumerate(messages)
+                    ]
+                )
+                conn.executemany(
+                    """
+                    INSERT INTO agent_threads (conversation_id, agent, thread_id, history, summary, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(conversation_id, agent) DO UPDATE SET
+                        thread_id = excluded.thread_id,
+                        history = excluded.history,
+                        summary = excluded.summary,
+                        updated_at = excluded.updated_at
+                    """,
+                    [
+                        (
+                            conversation_id, agent, thread_id,
+                            json.dumps(thread_history[agent].to_dict() if agent in thread_history else {}, ensure_ascii=False),
+                            summaries.get(agent, ""), now
+                        )
+                        for agent, thread_id in agent_threads.items()
+                    ]
+                )
+            return True
+        except sqlite3.Error as e:
+            print(f"Erreur d'écriture dans le stockage des conversations: {str(e)}")
+            return False
+
+    def count_messages(self, conversation_id: str) -> int:
+        """
+        Compte les messages d'une conversation.
+
+        Args:
+            conversation_id: Identifiant de la conversation
+
+        Returns:
+            int: Le nombre de messages
+        """
+        try:
+            with self._connect() as conn:
+                return conn.execute(
+                    "SELECT COUNT(*) FROM messages WHERE conversation_id = ?", (conversation_id,)
+                ).fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+    def load_messages(self, conversation_id: str, limit: int, before: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Charge une page de messages : les plus récents, ou ceux qui précèdent un rang donné.
+
+        Args:
+            conversation_id: Identifiant de la conversation
+            limit: Nombre maximal de messages
+            before: Rang à partir duquel remonter (fin de la conversation si None)
+
+        Returns:
+            List[Dict[str, Any]]: Les messages (rôle, contenu, attributs), du plus ancien au plus récent
+        """
+        try:
+            with self._connect() as conn:
+                rows = conn.execute(
+                    """
+                    SELECT role, content, attributes FROM messages
+                    WHERE conversation_id = ? AND seq < ?
+                    ORDER BY seq DESC LIMIT ?
+                    """,
+                    (conversation_id, before if before is not None else 2 ** 62, limit)
+                ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Erreur de lecture du stockage des conversations: {str(e)}")
+            return []
+
+        return [
+            {'role': role, 'content': content, **json.loads(attributes)}
+            for role, content, attributes in reversed(rows)
+        ]
+
+    def load_threads(
+        self, conversation_id: str, wrap=None
+    ) -> Tuple[Dict[str, str], Dict[str, AgentHistory], Dict[str, str]]:
+        """
+        Charge le thread, l'historique et le résumé de chaque agent d'une conversation.
+
+        Args:
+            conversation_id: Identifiant de la conversation
+            wrap: Fonction appliquée à chaque message des historiques (par exemple SessionTextStore.wrap)
+
+        Returns:
+            Tuple[Dict[str, str], Dict[str, AgentHistory], Dict[str, str]]: Threads, historiques et résumés par agent
+        """
+        try:
+            with self._connect() as conn:
+                rows = conn.execute(
+                    "SELECT agent, thread_id, history, summary FROM agent_threads WHERE conversation_id = ?",
+                    (conversation_id,)
+                ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Erreur de lecture du stockage des conversations: {str(e)}")
+            return {}, {}, {}
+
+        agent_threads, histories, summaries = {}, {}, {}
+        for agent, thread_id, history, summary in rows:
+            agent_threads[agent] = thread_id
+            histories[agent] = AgentHistory.from_dict(json.loads(history), wrap)
+            if summary:
+                summaries[agent] = summary
+        return agent_threads, histories, summaries
+
+_conversation_store = None
+_conversation_store_lock = threading.Lock()
+
+def get_conversation_store() -> ConversationStore:
+    """
+    Obtient l'instance du stockage des conversations partagée par le processus.
+
+    Returns:
+        ConversationStore: L'instance du stockage
+    """
+    global _conversation_store
+    with _conversation_store_lock:
+        if _conversation_store is None:
+            _conversation_store = ConversationStore()
+        return _conversation_store
@@ -0,0 +1,250 @@
+"""
+Modèle compact d'un document traité : un seul texte, indexé par pages et par clauses.
+"""
+
+import hashlib
+from array import array
+from contextlib import contextmanager, ExitStack
+from bisect import bisect_right
+from collections import Counter
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from core.chunking import find_clause_spans
+from core.passage_index import tokenize
+from utils.text_extraction import get_page_offsets
+from utils.compressed_text import CompressedText, as_text
+
+PREVIEW_MAX_CHARS = 200
+
+class TextView:
+    """
+    Vue sur une partie du texte d'un document, sans copie tant que le texte n'est pas demandé.
+    """
+
+    __slots__ = ('document', 'start', 'end')
+
+    def __init__(self, document: 'Document', start: int, end: int):
+        """
+        Initialise la vue.
+
+        Args:
+            document: Le document
+            start: Position de début dans le texte du document
+            end: Position de fin (exclue)
+        """
+        self.document = document
+        self.start = start
+        self.end = end
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def __str__(self) -> str:
+        return self.document.content[self.start:self.end]
+
+    def preview(self, max_chars: int = 200) -> str:
+        """
+        Renvoie le début du texte de la vue, sans matérialiser le reste.
+
+        Args:
+            max_chars: Nombre maximal de caractères
+
+        Returns:
+            str: L'aperçu, terminé par "..." s'il est tronqué
+        """
+        end = min(self.end, self.start + max_chars)
+        text = self.document.content[self.start:end]
+        return text + "..." if end < self.end else text
+
+@contextmanager
+def open_texts(documents: Iterable['Document']) -> Iterator[None]:
+    """
+    Décompresse le texte de chaque document une seule fois pour la durée du bloc (voir Document.text).
+
+    Args:
+        documents: Les documents
+    """
+    with ExitStack() as stack:
+        for doc in documents:
+            stack.enter_context(doc.text())
+        yield
+
+class Document:
+    """
+    Document traité : nom, texte extrait, débuts de pages et (à la demande) débuts de clauses.
+    Le texte peut être conservé compressé ; il est alors décompressé à chaque accès,
+    ou une seule fois pour toute la durée d'un bloc text() (voir open_texts).
+    Les pages sont numérotées à partir de 1.
+    """
+
+    __slots__ = ('name', '_content', '_text', 'page_offsets', '_clause_offsets', '_clause_headings', '_id', '_preview')
+
+    def __init__(self, name: str, content: Union[str, CompressedText], page_offsets: Optional[List[int]] = None):
+        """
+        Initialise le document.
+
+        Args:
+            name: Le nom du fichier
+            content: Le texte extrait, éventuellement compressé
+            page_offsets: Débuts de pages connus (recalculés depuis les sauts de page sinon)
+        """
+        self.name = name
+        self._content = content
+        self._text = None
+        if page_offsets is None:
+            page_offsets = get_page_offsets(as_text(content))
+        self.page_offsets = array('L', page_offsets)
+        self._clause_offsets = None
+        self._clause_headings = None
+        self._id = None
+        self._preview = None
+
+    def __len__(self) -> int:
+        return len(self._content)
+
+    @property
+    def content(self) -> str:
+        """Texte du document (décompressé s'il est conservé compressé, hors d'un bloc text())."""
+        if self._text is not None:
+            return self._text
+        return as_text(self._content)
+
+    @contextmanager
+    def text(self) -> Iterator[str]:
+        """
+        Décompresse le texte une seule fois pour la durée du bloc : content le réutilise,
+        puis seule la forme compressée est conservée. Les blocs peuvent être imbriqués.
+
+        Yields:
+            str: Le texte du document
+        """
+        if self._text is not None:
+            yield self._text
+            return
+        self._text = as_text(self._content)
+        try:
+            yield self._text
+        finally:
+            self._text = None
+
+    @property
+    def id(self) -> str:
+        """Identifiant du document : SHA-256 de son texte (identifiant du référentiel de contrats)."""
+        if self._id is None:
+            self._id = hashlib.sha256(self.content.encode('utf-8')).hexdigest()
+        return self._id
+
+    @property
+    def page_count(self) -> int:
+        """Nombre de pages du document."""
+        return len(self.page_offsets)
+
+    @property
+    def is_error(self) -> bool:
+        """Indique si l'extraction du document a échoué."""
+        return not self.content or self.content.startswith(("Erreur", "Type de fichier non pris en charge"))
+
+    def preview(self) -> str:
+        """
+        Renvoie l'aperçu du document, calculé une seule fois.
+
+        Returns:
+            str: Les PREVIEW_MAX_CHARS premiers caractères du document
+        """
+        if self._preview is None:
+            self._preview = TextView(self, 0, len(self)).preview(PREVIEW_MAX_CHARS)
+        return self._preview
+
+    def page_of(self, position: int) -> int:
+        """
+        Détermine la page contenant une position du texte.
+
+        Args:
+            position: La position dans le texte
+
+        Returns:
+            int: Le numéro de page
+        """
+        return bisect_right(self.page_offsets, position)
+
+    def pages(self, first: int, last: Optional[int] = None) -> TextView:
+        """
+        Renvoie une vue sur une plage de pages.
+
+        Args:
+            first: Première page
+            last: Dernière page incluse (la première page seule si None)
+
+        Returns:
+            TextView: La vue sur les pages demandées
+        """
+        last = first if last is None else last
+        first = max(first, 1)
+        last = min(last, self.page_count)
+        end = self.page_offsets[last] if last < self.page_count else len(self.content)
+        return TextView(self, self.page_offsets[first - 1], end)
+
+    def _index_clauses(self) -> None:
+        """Repère les clauses du document lors du premier accès."""
+        spans = find_clause_spans(self.content)
+        self._clause_offsets = array('L', [start for start, _, _ in spans])
+        self._clause_headings = [heading for _, _, heading in spans]
+
+    def clauses(self) -> List[Tuple[str, TextView]]:
+        """
+        Renvoie les clauses du document.
+
+        Returns:
+            List[Tuple[str, TextView]]: En-tête et vue de chaque clause
+        """
+        if self._clause_offsets is None:
+            self._index_clauses()
+
+        ends = list(self._clause_offsets[1:]) + [len(self.content)]
+        return [
+            (heading, TextView(self, start, end))
+            for heading, start, end in zip(self._clause_headings, self._clause_offsets, ends)
+        ]
+
+    def pages_for_query(self, query: str, max_pages: int = 5) -> List[int]:
+        """
+        Sélectionne les pages qui citent le plus de termes de la requête.
+
+        Args:
+            query: La requête utilisateur
+            max_pages: Nombre maximal de pages
+
+        Returns:
+            List[int]: Les numéros des pages retenues, dans l'ordre du document
+        """
+        terms = set(tokenize(query))
+        if not terms or self.page_count == 1:
+            return list(range(1, min(self.page_count, max_pages) + 1))
+
+        content = self.content
+        scores = Counter()
+        for page in range(1, self.page_count + 1):
+            view = self.pages(page)
+            counts = Counter(tokenize(content[view.start:view.end]))
+            score = sum(counts[term] for term in terms)
+            if score:
+                scores[page] = score
+
+        selected = [page for page, _ in scores.most_common(max_pages)] or [1]
+        return sorted(selected)
+
+    def select_pages(self, page_numbers: List[int]) -> str:
+        """
+        Extrait le texte des seules pages demandées, chacune précédée de son numéro.
+
+        Args:
+            page_numbers: Numéros des pages à extraire
+
+        Returns:
+            str: Le texte des pages
+        """
+        content = self.content
+        pages = [self.pages(page) for page in page_numbers]
+        return "\n".join(
+            f"[Page {page}]\n{content[view.start:view.end].strip()}" for page, view in zip(page_numbers, pages)
+        )
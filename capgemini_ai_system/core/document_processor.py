@@ -7,6 +7,16 @@ from typing import List, Dict, Any, Optional, Tuple, BinaryIO
 import asyncio
 
 from utils.text_extraction import extract_text_from_file, extract_text_from_multiple_files
+from core.chunking import chunk_text, truncate_at_clause_boundary
+from core.document import Document, open_texts
+from utils.compressed_text import get_session_text_store
+from utils.async_helpers import run_in_thread
+from core.passage_index import PassageIndex
+from core.key_terms import extract_term_sheets
+from core.term_store import get_term_store
+from core.contract_repository import get_contract_repository
+from core.near_duplicates import compute_signature, get_near_duplicate_index
+from config.settings import DOCUMENT_MAX_CHARS, CHUNK_MAX_CHARS, RETRIEVAL_TOP_K, NEAR_DUPLICATE_THRESHOLD
 
 class DocumentProcessor:
     """
@@ -18,6 +28,14 @@ class DocumentProcessor:
         # Initialiser les variables de session si nécessaires
         if 'processed_documents' not in st.session_state:
             st.session_state.processed_documents = []
+        if 'passage_index' not in st.session_state:
+            st.session_state.passage_index = None
+        if 'term_sheets' not in st.session_state:
+            st.session_state.term_sheets = []
+        if 'attached_contracts' not in st.session_state:
+            st.session_state.attached_contracts = []
+        if 'near_duplicates' not in st.session_state:
+            st.session_state.near_duplicates = []
     
     async def process_documents(
         self, 
@@ -30,7 +48,7 @@ class DocumentProcessor:
         
         Args:
             query: La requête utilisateur originale
-            files: Liste des fichiers uploadés
+            files: Liste des fichiers uploadés et des contrats du référentiel joints (voir get_repository_contracts)
             use_ocr: Indique si l'OCR doit être utilisé
             
         Returns:
@@ -39,26 +57,94 @@ class DocumentProcessor:
         if not files:
             return query
         
-        # Extraction du texte des documents (simuler async avec sleep)
-        await asyncio.sleep(0)  # Permet à Streamlit de mettre à jour l'interface
-        documents = extract_text_from_multiple_files(files, use_ocr)
+        # L'extraction, l'indexation et les accès au référentiel sont bloquants : ils s'exécutent
+        # dans un thread pour que le routage et les agents puissent avancer pendant ce temps
+        return await run_in_thread(self._process_documents, query, files, use_ocr)
+    
+    def _process_documents(self, query: str, files: List[Any], use_ocr: bool) -> str:
+        """
+        Traite les documents de façon bloquante (voir process_documents).
         
-        # Stocker les documents traités dans la session
-        st.session_state.processed_documents = documents
+        Args:
+            query: La requête utilisateur originale
+            files: Liste des fichiers uploadés et des contrats du référentiel joints
+            use_ocr: Indique si l'OCR doit être utilisé
+            
+        Returns:
+            str: La requête enrichie avec le contenu des documents
+        """
+        uploaded_files = [file for file in files if not isinstance(file, dict)]
+        stored_contracts = [file for file in files if isinstance(file, dict)]
         
-        # Enrichir la requête avec le contenu des documents
-        enhanced_query = query + "\n\n"
-        enhanced_query += "Documents attachés:\n"
+        # Les textes volumineux sont conservés compressés dans la session
+        text_store = get_session_text_store()
+        documents = [
+            Document(doc['name'], text_store.wrap(doc['content']))
+            for doc in extract_text_from_multiple_files(uploaded_files, use_ocr)
+        ]
         
-        for i, doc in enumerate(documents):
-            # Limiter la taille du texte pour éviter les dépassements de capacité des agents
-            doc_content = doc['content']
-            if len(doc_content) > 10000:  # Limiter à environ 10 000 caractères par document
-                doc_content = doc_content[:9800] + "...[CONTENU TRONQUÉ]..."
-            
-            enhanced_query += f"\n--- DOCUMENT {i+1}: {doc['name']} ---\n{doc_content}\n"
+        # Les contrats du référentiel sont repris tels quels, sans nouvelle extraction
+        uploaded_ids = {doc.id for doc in documents}
+        stored_contracts = [contract for contract in stored_contracts if contract['id'] not in uploaded_ids]
+        documents += [
+            Document(contract['name'], text_store.wrap(contract['content']), contract['page_offsets'])
+            for contract in stored_contracts
+        ]
         
-        return enhanced_query
+        # Chaque texte est décompressé une seule fois pour l'indexation, l'extraction des termes et le prompt
+        with open_texts(documents):
+            # Stocker les documents traités dans la session
+            st.session_state.processed_documents = documents
+            
+            # Indexer les clauses pour la recherche de passages pertinents
+            passage_index = PassageIndex()
+            for doc in documents:
+                passage_index.add_document(doc)
+            st.session_state.passage_index = passage_index
+            
+            # Extraire les termes clés, affichés dès la fin du traitement des documents
+            uploaded_documents = documents[:len(uploaded_files)]
+            stored_documents = documents[len(uploaded_files):]
+            term_sheets = extract_term_sheets(uploaded_documents)
+            term_sheets += [
+                {'name': contract['name'], **contract['term_sheet']} if contract['term_sheet']
+                else extract_term_sheets([doc])[0]
+                for contract, doc in zip(stored_contracts, stored_documents)
+            ]
+            st.session_state.term_sheets = term_sheets
+            get_term_store().append(term_sheets[:len(uploaded_files)], uploaded_documents)
+            
+            # Repérer les versions quasi identiques de contrats déjà traités, puis enregistrer
+            # les nouveaux documents dans le référentiel pour les sessions suivantes
+            repository = get_contract_repository()
+            near_duplicate_index = get_near_duplicate_index()
+            near_duplicates = []
+            for doc, sheet in zip(uploaded_documents, term_sheets):
+                if doc.is_error:
+                    near_duplicates.append(None)
+                    continue
+                signature = compute_signature(doc.content)
+                matches = near_duplicate_index.find_similar(signature, NEAR_DUPLICATE_THRESHOLD)
+                near_duplicates.append({'id': matches[0][0], 'similarity': matches[0][1]} if matches else None)
+                repository.add(doc.name, doc.content, {k: v for k, v in sheet.items() if k != 'name'})
+                near_duplicate_index.add(doc.id, signature)
+            near_duplicates += [{'id': doc.id, 'similarity': 1.0} for doc in stored_documents]
+            
+            # Affichés par l'interface (voir ui/layout.py render_document_insights)
+            st.session_state.near_duplicates = near_duplicates
+            
+            # Enrichir la requête avec le contenu des documents
+            enhanced_query = query + "\n\n"
+            enhanced_query += "Documents attachés:\n"
+            
+            for i, doc in enumerate(documents):
+                # Limiter la taille du texte pour éviter les dépassements de capacité des agents.
+                # Les documents plus longs sont analysés intégralement par extraits (voir get_chunks).
+                doc_content = truncate_at_clause_boundary(doc.content, DOCUMENT_MAX_CHARS)
+            
+                enhanced_query += f"\n--- DOCUMENT {i+1}: {doc.name} ---\n{doc_content}\n"
+            
+            return enhanced_query
     
     def get_document_summaries(self) -> List[Dict[str, str]]:
         """
@@ -70,25 +156,102 @@ class DocumentProcessor:
         summaries = []
         
         for doc in st.session_state.get('processed_documents', []):
-            # Créer un aperçu limité à 200 caractères
-            preview = doc['content'][:200] + "..." if len(doc['content']) > 200 else doc['content']
-            
             summaries.append({
-                'name': doc['name'],
-                'preview': preview,
-                'size': f"{len(doc['content'])} caractères"
+                'name': doc.name,
+                'preview': doc.preview(),
+                'size': f"{len(doc)} caractères"
             })
         
         return summaries
     
+    def requires_chunking(self) -> bool:
+        """
+        Indique si au moins un document traité est trop long pour être envoyé en une fois.
+        
+        Returns:
+            bool: True si les documents doivent être analysés par extraits
+        """
+        return any(
+            len(doc) > DOCUMENT_MAX_CHARS
+            for doc in st.session_state.get('processed_documents', [])
+        )
+    
+    def get_chunks(self, max_chars: int = CHUNK_MAX_CHARS) -> List[Dict[str, str]]:
+        """
+        Découpe les documents traités en extraits alignés sur les articles et clauses.
+        
+        Args:
+            max_chars: Taille maximale d'un extrait
+            
+        Returns:
+            List[Dict[str, str]]: Extraits avec nom du document, en-tête et contenu
+        """
+        chunks = []
+        
+        for doc in st.session_state.get('processed_documents', []):
+            for chunk in chunk_text(doc.content, max_chars):
+                chunks.append({
+                    'name': doc.name,
+                    'heading': chunk['heading'],
+                    'content': chunk['content']
+                })
+        
+        return chunks
+    
+    def describe_files(self, files: List[Any]) -> str:
+        """
+        Décrit les fichiers joints à partir de leur nom et de leur taille, sans les extraire.
+        Permet de lancer le routage pendant l'extraction des documents.
+        
+        Args:
+            files: Liste des fichiers uploadés et des contrats du référentiel joints
+            
+        Returns:
+            str: Nom et taille de chaque fichier
+        """
+        if not files:
+            return ""
+        
+        descriptor = "Documents attachés:"
+        for file in files:
+            if isinstance(file, dict):
+                descriptor += f"\n- {file['name']} (contrat du référentiel, {len(file['content'])} caractères)"
+            else:
+                descriptor += f"\n- {file.name} ({file.size / 1024:.0f} Ko)"
+        
+        return descriptor
+    
+    def get_repository_contracts(self, query: str) -> List[Dict[str, Any]]:
+        """
+        Récupère les contrats du référentiel joints à la conversation ou cités par leur nom dans la requête.
+        
+        Args:
+            query: La requête utilisateur
+            
+        Returns:
+            List[Dict[str, Any]]: Les contrats enregistrés (voir ContractRepository.get)
+        """
+        repository = get_contract_repository()
+        contract_ids = list(st.session_state.get('attached_contracts', []))
+        for contract_id in repository.find_referenced(query):
+            if contract_id not in contract_ids:
+                contract_ids.append(contract_id)
+        
+        contracts = [repository.get(contract_id) for contract_id in contract_ids]
+        return [contract for contract in contracts if contract is not None]
+    
     def clear_documents(self) -> None:
         """Efface les documents traités de la session."""
         st.session_state.processed_documents = []
+        st.session_state.passage_index = None
+        st.session_state.term_sheets = []
+        st.session_state.near_duplicates = []
     
     def format_document_for_agent(
         self, 
         document_index: int, 
-        max_length: int = 8000
+        max_length: int = 8000,
+        query: Optional[str] = None
     ) -> Optional[str]:
         """
         Formate un document spécifique pour un agent.
@@ -96,6 +259,7 @@ class DocumentProcessor:
         Args:
             document_index: L'index du document
             max_length: Longueur maximale du contenu
+            query: Requête utilisateur ; si le document est trop long, seules les pages utiles sont extraites
             
         Returns:
             Optional[str]: Le document formaté, ou None si l'index est invalide
@@ -106,13 +270,14 @@ class DocumentProcessor:
             return None
         
         doc = docs[document_index]
-        content = doc['content']
+        content = doc.content
+        if query and len(doc) > max_length and doc.page_count > 1:
+            content = doc.select_pages(doc.pages_for_query(query))
         
-        # Tronquer si nécessaire
-        if len(content) > max_length:
-            content = content[:max_length-100] + "...[CONTENU TRONQUÉ]..."
+        # Tronquer si nécessaire, sans couper une clause en son milieu
+        content = truncate_at_clause_boundary(content, max_length)
         
-        formatted = f"Document: {doc['name']}\n\n{content}"
+        formatted = f"Document: {doc.name}\n\n{content}"
         return formatted
     
     def construct_prompt_with_documents(
@@ -151,7 +316,7 @@ class DocumentProcessor:
             documents_text = ""
             for i in indices:
                 doc = docs[i]
-                documents_text += f"\n--- DOCUMENT {i+1}: {doc['name']} ---\n{doc['content']}\n"
+                documents_text += f"\n--- DOCUMENT {i+1}: {doc.name} ---\n{doc.content}\n"
             
             # Remplacer les placeholders dans le template
             prompt = prompt_template.replace("{{query}}", query)
@@ -162,9 +327,36 @@ class DocumentProcessor:
             for i in indices:
                 doc = docs[i]
                 # Limiter la taille pour éviter les dépassements
-                content = doc['content']
-                if len(content) > 8000:
-                    content = content[:7800] + "...[CONTENU TRONQUÉ]..."
-                prompt += f"\n--- DOCUMENT {i+1}: {doc['name']} ---\n{content}\n"
+                content = truncate_at_clause_boundary(doc.content, CHUNK_MAX_CHARS)
+                prompt += f"\n--- DOCUMENT {i+1}: {doc.name} ---\n{content}\n"
+        
+        return prompt
+    
+    def construct_prompt_with_passages(self, query: str, top_k: int = RETRIEVAL_TOP_K) -> str:
+        """
+        Construit un prompt réduit aux passages des documents les plus pertinents pour la requête.
+        
+        Args:
+            query: La requête utilisateur
+            top_k: Nombre de passages à inclure
+            
+        Returns:
+            str: Le prompt avec le plan des documents et les passages pertinents
+        """
+        passage_index = st.session_state.get('passage_index')
+        
+        if passage_index is None or not passage_index.passages:
+            return query
+        
+        # Plan court des documents pour situer les passages
+        prompt = f"{query}\n\nPlan des documents attachés:"
+        for name, headings in passage_index.outline.items():
+            prompt += f"\n- {name}: " + " | ".join(headings[:30])
+            if len(headings) > 30:
+                prompt += f" | ... ({len(headings) - 30} autres sections)"
+        
+        prompt += "\n\nPassages pertinents:"
+        for passage in passage_index.search(query, top_k):
+            prompt += f"\n--- {passage['name']} ({passage['heading']}) ---\n{passage['content'].strip()}\n"
         
-        return prompt
\ No newline at end of file
+        return prompt
@@ -0,0 +1,152 @@
+"""
+Transmission de la réponse d'un agent à l'agent suivant d'une séquence.
+
+Plutôt que la réponse complète, l'agent suivant peut ne recevoir qu'un extrait structuré,
+un résumé plafonné ou les seules parties dont il déclare avoir besoin : la taille de chaque
+prompt reste alors bornée, quelle que soit la longueur de la séquence.
+"""
+
+import re
+from typing import List, Optional
+
+from core.history_compactor import SENTENCE_END_PATTERN, truncate_to_tokens
+from config.agents import AGENT_HANDOFF_POLICIES, AGENT_HANDOFF_NEEDS
+from config.settings import HANDOFF_DEFAULT_POLICY, HANDOFF_MAX_TOKENS
+
+# Lignes conservées par l'extrait structuré : titres, listes, tableaux et lignes chiffrées
+STRUCTURED_LINE_PATTERN = re.compile(r'^\s*(#|[-*•]\s|\d+[.)]\s|\|)|\d')
+TABLE_SEPARATOR_PATTERN = re.compile(r'^\s*\|?[\s:|-]+\|?\s*$')
+
+HANDOFF_LABELS = {
+    "full": "Tenant compte de cette réponse",
+    "extract": "Tenant compte des éléments clés de cette réponse",
+    "summary": "Tenant compte du résumé de cette réponse",
+    "needs": "Tenant compte des parties utiles de cette réponse"
+}
+
+def get_handoff_policy(agent_key: str) -> str:
+    """
+    Récupère la politique de transmission vers un agent.
+
+    Args:
+        agent_key: La clé de l'agent qui reçoit la réponse
+
+    Returns:
+        str: La politique ('full', 'extract', 'summary' ou 'needs')
+    """
+    return AGENT_HANDOFF_POLICIES.get(agent_key, HANDOFF_DEFAULT_POLICY)
+
+def _paragraphs(text: str) -> List[str]:
+    """
+    Découpe un texte en paragraphes (séparés par des lignes vides).
+
+    Args:
+        text: Le texte
+
+    Returns:
+        List[str]: Les paragraphes non vides
+    """
+    return [paragraph.strip() for paragraph in re.split(r'\n\s*\n', text) if paragraph.strip()]
+
+def summarize_response(response: str, max_tokens: int = HANDOFF_MAX_TOKENS) -> str:
+    """
+    Résume une réponse par les titres et la première phrase de chaque paragraphe.
+
+    Args:
+        response: La réponse de l'agent
+        max_tokens: Taille maximale du résumé
+
+    Returns:
+        str: Le résumé
+    """
+    lines = []
+    for paragraph in _paragraphs(response):
+        first_line, _, rest = paragraph.partition("\n")
+        if first_line.lstrip().startswith("#"):
+            lines.append(first_line.strip())
+            paragraph = rest.strip()
+            if not paragraph:
+                continue
+        lines.append(SENTENCE_END_PATTERN.split(" ".join(paragraph.split()), maxsplit=1)[0])
+    return truncate_to_tokens("\n".join(lines), max_tokens)
+
+def structured_extract(response: str, max_tokens: int = HANDOFF_MAX_TOKENS) -> str:
+    """
+    Extrait d'une réponse ses titres, listes, tableaux et lignes chiffrées.
+    À défaut d'éléments structurés, la réponse est résumée.
+
+    Args:
+        response: La réponse de l'agent
+        max_tokens: Taille maximale de l'extrait
+
+    Returns:
+        str: L'extrait
+    """
+    lines = [
+        line.rstrip() for line in response.splitlines()
+        if STRUCTURED_LINE_PATTERN.search(line) and not TABLE_SEPARATOR_PATTERN.match(line)
+    ]
+    if not lines:
+        return summarize_response(response, max_tokens)
+    return truncate_to_tokens("\n".join(lines), max_tokens)
+
+def extract_needs(response: str, needs: List[str], max_tokens: int = HANDOFF_MAX_TOKENS) -> str:
+    """
+    Extrait d'une réponse les paragraphes qui portent sur les besoins déclarés de l'agent suivant.
+    À défaut de paragraphe pertinent, la réponse est résumée.
+
+    Args:
+        response: La réponse de l'agent
+        needs: Les termes recherchés (en minuscules, éventuellement tronqués : "résili", "pénal"...)
+        max_tokens: Taille maximale de l'extrait
+
+    Returns:
+        str: L'extrait
+    """
+    relevant = [
+        paragraph for paragraph in _paragraphs(response)
+        if any(need in paragraph.lower() for need in needs)
+    ]
+    if not relevant:
+        return summarize_response(response, max_tokens)
+    return truncate_to_tokens("\n\n".join(relevant), max_tokens)
+
+def build_handoff(response: str, policy: str, next_agent: str, max_tokens: int = HANDOFF_MAX_TOKENS) -> str:
+    """
+    Construit la partie d'une réponse transmise à l'agent suivant.
+
+    Args:
+        response: La réponse de l'agent
+        policy: La politique de transmission
+        next_agent: La clé de l'agent suivant
+        max_tokens: Taille maximale de la partie transmise (sauf politique 'full')
+
+    Returns:
+        str: La partie transmise
+    """
+    if policy == "extract":
+        return structured_extract(response, max_tokens)
+    if policy == "summary":
+        return summarize_response(response, max_tokens)
+    if policy == "needs":
+        needs = AGENT_HANDOFF_NEEDS.get(next_agent)
+        return extract_needs(response, needs, max_tokens) if needs else summarize_response(response, max_tokens)
+    return response
+
+def build_handoff_prompt(query: str, handoff: str, policy: str, previous_agent_name: Optional[str] = None) -> str:
+    """
+    Construit le prompt de l'agent suivant : partie transmise de la réponse précédente, puis requête initiale.
+
+    Args:
+        query: La requête initiale (avec le contenu des documents le cas échéant)
+        handoff: La partie transmise de la réponse précédente
+        policy: La politique de transmission appliquée
+        previous_agent_name: Le nom de l'agent précédent
+
+    Returns:
+        str: Le prompt
+    """
+    label = HANDOFF_LABELS.get(policy, HANDOFF_LABELS["full"])
+    if previous_agent_name:
+        label += f" ({previous_agent_name})"
+    return f"{label}: {handoff}\n\nQuestion initiale: {query}"
@@ -0,0 +1,259 @@
+"""
+Compactage de l'historique des conversations : les derniers messages sont repris tels quels,
+les plus anciens sont résumés en arrière-plan dans un résumé courant de taille plafonnée.
+"""
+
+import re
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from core.history_store import AgentHistory, HistoryMessage
+from config.settings import (
+    HISTORY_RECENT_MESSAGES, HISTORY_MESSAGE_MAX_TOKENS, HISTORY_SUMMARY_MAX_TOKENS, HISTORY_SUMMARY_MIN_BATCH
+)
+
+# Estimation grossière du nombre de tokens, sans dépendre du tokenizer du modèle
+CHARS_PER_TOKEN = 4
+
+SENTENCE_END_PATTERN = re.compile(r'(?<=[.!?])\s')
+
+# Les résumés sont générés hors du chemin critique des requêtes
+_summary_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="history-summary")
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estime le nombre de tokens d'un texte.
+
+    Args:
+        text: Le texte
+
+    Returns:
+        int: Le nombre de tokens estimé
+    """
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def truncate_to_tokens(text: str, max_tokens: int, keep_end: bool = False) -> str:
+    """
+    Tronque un texte à un nombre de tokens estimé.
+
+    Args:
+        text: Le texte
+        max_tokens: Nombre maximal de tokens
+        keep_end: Conserver la fin du texte plutôt que son début
+
+    Returns:
+        str: Le texte, tronqué et marqué de "..." s'il dépasse la limite
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    return "..." + text[-max_chars:] if keep_end else text[:max_chars] + "..."
+
+def _role_name(role: str, agent_name: str) -> str:
+    """
+    Libellé d'un message dans le contexte.
+
+    Args:
+        role: Le rôle du message ('user' ou 'assistant')
+        agent_name: Le nom de l'agent
+
+    Returns:
+        str: Le libellé
+    """
+    return "Utilisateur" if role == 'user' else f"Agent {agent_name}"
+
+def extractive_summary(previous_summary: str, messages: List[Tuple[str, str]], max_tokens: int, agent_name: str) -> str:
+    """
+    Résume des messages par leur première phrase, à la suite du résumé précédent.
+    Utilisé tant que le résumé généré n'est pas disponible ou si sa génération échoue.
+
+    Args:
+        previous_summary: Le résumé des échanges antérieurs
+        messages: Rôle et texte des messages à résumer
+        max_tokens: Taille maximale du résumé
+        agent_name: Le nom de l'agent
+
+    Returns:
+        str: Le résumé, dont le début est tronqué s'il dépasse la limite
+    """
+    lines = [previous_summary] if previous_summary else []
+    for role, text in messages:
+        first_sentence = SENTENCE_END_PATTERN.split(" ".join(text.split()), maxsplit=1)[0]
+        lines.append(f"{_role_name(role, agent_name)}: {truncate_to_tokens(first_sentence, 50)}")
+    return truncate_to_tokens("\n".join(lines), max_tokens, keep_end=True)
+
+def _summarize_messages(
+    summarize: Optional[Callable[[str], str]],
+    previous_summary: str,
+    messages: List[Tuple[str, str]],
+    max_tokens: int,
+    agent_name: str
+) -> str:
+    """
+    Intègre des messages au résumé courant (exécuté en arrière-plan).
+
+    Args:
+        summarize: Fonction qui génère un résumé à partir d'un prompt (None pour le résumé extractif)
+        previous_summary: Le résumé des échanges antérieurs
+        messages: Rôle et texte des messages à intégrer
+        max_tokens: Taille maximale du résumé
+        agent_name: Le nom de l'agent
+
+    Returns:
+        str: Le nouveau résumé
+    """
+    if summarize is not None:
+        exchanges = "\n\n".join(f"{_role_name(role, agent_name)}: {text}" for role, text in messages)
+        prompt = (
+            f"Résumez en {max_tokens * 3 // 4} mots au plus la conversation suivante, en conservant "
+            "les décisions, les chiffres, les noms des contrats et les questions en suspens. "
+            "Répondez uniquement par le résumé.\n\n"
+            f"Résumé précédent:\n{previous_summary or 'Aucun'}\n\n"
+            f"Nouveaux échanges:\n{exchanges}"
+        )
+        try:
+            summary = summarize(prompt)
+            if summary and summary.strip() and not summary.startswith("Erreur"):
+                return truncate_to_tokens(summary.strip(), max_tokens, keep_end=True)
+        except Exception as e:
+            print(f"Erreur lors du résumé de l'historique: {str(e)}")
+    return extractive_summary(previous_summary, messages, max_tokens, agent_name)
+
+class HistoryCompactor:
+    """
+    Maintient pour chaque historique (voir core.history_store.AgentHistory) un résumé courant
+    des messages les plus anciens. Les messages résumés sont retirés de l'historique
+    une fois le résumé disponible.
+    """
+
+    def __init__(
+        self,
+        summarize: Optional[Callable[[str], str]] = None,
+        keep_recent: int = HISTORY_RECENT_MESSAGES,
+        summary_max_tokens: int = HISTORY_SUMMARY_MAX_TOKENS,
+        message_max_tokens: int = HISTORY_MESSAGE_MAX_TOKENS,
+        min_batch: int = HISTORY_SUMMARY_MIN_BATCH
+    ):
+        """
+        Initialise le compacteur.
+
+        Args:
+            summarize: Fonction bloquante qui génère un résumé à partir d'un prompt
+                (None pour se contenter du résumé extractif)
+            keep_recent: Nombre de messages récents repris tels quels
+            summary_max_tokens: Taille maximale du résumé courant
+            message_max_tokens: Taille maximale d'un message repris ou résumé
+            min_batch: Nombre minimal d'anciens messages à intégrer pour lancer un résumé ; en deçà,
+                ils sont résumés par leur première phrase dans le contexte (voir build_context)
+        """
+        self.summarize = summarize
+        self.keep_recent = keep_recent
+        self.summary_max_tokens = summary_max_tokens
+        self.message_max_tokens = message_max_tokens
+        self.min_batch = min_batch
+
+    @staticmethod
+    def new_state() -> Dict:
+        """
+        Crée l'état de compactage d'un historique.
+
+        Returns:
+            Dict: Le résumé courant, le résumé en cours de génération et le rang
+            (dans la conversation) du premier message qui n'y est pas intégré
+        """
+        return {'summary': "", 'pending': None, 'pending_until': 0}
+
+    def _message_texts(self, messages: Iterable[HistoryMessage]) -> List[Tuple[str, str]]:
+        """
+        Matérialise le texte des messages, chacun limité à message_max_tokens.
+
+        Args:
+            messages: Les messages de l'historique
+
+        Returns:
+            List[Tuple[str, str]]: Rôle et texte de chaque message
+        """
+        return [
+            (msg.role, truncate_to_tokens(msg.text, self.message_max_tokens))
+            for msg in messages
+        ]
+
+    def _collect(self, state: Dict, messages: AgentHistory) -> None:
+        """
+        Intègre le résumé généré en arrière-plan s'il est prêt et retire les messages résumés.
+
+        Args:
+            state: L'état de compactage de l'historique
+            messages: L'historique (modifié en place)
+        """
+        pending: Optional[Future] = state['pending']
+        if pending is None or not pending.done():
+            return
+        state['summary'] = pending.result()
+        # Les rangs restent valables même si l'historique plein a déjà écarté des messages
+        messages.drop_oldest(state['pending_until'] - messages.start)
+        state['pending'] = None
+
+    def compact(self, state: Dict, messages: AgentHistory, agent_name: str) -> None:
+        """
+        Lance en arrière-plan le résumé des messages qui ne font plus partie des plus récents,
+        par lots d'au moins min_batch messages. Appelé à la construction du contexte (voir build_context),
+        si bien qu'aucun résumé n'est généré tant que le contexte n'est pas demandé.
+
+        Args:
+            state: L'état de compactage de l'historique
+            messages: L'historique (modifié en place)
+            agent_name: Le nom de l'agent
+        """
+        self._collect(state, messages)
+        if state['pending'] is not None:
+            return
+
+        # Chaque résumé coûte une exécution d'agent : attendre qu'un lot de messages soit à intégrer
+        older_count = len(messages) - self.keep_recent
+        if older_count < max(self.min_batch, 1):
+            return
+
+        state['pending_until'] = messages.start + older_count
+        state['pending'] = _summary_executor.submit(
+            _summarize_messages,
+            self.summarize,
+            state['summary'],
+            self._message_texts(messages.first(older_count)),
+            self.summary_max_tokens,
+            agent_name
+        )
+
+    def build_context(self, state: Dict, messages: AgentHistory, agent_name: str, keep_recent: Optional[int] = None) -> str:
+        """
+        Construit le contexte : résumé des échanges anciens puis derniers messages tels quels.
+        Les messages anciens dont le résumé n'est pas encore prêt sont résumés par leur première phrase.
+
+        Args:
+            state: L'état de compactage de l'historique
+            messages: L'historique
+            agent_name: Le nom de l'agent
+            keep_recent: Nombre de messages récents repris tels quels (keep_recent du compacteur par défaut)
+
+        Returns:
+            str: Le contexte formaté, vide si l'historique est vide
+        """
+        self.compact(state, messages, agent_name)
+        if not messages and not state['summary']:
+            return ""
+
+        keep_recent = self.keep_recent if keep_recent is None else keep_recent
+        split = max(len(messages) - keep_recent, 0)
+        summary = state['summary']
+        if split:
+            summary = extractive_summary(
+                summary, self._message_texts(messages.first(split)), self.summary_max_tokens, agent_name
+            )
+
+        context = "Contexte des échanges précédents :\n\n"
+        if summary:
+            context += f"Résumé des échanges plus anciens:\n{summary}\n\n"
+        for role, text in self._message_texts(messages.last(len(messages) - split)):
+            context += f"{_role_name(role, agent_name)}: {text}\n\n"
+
+        return context
@@ -0,0 +1,149 @@
+"""
+Historique borné des échanges avec un agent : tampon circulaire de messages compacts.
+"""
+
+import time
+from collections import deque
+from itertools import islice
+from typing import Any, Dict, Iterator, Optional, Union
+
+from utils.compressed_text import CompressedText, as_text
+from config.settings import HISTORY_MAX_MESSAGES
+
+class HistoryMessage:
+    """
+    Message de l'historique : rôle, contenu (éventuellement compressé) et horodatage.
+    """
+
+    __slots__ = ('role', 'content', 'timestamp')
+
+    def __init__(self, role: str, content: Union[str, CompressedText], timestamp: Optional[float] = None):
+        """
+        Initialise le message.
+
+        Args:
+            role: Le rôle du message ('user' ou 'assistant')
+            content: Le contenu du message, éventuellement compressé
+            timestamp: Horodatage (secondes depuis l'epoch, maintenant par défaut)
+        """
+        self.role = role
+        self.content = content
+        self.timestamp = time.time() if timestamp is None else timestamp
+
+    @property
+    def text(self) -> str:
+        """Texte du message (décompressé s'il est conservé compressé)."""
+        return as_text(self.content)
+
+class AgentHistory:
+    """
+    Historique des échanges avec un agent, borné à max_messages : au-delà,
+    les messages les plus anciens sont écartés. L'ajout est en O(1) et la lecture
+    des derniers messages se fait sans copie.
+    """
+
+    __slots__ = ('_messages', 'start')
+
+    def __init__(self, max_messages: int = HISTORY_MAX_MESSAGES):
+        """
+        Initialise l'historique.
+
+        Args:
+            max_messages: Nombre maximal de messages conservés
+        """
+        self._messages = deque(maxlen=max_messages)
+        # Rang (depuis le début de la conversation) du plus ancien message conservé
+        self.start = 0
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __iter__(self) -> Iterator[HistoryMessage]:
+        return iter(self._messages)
+
+    @property
+    def max_messages(self) -> int:
+        """Nombre maximal de messages conservés."""
+        return self._messages.maxlen
+
+    def append(self, role: str, content: Union[str, CompressedText], timestamp: Optional[float] = None) -> None:
+        """
+        Ajoute un message, en écartant le plus ancien si l'historique est plein.
+
+        Args:
+            role: Le rôle du message
+            content: Le contenu du message
+            timestamp: Horodatage (maintenant par défaut)
+        """
+        if len(self._messages) == self._messages.maxlen:
+            self.start += 1
+        self._messages.append(HistoryMessage(role, content, timestamp))
+
+    def first(self, count: int) -> Iterator[HistoryMessage]:
+        """
+        Parcourt les plus anciens messages conservés, sans copie.
+
+        Args:
+            count: Nombre de messages
+
+        Returns:
+            Iterator[HistoryMessage]: Les messages, du plus ancien au plus récent
+        """
+        return islice(self._messages, max(count, 0))
+
+    def last(self, count: int) -> Iterator[HistoryMessage]:
+        """
+        Parcourt les derniers messages, sans copie.
+
+        Args:
+            count: Nombre de messages
+
+        Returns:
+            Iterator[HistoryMessage]: Les messages, du plus ancien au plus récent
+        """
+        # L'accès par indice est en O(1) près des extrémités d'un deque : seuls les messages lus sont parcourus
+        messages = self._messages
+        size = len(messages)
+        return (messages[i] for i in range(max(size - count, 0), size))
+
+    def drop_oldest(self, count: int) -> None:
+        """
+        Retire les plus anciens messages (par exemple une fois résumés).
+
+        Args:
+            count: Nombre de messages à retirer
+        """
+        for _ in range(min(count, len(self._messages))):
+            self._messages.popleft()
+            self.start += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Sérialise l'historique (textes décompressés).
+
+        Returns:
+            Dict[str, Any]: Taille maximale, rang du premier message et messages [rôle, texte, horodatage]
+        """
+        return {
+            'max_messages': self.max_messages,
+            'start': self.start,
+            'messages': [[msg.role, msg.text, msg.timestamp] for msg in self._messages]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], wrap=None) -> 'AgentHistory':
+        """
+        Reconstruit un historique sérialisé par to_dict.
+
+        Args:
+            data: L'historique sérialisé
+            wrap: Fonction appliquée à chaque texte (par exemple SessionTextStore.wrap pour le compresser)
+
+        Returns:
+            AgentHistory: L'historique
+        """
+        history = cls(data.get('max_messages', HISTORY_MAX_MESSAGES))
+        for role, text, timestamp in data.get('messages', []):
+            history.append(role, wrap(text) if wrap else text, timestamp)
+        history.start = data.get('start', 0)
+        return history
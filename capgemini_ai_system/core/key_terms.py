@@ -0,0 +1,207 @@
+"""
+Extraction locale des termes clés des contrats (dates, montants, durées, préavis, pénalités, parties).
+"""
+
+import re
+import json
+from typing import List, Dict, Any, Optional
+
+MONTHS = {
+    "janvier": 1, "février": 2, "fevrier": 2, "mars": 3, "avril": 4, "mai": 5, "juin": 6,
+    "juillet": 7, "août": 8, "aout": 8, "septembre": 9, "octobre": 10, "novembre": 11,
+    "décembre": 12, "decembre": 12
+}
+
+NUMBER_WORDS = {
+    "un": 1, "une": 1, "deux": 2, "trois": 3, "quatre": 4, "cinq": 5, "six": 6, "sept": 7,
+    "huit": 8, "neuf": 9, "dix": 10, "douze": 12, "quinze": 15, "trente": 30, "soixante": 60
+}
+
+UNIT_DAYS = {"jour": 1, "mois": 30, "semaine": 7, "an": 365, "année": 365, "annee": 365}
+
+# Catégories de contrats fournisseurs et mots-clés associés
+CONTRACT_CATEGORIES = {
+    "logiciel": ["logiciel", "licence", "saas", "éditeur", "progiciel", "abonnement"],
+    "maintenance": ["maintenance", "support", "tierce maintenance", "mco", "dépannage"],
+    "prestations intellectuelles": ["prestation intellectuelle", "conseil", "assistance technique", "régie", "forfait"],
+    "fourniture": ["fourniture", "livraison", "matériel", "équipement", "marchandise"],
+    "transport et logistique": ["transport", "logistique", "entreposage", "fret", "acheminement"]
+}
+
+CURRENCIES = {"€": "EUR", "eur": "EUR", "euro": "EUR", "euros": "EUR", "$": "USD", "usd": "USD",
+              "£": "GBP", "gbp": "GBP", "chf": "CHF"}
+
+_DATE = (
+    r'(?:\d{1,2}[/.-]\d{1,2}[/.-]\d{4}'
+    r'|(?:1er|\d{1,2})\s+(?:' + "|".join(MONTHS) + r')\s+\d{4})'
+)
+_DURATION = (
+    r'(?:\d+|' + "|".join(NUMBER_WORDS) + r')\s*(?:\(\d+\)\s*)?'
+    r'(?:jours?(?:\s+(?:ouvrés|ouvrables|calendaires))?|semaines?|mois|ans|an|années?)\b'
+)
+
+DATE_PATTERN = re.compile(_DATE, re.IGNORECASE)
+AMOUNT_PATTERN = re.compile(
+    r'(?P<value>\d{1,3}(?:[ .\u00a0\u202f]\d{3})+(?:,\d{1,2})?|\d+(?:[.,]\d{1,2})?)\s*'
+    r'(?P<currency>€|EUR\b|euros?\b|USD\b|\$|GBP\b|£|CHF\b)',
+    re.IGNORECASE
+)
+EFFECTIVE_DATE_PATTERN = re.compile(
+    r"(?:prend(?:ra)? effet|entre(?:ra)? en vigueur|date d'effet|à compter du)[^.]{0,60}?(" + _DATE + ")",
+    re.IGNORECASE
+)
+TERM_PATTERN = re.compile(
+    r"(?:durée|conclu|période initiale|pour une période)[^.]{0,80}?(" + _DURATION + ")",
+    re.IGNORECASE
+)
+NOTICE_PATTERN = re.compile(
+    r"préavis[^.]{0,80}?(" + _DURATION + ")|(" + _DURATION + r")[^.]{0,40}?préavis",
+    re.IGNORECASE
+)
+PENALTY_PATTERN = re.compile(r"[^.\n]*pénalit[^.\n]*", re.IGNORECASE)
+PARTY_ALIAS_PATTERN = re.compile(
+    r"ci-après\s+(?:dénommée?s?\s+|désignée?s?\s+)?(?:la\s+|le\s+|l')?[«\"“]\s*([^»\"”]{2,60}?)\s*[»\"”]",
+    re.IGNORECASE
+)
+PARTY_COMPANY_PATTERN = re.compile(
+    r"(?:la société|la sas|la sa|la sarl|société)\s+([A-ZÀ-Ý][\w&'\-]*(?:\s+[A-ZÀ-Ý0-9][\w&'\-]*){0,4})"
+)
+
+def _parse_duration(raw: str) -> Dict[str, Any]:
+    """
+    Convertit une durée textuelle en nombre de jours.
+
+    Args:
+        raw: La durée extraite (ex: "trois (3) mois")
+
+    Returns:
+        Dict[str, Any]: La durée brute et sa valeur approximative en jours
+    """
+    words = re.findall(r"\w+", raw.lower())
+    value = int(words[0]) if words[0].isdigit() else NUMBER_WORDS.get(words[0], 0)
+
+    unit_days = 1
+    for word in words[1:]:
+        days = UNIT_DAYS.get(word) or UNIT_DAYS.get(word.rstrip("s"))
+        if days:
+            unit_days = days
+            break
+
+    return {'raw': " ".join(raw.split()), 'days': value * unit_days}
+
+def _parse_amount(value: str, currency: str) -> Dict[str, Any]:
+    """
+    Convertit un montant textuel en valeur numérique.
+
+    Args:
+        value: Le montant extrait (ex: "1 250 000,50")
+        currency: La devise extraite (ex: "€", "euros")
+
+    Returns:
+        Dict[str, Any]: La valeur et le code de devise
+    """
+    digits = re.sub(r"[ .\u00a0\u202f](?=\d{3}\b)", "", value).replace(",", ".")
+    try:
+        amount = float(digits)
+    except ValueError:
+        amount = None
+    return {'value': amount, 'currency': CURRENCIES.get(currency.lower(), currency.upper())}
+
+def _unique(values: List[Any], limit: int) -> List[Any]:
+    """
+    Déduplique une liste en conservant l'ordre.
+
+    Args:
+        values: Les valeurs à dédupliquer
+        limit: Nombre maximal de valeurs conservées
+
+    Returns:
+        List[Any]: Les premières valeurs distinctes
+    """
+    seen, result = set(), []
+    for value in values:
+        key = json.dumps(value, sort_keys=True, ensure_ascii=False)
+        if key not in seen:
+            seen.add(key)
+            result.append(value)
+        if len(result) >= limit:
+            break
+    return result
+
+def classify_contract(text: str) -> str:
+    """
+    Détermine la catégorie fournisseur d'un contrat à partir de ses mots-clés.
+
+    Args:
+        text: Le texte du contrat
+
+    Returns:
+        str: La catégorie la plus représentée, ou 'autre'
+    """
+    sample = text[:20000].lower()
+    scores = {
+        category: sum(sample.count(keyword) for keyword in keywords)
+        for category, keywords in CONTRACT_CATEGORIES.items()
+    }
+    best = max(scores, key=scores.get)
+    return best if scores[best] > 0 else "autre"
+
+def extract_key_terms(text: str) -> Dict[str, Any]:
+    """
+    Extrait la fiche des termes clés d'un contrat.
+
+    Args:
+        text: Le texte du contrat
+
+    Returns:
+        Dict[str, Any]: Catégorie, parties, date d'effet, durée, préavis, montants, pénalités et dates citées
+    """
+    effective = EFFECTIVE_DATE_PATTERN.search(text)
+    term = TERM_PATTERN.search(text)
+    notice = NOTICE_PATTERN.search(text)
+
+    parties = [match.group(1).strip() for match in PARTY_ALIAS_PATTERN.finditer(text)]
+    parties += [match.group(1).strip() for match in PARTY_COMPANY_PATTERN.finditer(text[:5000])]
+
+    return {
+        'category': classify_contract(text),
+        'parties': _unique(parties, 6),
+        'effective_date': " ".join(effective.group(1).split()) if effective else None,
+        'term': _parse_duration(term.group(1)) if term else None,
+        'notice_period': _parse_duration(notice.group(1) or notice.group(2)) if notice else None,
+        'amounts': _unique(
+            [_parse_amount(m.group('value'), m.group('currency')) for m in AMOUNT_PATTERN.finditer(text)], 10
+        ),
+        'penalties': _unique([" ".join(m.group(0).split())[:200] for m in PENALTY_PATTERN.finditer(text)], 3),
+        'dates': _unique([" ".join(m.group(0).split()) for m in DATE_PATTERN.finditer(text)], 10)
+    }
+
+def extract_term_sheets(documents: List[Any]) -> List[Dict[str, Any]]:
+    """
+    Extrait les fiches de termes clés d'un lot de documents.
+
+    Args:
+        documents: Les documents traités (voir core.document.Document)
+
+    Returns:
+        List[Dict[str, Any]]: Une fiche par document, avec le nom du document
+    """
+    return [{'name': doc.name, **extract_key_terms(doc.content)} for doc in documents]
+
+def format_term_sheets(term_sheets: Optional[List[Dict[str, Any]]]) -> str:
+    """
+    Sérialise les fiches de termes clés en JSON compact pour les prompts.
+
+    Args:
+        term_sheets: Les fiches de termes clés
+
+    Returns:
+        str: Le JSON compact, sans les champs vides
+    """
+    if not term_sheets:
+        return ""
+    compact = [
+        {key: value for key, value in sheet.items() if value not in (None, [], {})}
+        for sheet in term_sheets
+    ]
+    return json.dumps(compact, ensure_ascii=False, separators=(",", ":"))
@@ -0,0 +1,254 @@
+"""
+Détection des contrats quasi identiques (MinHash + LSH) et conservation des analyses pour les réutiliser.
+"""
+
+import os
+import re
+import time
+import zlib
+import sqlite3
+import threading
+import numpy as np
+from typing import List, Dict, Any, Optional, Tuple
+
+from config.settings import CONTRACT_REPOSITORY_PATH
+
+WORD_PATTERN = re.compile(r'\w+')
+
+# Signature MinHash : 128 permutations, découpées en 16 bandes de 8 lignes pour l'index LSH.
+# Deux contrats similaires à 95 % partagent au moins une bande avec une probabilité > 99,9 %.
+NUM_PERMUTATIONS = 128
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+SHINGLE_BLOCK_SIZE = 8192
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_random = np.random.RandomState(1)
+# Coefficients fixes pour que les signatures restent comparables d'un processus à l'autre
+_PERM_A = _random.randint(1, 1 << 32, size=NUM_PERMUTATIONS, dtype=np.uint64)
+_PERM_B = _random.randint(0, 1 << 32, size=NUM_PERMUTATIONS, dtype=np.uint64)
+
+def compute_signature(text: str) -> np.ndarray:
+    """
+    Calcule la signature MinHash d'un contrat à partir de ses trigrammes de mots.
+
+    Args:
+        text: Le texte du contrat
+
+    Returns:
+        np.ndarray: Les NUM_PERMUTATIONS valeurs minimales (uint64)
+    """
+    words = WORD_PATTERN.findall(text.lower())
+    shingles = {" ".join(words[i:i + 3]) for i in range(max(len(words) - 2, 1))}
+    # CRC32 plutôt que hash() : stable entre processus
+    hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+    signature = np.full(NUM_PERMUTATIONS, _MERSENNE_PRIME, dtype=np.uint64)
+    for start in range(0, len(hashes), SHINGLE_BLOCK_SIZE):
+        block = hashes[start:start + SHINGLE_BLOCK_SIZE, np.newaxis]
+        permuted = (block * _PERM_A + _PERM_B) % _MERSENNE_PRIME
+        signature = np.minimum(signature, permuted.min(axis=0))
+    return signature
+
+def estimate_similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """
+    Estime la similarité de Jaccard entre deux contrats à partir de leurs signatures.
+
+    Args:
+        a: Première signature
+        b: Seconde signature
+
+    Returns:
+        float: La similarité estimée entre 0 et 1
+    """
+    return float(np.mean(a == b))
+
+def _band_keys(signature: np.ndarray) -> List[Tuple[int, int]]:
+    """
+    Calcule les clés LSH d'une signature (une par bande).
+
+    Args:
+        signature: La signature MinHash
+
+    Returns:
+        List[Tuple[int, int]]: Paires (numéro de bande, empreinte de la bande)
+    """
+    return [
+        (band, zlib.crc32(signature[band * LSH_ROWS:(band + 1) * LSH_ROWS].tobytes()))
+        for band in range(LSH_BANDS)
+    ]
+
+def _normalize_query(query: str) -> str:
+    """
+    Normalise une requête pour retrouver une analyse précédente de la même demande.
+
+    Args:
+        query: La requête utilisateur
+
+    Returns:
+        str: La requête en minuscules, sans ponctuation ni espaces superflus
+    """
+    return " ".join(WORD_PATTERN.findall(query.lower()))
+
+class NearDuplicateIndex:
+    """
+    Index LSH des signatures MinHash des contrats et analyses déjà produites pour chaque lot de contrats.
+    Stocké dans la base du référentiel de contrats.
+    """
+
+    def __init__(self, db_path: str = CONTRACT_REPOSITORY_PATH):
+        """
+        Initialise l'index.
+
+        Args:
+            db_path: Chemin de la base SQLite (celle du référentiel de contrats)
+        """
+        self.db_path = db_path
+
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS signatures (id TEXT PRIMARY KEY, signature BLOB NOT NULL)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS lsh_buckets (band INTEGER NOT NULL, bucket INTEGER NOT NULL, id TEXT NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_lsh_buckets ON lsh_buckets(band, bucket)")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS analyses (
+                    documents_key TEXT NOT NULL,
+                    agent TEXT NOT NULL,
+                    query_key TEXT NOT NULL,
+                    query TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (documents_key, agent, query_key)
+                )
+                """
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Ouvre une connexion à la base de l'index.
+
+        Returns:
+            sqlite3.Connection: La connexion ouverte
+        """
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def add(self, contract_id: str, signature: np.ndarray) -> None:
+        """
+        Indexe la signature d'un contrat (sans effet s'il est déjà indexé).
+
+        Args:
+            contract_id: L'identifiant du contrat dans le référentiel
+            signature: Sa signature MinHash
+        """
+        try:
+            with self._connect() as conn:
+                inserted = conn.execute(
+                    "INSERT OR IGNORE INTO signatures (id, signature) VALUES (?, ?)",
+                    (contract_id, signature.tobytes())
+                ).rowcount
+                if inserted:
+                    conn.executemany(
+                        "INSERT INTO lsh_buckets (band, bucket, id) VALUES (?, ?, ?)",
+                        [(band, bucket, contract_id) for band, bucket in _band_keys(signature)]
+                    )
+        except sqlite3.Error as e:
+            print(f"Erreur d'écriture dans l'index des quasi-doublons: {str(e)}")
+
+    def find_similar(self, signature: np.ndarray, threshold: float) -> List[Tuple[str, float]]:
+        """
+        Recherche les contrats indexés similaires à une signature.
+
+        Args:
+            signature: La signature MinHash du contrat
+            threshold: Similarité minimale
+
+        Returns:
+            List[Tuple[str, float]]: Identifiants et similarités estimées, du plus similaire au moins similaire
+        """
+        keys = _band_keys(signature)
+        clause = " OR ".join("(band = ? AND bucket = ?)" for _ in keys)
+
+        try:
+            with self._connect() as conn:
+                rows = conn.execute(
+                    f"""
+                    SELECT s.id, s.signature FROM signatures s
+                    WHERE s.id IN (SELECT id FROM lsh_buckets WHERE {clause})
+                    """,
+                    [value for key in keys for value in key]
+                ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Erreur de lecture de l'index des quasi-doublons: {str(e)}")
+            return []
+
+        # Les candidats LSH sont vérifiés sur la signature complète
+        matches = [
+            (contract_id, estimate_similarity(signature, np.frombuffer(blob, dtype=np.uint64)))
+            for contract_id, blob in rows
+        ]
+        return sorted(
+            [(contract_id, similarity) for contract_id, similarity in matches if similarity >= threshold],
+            key=lambda match: match[1],
+            reverse=True
+        )
+
+    def save_analysis(self, contract_ids: List[str], agent: str, query: str, response: str) -> None:
+        """
+        Conserve l'analyse d'un agent sur un lot de contrats.
+
+        Args:
+            contract_ids: Identifiants des contrats analysés, dans l'ordre
+            agent: La clé de l'agent
+            query: La requête utilisateur
+            response: La réponse de l'agent
+        """
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO analyses VALUES (?, ?, ?, ?, ?, ?)",
+                    ("|".join(contract_ids), agent, _normalize_query(query), query, response, time.time())
+                )
+        except sqlite3.Error as e:
+            print(f"Erreur d'enregistrement de l'analyse: {str(e)}")
+
+    def get_analysis(self, contract_ids: List[str], agent: str, query: str) -> Optional[str]:
+        """
+        Récupère l'analyse d'un agent sur un lot de contrats pour la même demande.
+
+        Args:
+            contract_ids: Identifiants des contrats analysés, dans l'ordre
+            agent: La clé de l'agent
+            query: La requête utilisateur
+
+        Returns:
+            Optional[str]: La réponse de l'agent, ou None si aucune analyse n'a été conservée
+        """
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT response FROM analyses WHERE documents_key = ? AND agent = ? AND query_key = ?",
+                    ("|".join(contract_ids), agent, _normalize_query(query))
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        return row[0] if row is not None else None
+
+_near_duplicate_index = None
+_near_duplicate_index_lock = threading.Lock()
+
+def get_near_duplicate_index() -> NearDuplicateIndex:
+    """
+    Obtient l'instance de l'index partagée par le processus.
+
+    Returns:
+        NearDuplicateIndex: L'instance de l'index
+    """
+    global _near_duplicate_index
+    with _near_duplicate_index_lock:
+        if _near_duplicate_index is None:
+            _near_duplicate_index = NearDuplicateIndex()
+        return _near_duplicate_index
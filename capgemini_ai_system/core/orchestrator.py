@@ -2,15 +2,31 @@
 Orchestrateur principal pour coordonner les flux de travail.
 """
 
+import time
 import asyncio
-from typing import Dict, List, Optional, Any
+import functools
+from concurrent.futures import Future
+from contextlib import ExitStack
+from typing import Callable, Dict, List, Optional, Any, Tuple
 import streamlit as st
 
 from core.agent_manager import AgentManager
 from core.thread_manager import ThreadManager
 from core.document_processor import DocumentProcessor
-from config.agents import AGENT_METADATA
-from utils.async_helpers import run_async
+from core.document import open_texts
+from core.context_builder import ContextBuilder
+from core.comparison import ComparisonRunner
+from core.key_terms import format_term_sheets
+from core.near_duplicates import get_near_duplicate_index
+from core.workflow import Workflow, WorkflowStep, WorkflowContext, WorkflowExecutor
+from core.cancellation import get_cancellation_registry, current_request_id
+from integrations.errors import ThreadNotFoundError
+from config.agents import AGENT_METADATA, REUSABLE_ANALYSIS_AGENTS, PREANALYSIS_CACHE_KEY
+from config.settings import (
+    COMPARISON_FANOUT_MIN_DOCUMENTS, PREANALYSIS_MIN_QUERY_CHARS, WORKFLOW_AGENT_MAX_CONCURRENCY, WORKFLOW_AGENT_TIMEOUT,
+    CANCELLATION_POLL_SECONDS
+)
+from utils.async_helpers import run_async, run_in_thread, start_in_thread
 
 class Orchestrator:
     """
@@ -22,6 +38,8 @@ class Orchestrator:
         self.agent_manager = AgentManager()
         self.thread_manager = ThreadManager()
         self.document_processor = DocumentProcessor()
+        self.context_builder = ContextBuilder(self.document_processor)
+        self.comparison_runner = ComparisonRunner(self.agent_manager)
     
     def update_progress(self, text: str, value: float) -> None:
         """
@@ -34,6 +52,667 @@ class Orchestrator:
         st.session_state.progress_text = text
         st.session_state.progress_value = value
         
+    def _get_chunks(self, files: Optional[List[Any]]) -> Optional[List[Dict[str, str]]]:
+        """
+        Récupère les extraits des documents de la requête s'ils sont trop longs pour un seul prompt.
+        
+        Args:
+            files: Liste des fichiers uploadés avec la requête
+            
+        Returns:
+            Optional[List[Dict[str, str]]]: Les extraits, ou None si le prompt complet suffit
+        """
+        if not files or not self.document_processor.requires_chunking():
+            return None
+        return self.document_processor.get_chunks()
+    
+    async def _execute_agent_in_context(self, agent: str, query: str) -> str:
+        """
+        Exécute un agent sur son thread persistant si le mode contexte est activé.
+        Les échanges précédents étant conservés sur le thread, seul le nouveau message lui est envoyé.
+        Le thread est supposé exister ; s'il a expiré, il est remplacé et l'historique lui est
+        transmis sous forme de texte.
+        
+        Args:
+            agent: La clé de l'agent
+            query: La requête à soumettre à l'agent
+            
+        Returns:
+            str: La réponse de l'agent
+        """
+        if not self.thread_manager.is_context_enabled():
+            return await self.agent_manager.execute_agent(agent, query)
+        
+        thread_id = await self.thread_manager.get_thread_for_agent(agent)
+        try:
+            response = await self.agent_manager.execute_agent(agent, query, thread_id)
+        except ThreadNotFoundError:
+            thread_id = await self.thread_manager.replace_thread(agent)
+            context = self.thread_manager.format_history_as_context(agent)
+            if context:
+                query = f"{context}\n\nNouvelle requête: {query}"
+            response = await self.agent_manager.execute_agent(agent, query, thread_id)
+        
+        self.thread_manager.mark_thread_valid(agent)
+        return response
+    
+    def _uses_comparison_fanout(self, agent: str, files: Optional[List[Any]]) -> bool:
+        """
+        Indique si la comparaison doit être répartie en comparaisons par paire de documents.
+        
+        Args:
+            agent: L'agent à exécuter
+            files: Liste des fichiers uploadés avec la requête
+            
+        Returns:
+            bool: True pour une comparaison de N documents par paires
+        """
+        return (
+            agent == "contracts_compare"
+            and not self.context_builder.is_baseline()
+            and bool(files)
+            and len(st.session_state.get('processed_documents', [])) >= COMPARISON_FANOUT_MIN_DOCUMENTS
+        )
+    
+    def _find_prior_analysis(self, agent: str, query: str, files: Optional[List[Any]]) -> Optional[str]:
+        """
+        Recherche une analyse de l'agent produite pour la même demande sur des versions
+        identiques ou quasi identiques de tous les documents de la requête.
+        
+        Args:
+            agent: L'agent à exécuter
+            query: La requête utilisateur, sans documents
+            files: Liste des fichiers uploadés avec la requête
+            
+        Returns:
+            Optional[str]: L'analyse précédente, ou None s'il faut une analyse complète
+        """
+        if self.context_builder.is_baseline():
+            return None
+        matches = st.session_state.get('near_duplicates', [])
+        if agent not in REUSABLE_ANALYSIS_AGENTS or not files or not matches or None in matches:
+            return None
+        return get_near_duplicate_index().get_analysis([match['id'] for match in matches], agent, query)
+    
+    async def _execute_prior_analysis_update(self, agent: str, query: str, prior_analysis: str) -> Tuple[str, str, int]:
+        """
+        Réutilise une analyse précédente, ou la fait mettre à jour à partir des seules différences.
+        
+        Args:
+            agent: L'agent à exécuter
+            query: La requête utilisateur, sans documents
+            prior_analysis: L'analyse produite sur les versions précédentes des documents
+            
+        Returns:
+            Tuple[str, str, int]: La réponse, la politique appliquée et la taille du prompt envoyé
+        """
+        update_query = self.context_builder.build_prior_analysis_update(query, prior_analysis)
+        if update_query is None:
+            return prior_analysis, "reused", 0
+        response = await self.agent_manager.execute_agent(agent, update_query)
+        return response, "diff_update", len(update_query)
+    
+    def _save_analysis(self, agent: str, query: str, response: str, files: Optional[List[Any]]) -> None:
+        """
+        Conserve l'analyse d'un agent pour les prochaines versions quasi identiques des documents.
+        
+        Args:
+            agent: L'agent exécuté
+            query: La requête utilisateur, sans documents
+            response: La réponse de l'agent
+            files: Liste des fichiers uploadés avec la requête
+        """
+        if agent in REUSABLE_ANALYSIS_AGENTS and files and not response.startswith("Erreur"):
+            document_ids = [doc.id for doc in st.session_state.get('processed_documents', [])]
+            get_near_duplicate_index().save_analysis(document_ids, agent, query, response)
+    
+    async def _get_preanalysis(self, query: str, files: Optional[List[Any]], selected_agents: List[str]) -> Tuple[Optional[str], str]:
+        """
+        Obtient l'analyse préliminaire de qualité transmise aux agents sélectionnés.
+        Elle est ignorée lorsqu'aucun agent ne la recevrait (requête sans documents, agents
+        sans contexte documentaire) ou pour une requête courte, et réutilisée si elle a déjà
+        été produite pour la même requête sur les mêmes documents (dans cette session ou une autre).
+        
+        Args:
+            query: La requête utilisateur, sans documents
+            files: Liste des fichiers uploadés avec la requête
+            selected_agents: Les agents sélectionnés
+            
+        Returns:
+            Tuple[Optional[str], str]: L'analyse (None si ignorée ou en erreur) et son origine
+            ('skipped', 'cached' ou 'computed')
+        """
+        if (
+            "quality" in selected_agents
+            or not files
+            or len(query.strip()) < PREANALYSIS_MIN_QUERY_CHARS
+            or all(self.context_builder.get_policy(agent) == "question" for agent in selected_agents)
+        ):
+            return None, "skipped"
+        
+        document_ids = [doc.id for doc in st.session_state.get('processed_documents', [])]
+        near_duplicate_index = get_near_duplicate_index()
+        analysis = near_duplicate_index.get_analysis(document_ids, PREANALYSIS_CACHE_KEY, query)
+        if analysis is not None and not self.context_builder.is_baseline():
+            return analysis, "cached"
+        
+        self.update_progress("Analyse préliminaire de qualité...", 0.4)
+        preanalysis_query = self.document_processor.construct_prompt_with_passages(query)
+        term_sheets = format_term_sheets(st.session_state.get('term_sheets'))
+        if term_sheets:
+            preanalysis_query += f"\n\nTermes clés extraits (JSON): {term_sheets}"
+        analysis = await self.agent_manager.execute_quality_analysis(preanalysis_query)
+        if analysis is not None and not analysis.startswith("Erreur"):
+            near_duplicate_index.save_analysis(document_ids, PREANALYSIS_CACHE_KEY, query, analysis)
+        return analysis, "computed"
+    
+    async def _documents_step(self, ctx: WorkflowContext) -> str:
+        """
+        Étape de traitement des documents joints à la requête.
+        
+        Args:
+            ctx: Le contexte du workflow (entrées 'query', 'files', 'ocr_enabled')
+            
+        Returns:
+            str: La requête avec le contenu des documents (la requête seule sans documents)
+        """
+        query, files = ctx.inputs['query'], ctx.inputs.get('files')
+        if not files:
+            return query
+        self.update_progress("Traitement des documents...", 0.1)
+        return await self.document_processor.process_documents(query, files, ctx.inputs.get('ocr_enabled', False))
+    
+    async def _routing_step(self, ctx: WorkflowContext) -> Tuple[List[str], str, str]:
+        """
+        Étape de sélection des agents, sur la requête et les noms des fichiers seuls :
+        elle s'exécute pendant le traitement des documents.
+        
+        Args:
+            ctx: Le contexte du workflow
+            
+        Returns:
+            Tuple[List[str], str, str]: Liste des agents, méthode de sélection, réponse brute du router
+        """
+        self.update_progress("Analyse de votre requête...", 0.2)
+        return await self.agent_manager.determine_agents(
+            ctx.inputs['query'], self.document_processor.describe_files(ctx.inputs.get('files'))
+        )
+    
+    async def _preanalysis_step(self, ctx: WorkflowContext) -> Tuple[Optional[str], str]:
+        """
+        Étape d'analyse préliminaire de qualité (voir _get_preanalysis).
+        
+        Args:
+            ctx: Le contexte du workflow
+            
+        Returns:
+            Tuple[Optional[str], str]: L'analyse et son origine
+        """
+        selected_agents = ctx.results['routing'][0]
+        self.update_progress(
+            f"Agents sélectionnés: {', '.join(AGENT_METADATA[agent]['name'] for agent in selected_agents)}", 
+            0.3
+        )
+        return await self._get_preanalysis(ctx.inputs['query'], ctx.inputs.get('files'), selected_agents)
+    
+    def _record_latency(
+        self, context_kind: str, elapsed_seconds: float, with_documents: bool
+    ) -> Dict[str, Tuple[float, int]]:
+        """
+        Enregistre la latence d'une requête avec documents selon le contexte envoyé aux agents
+        et calcule la latence moyenne de chaque contexte dans la session.
+        
+        Args:
+            context_kind: 'reduced' (contexte minimal de chaque agent) ou 'baseline' (documents complets)
+            elapsed_seconds: La latence de bout en bout de la requête
+            with_documents: Indique si la requête joignait des documents (seules ces requêtes sont mesurées)
+            
+        Returns:
+            Dict[str, Tuple[float, int]]: Latence moyenne et nombre de requêtes, par contexte
+        """
+        samples = st.session_state.setdefault('latency_samples', {})
+        if with_documents:
+            samples.setdefault(context_kind, []).append(elapsed_seconds)
+        return {
+            kind: (round(sum(values) / len(values), 2), len(values))
+            for kind, values in samples.items() if values
+        }
+    
+    def _needs_documents(self, agent: str) -> bool:
+        """
+        Indique si un agent a besoin des documents traités (tous sauf ceux de politique 'question').
+        
+        Args:
+            agent: L'agent
+            
+        Returns:
+            bool: True si l'agent doit attendre le traitement des documents
+        """
+        return self.context_builder.get_policy(agent) != "question"
+    
+    def _question_agents(self, ctx: WorkflowContext) -> List[str]:
+        """
+        Agents sélectionnés qui ne reçoivent que la question.
+        
+        Args:
+            ctx: Le contexte du workflow
+            
+        Returns:
+            List[str]: Les agents
+        """
+        return [agent for agent in ctx.results['routing'][0] if not self._needs_documents(agent)]
+    
+    def _document_agents(self, ctx: WorkflowContext) -> List[str]:
+        """
+        Agents sélectionnés qui ont besoin des documents traités.
+        
+        Args:
+            ctx: Le contexte du workflow
+            
+        Returns:
+            List[str]: Les agents
+        """
+        return [agent for agent in ctx.results['routing'][0] if self._needs_documents(agent)]
+    
+    async def _intelligent_agent_step(self, ctx: WorkflowContext, agent: str) -> Tuple[str, str, int]:
+        """
+        Étape d'exécution d'un agent sélectionné, avec le contexte minimal dont il a besoin.
+        
+        Args:
+            ctx: Le contexte du workflow
+            agent: L'agent à exécuter
+            
+        Returns:
+            Tuple[str, str, int]: La réponse, la politique de contexte appliquée et la taille du prompt envoyé
+        """
+        query, files = ctx.inputs['query'], ctx.inputs.get('files')
+        selected_agents = ctx.results['routing'][0]
+        
+        self.update_progress(
+            f"{AGENT_METADATA[agent]['icon']} {AGENT_METADATA[agent]['name']}: Traitement...", 
+            0.5 + (selected_agents.index(agent) / len(selected_agents) * 0.4)
+        )
+        
+        if not self._needs_documents(agent):
+            # L'agent ne reçoit que la question : il n'attend pas le traitement des documents
+            response = await self._execute_agent_in_context(agent, query)
+            if self.thread_manager.is_context_enabled():
+                self.thread_manager.add_to_history(agent, 'user', query)
+                self.thread_manager.add_to_history(agent, 'assistant', response)
+            return response, "question", len(query)
+        
+        processed_query = ctx.results['documents']
+        context = (ctx.results.get('preanalysis') or (None, "skipped"))[0]
+        policy = self.context_builder.get_policy(agent) if files else "question"
+        agent_context = context if policy != "question" else None
+        
+        # Les documents trop longs sont analysés intégralement par extraits (politique "full")
+        chunks = self._get_chunks(files)
+        prior_analysis = self._find_prior_analysis(agent, query, files)
+        if prior_analysis is not None:
+            response, policy, prompt_size = await self._execute_prior_analysis_update(agent, query, prior_analysis)
+        elif self._uses_comparison_fanout(agent, files):
+            response = await self.comparison_runner.compare_documents(
+                query, st.session_state.processed_documents, agent_context
+            )
+            prompt_size = self.comparison_runner.last_prompt_chars
+            policy = "pairwise"
+        elif policy == "full" and chunks:
+            base_query = query
+            if agent_context:
+                base_query = f"En tenant compte de cette analyse: {agent_context}\n\n{query}"
+            prompt_size = len(base_query) + sum(len(chunk['content']) for chunk in chunks)
+            response = await self.agent_manager.execute_agent_map_reduce(agent, base_query, chunks)
+        else:
+            agent_query = self.context_builder.build_agent_query(agent, query, processed_query, agent_context)
+            prompt_size = len(agent_query)
+            response = await self._execute_agent_in_context(agent, agent_query)
+        self._save_analysis(agent, query, response, files)
+        
+        # Sauvegarder dans l'historique si le mode contexte est activé
+        if self.thread_manager.is_context_enabled():
+            self.thread_manager.add_to_history(agent, 'user', processed_query)
+            self.thread_manager.add_to_history(agent, 'assistant', response)
+        
+        return response, policy, prompt_size
+    
+    async def _intelligent_result_step(self, ctx: WorkflowContext) -> Dict[str, Any]:
+        """
+        Étape de combinaison des réponses des agents sélectionnés.
+        
+        Args:
+            ctx: Le contexte du workflow
+            
+        Returns:
+            Dict[str, Any]: Résultat d'orchestration avec réponses des agents
+        """
+        selected_agents, selection_method, router_response = ctx.results['routing']
+        if not selected_agents:
+            return {
+                "error": "Aucun agent approprié n'a pu être identifié pour cette requête."
+            }
+        
+        self.update_progress("Finalisation des résultats...", 0.9)
+        elapsed_seconds = round(time.perf_counter() - ctx.started_at, 2)
+        context_kind = "baseline" if self.context_builder.is_baseline() else "reduced"
+        outputs = {
+            **dict(zip(self._question_agents(ctx), ctx.results['question_agents'])),
+            **dict(zip(self._document_agents(ctx), ctx.results['agents']))
+        }
+        responses = {agent: response for agent, (response, _, _) in outputs.items()}
+        combined_response = ""
+        for agent in selected_agents:
+            combined_response += f"{AGENT_METADATA[agent]['name']}:\n{responses[agent]}\n\n"
+        
+        self.update_progress("Traitement terminé", 1.0)
+        return {
+            "selected_agents": selected_agents,
+            "agent_names": [AGENT_METADATA[agent]['name'] for agent in selected_agents],
+            "agent_icons": [AGENT_METADATA[agent]['icon'] for agent in selected_agents],
+            "combined": combined_response,
+            "selection_method": selection_method,
+            "router_response": router_response,
+            "metrics": {
+                "policies": {agent: policy for agent, (_, policy, _) in outputs.items()},
+                "preanalysis": (ctx.results.get('preanalysis') or (None, "skipped"))[1],
+                "full_prompt_chars": len(ctx.results['documents']) * len(selected_agents),
+                "prompt_chars": sum(prompt_size for _, _, prompt_size in outputs.values()),
+                "elapsed_seconds": elapsed_seconds,
+                "context": context_kind,
+                "latency": self._record_latency(context_kind, elapsed_seconds, bool(ctx.inputs.get('files')))
+            },
+            **responses
+        }
+    
+    def build_intelligent_workflow(self) -> Workflow:
+        """
+        Workflow d'orchestration intelligente : traitement des documents et routage en parallèle,
+        analyse préliminaire de qualité si elle est utile, agents sélectionnés en parallèle, puis combinaison.
+        Les agents qui ne reçoivent que la question démarrent dès le routage, sans attendre les documents.
+        
+        Returns:
+            Workflow: Le workflow
+        """
+        def agent_error(agent: str, error: Exception) -> Tuple[str, str, int]:
+            # Un agent en échec n'empêche pas de combiner les réponses des autres
+            return f"Erreur: {str(error)}", "failed", 0
+        
+        return Workflow("intelligent", [
+            WorkflowStep("documents", self._documents_step),
+            WorkflowStep("routing", self._routing_step),
+            WorkflowStep(
+                "preanalysis", self._preanalysis_step, depends_on=["documents", "routing"],
+                when=lambda ctx: bool(self._document_agents(ctx)), timeout=WORKFLOW_AGENT_TIMEOUT, required=False
+            ),
+            WorkflowStep(
+                "question_agents", self._intelligent_agent_step, depends_on=["routing"],
+                fan_out=self._question_agents, max_concurrency=WORKFLOW_AGENT_MAX_CONCURRENCY,
+                timeout=WORKFLOW_AGENT_TIMEOUT, on_item_error=agent_error
+            ),
+            WorkflowStep(
+                "agents", self._intelligent_agent_step, depends_on=["documents", "routing", "preanalysis"],
+                fan_out=self._document_agents, max_concurrency=WORKFLOW_AGENT_MAX_CONCURRENCY,
+                timeout=WORKFLOW_AGENT_TIMEOUT, on_item_error=agent_error
+            ),
+            WorkflowStep("result", self._intelligent_result_step, depends_on=["question_agents", "agents"])
+        ])
+    
+    async def _sequence_hop_step(
+        self,
+        ctx: WorkflowContext,
+        agent: str,
+        previous_agent: Optional[str],
+        previous_step: Optional[str],
+        handoff_policy: Optional[str]
+    ) -> Dict[str, Any]:
+        """
+        Étape d'une séquence : l'agent reçoit la requête et la partie de la réponse précédente
+        prévue par sa politique de transmission.
+        
+        Args:
+            ctx: Le contexte du workflow
+            agent: L'agent de l'étape
+            previous_agent: L'agent de l'étape précédente (None pour la première étape)
+            previous_step: Le nom de l'étape précédente (None pour la première étape)
+            handoff_policy: Politique de transmission imposée (celle de l'agent si None)
+            
+        Returns:
+            Dict[str, Any]: La réponse et les tailles de prompt de l'étape
+        """
+        # Documents trop longs : chaque agent les analyse par extraits
+        chunks = self._get_chunks(ctx.inputs.get('files'))
+        query = ctx.inputs['query'] if chunks else ctx.results['documents']
+        chunks_chars = sum(len(chunk['content']) for chunk in chunks) if chunks else 0
+        previous_response = ctx.results[previous_step]['response'] if previous_step else None
+        
+        prompt, policy, full_prompt_chars = self.agent_manager.prepare_sequence_hop(
+            query, agent, previous_agent, previous_response, handoff_policy
+        )
+        self.update_progress(f"{AGENT_METADATA[agent]['icon']} {AGENT_METADATA[agent]['name']}: Traitement...", 0.5)
+        if chunks:
+            response = await self.agent_manager.execute_agent_map_reduce(agent, prompt, chunks)
+        else:
+            response = await self.agent_manager.execute_agent(agent, prompt)
+        
+        return {
+            'response': response,
+            'hop': {
+                'agent': agent,
+                'policy': policy,
+                'prompt_chars': len(prompt) + chunks_chars,
+                'full_prompt_chars': full_prompt_chars + chunks_chars
+            }
+        }
+    
+    async def _sequence_result_step(self, ctx: WorkflowContext, sequence: List[str]) -> Dict[str, Any]:
+        """
+        Étape de combinaison des réponses d'une séquence.
+        
+        Args:
+            ctx: Le contexte du workflow
+            sequence: La séquence d'agents
+            
+        Returns:
+            Dict[str, Any]: Résultat d'orchestration avec réponses des agents
+        """
+        outputs = [ctx.results[self._sequence_step_name(index, agent)] for index, agent in enumerate(sequence)]
+        hops = [output['hop'] for output in outputs]
+        # Un agent présent plusieurs fois dans la séquence est représenté par sa dernière réponse
+        responses = {agent: output['response'] for agent, output in zip(sequence, outputs)}
+        
+        combined_response = ""
+        for agent, output in zip(sequence, outputs):
+            combined_response += f"{AGENT_METADATA[agent]['name']}:\n{output['response']}\n\n"
+        
+        self.update_progress("Traitement terminé", 1.0)
+        return {
+            "selected_agents": sequence,
+            "agent_names": [AGENT_METADATA[agent]['name'] for agent in sequence],
+            "agent_icons": [AGENT_METADATA[agent]['icon'] for agent in sequence],
+            "combined": combined_response,
+            "metrics": {
+                "hops": hops,
+                "full_prompt_chars": sum(hop['full_prompt_chars'] for hop in hops),
+                "prompt_chars": sum(hop['prompt_chars'] for hop in hops),
+                "elapsed_seconds": round(time.perf_counter() - ctx.started_at, 2)
+            },
+            **responses
+        }
+    
+    @staticmethod
+    def _sequence_step_name(index: int, agent: str) -> str:
+        """
+        Nom de l'étape d'une séquence (par position : un agent peut y figurer plusieurs fois).
+        
+        Args:
+            index: La position de l'étape dans la séquence
+            agent: L'agent de l'étape
+            
+        Returns:
+            str: Le nom de l'étape
+        """
+        return f"hop:{index}:{agent}"
+    
+    def build_sequential_workflow(self, sequence: List[str], handoff_policy: Optional[str] = None) -> Workflow:
+        """
+        Workflow séquentiel : traitement des documents, puis chaque agent à la suite du précédent.
+        
+        Args:
+            sequence: Séquence d'agents à exécuter
+            handoff_policy: Politique de transmission entre agents (celle de chaque agent si None)
+            
+        Returns:
+            Workflow: Le workflow
+        """
+        steps = [WorkflowStep("documents", self._documents_step)]
+        previous_agent, previous_step = None, None
+        for index, agent in enumerate(sequence):
+            step_name = self._sequence_step_name(index, agent)
+            steps.append(WorkflowStep(
+                step_name,
+                lambda ctx, agent=agent, previous_agent=previous_agent, previous_step=previous_step: self._sequence_hop_step(
+                    ctx, agent, previous_agent, previous_step, handoff_policy
+                ),
+                depends_on=[previous_step or "documents"],
+                timeout=WORKFLOW_AGENT_TIMEOUT
+            ))
+            previous_agent, previous_step = agent, step_name
+        steps.append(WorkflowStep(
+            "result", lambda ctx: self._sequence_result_step(ctx, sequence), depends_on=[previous_step]
+        ))
+        return Workflow("sequence", steps)
+    
+    async def _single_agent_step(self, ctx: WorkflowContext, agent: str) -> str:
+        """
+        Étape d'exécution de l'agent unique.
+        
+        Args:
+            ctx: Le contexte du workflow
+            agent: L'agent à utiliser
+            
+        Returns:
+            str: La réponse de l'agent
+        """
+        query, files = ctx.inputs['query'], ctx.inputs.get('files')
+        processed_query = ctx.results['documents']
+        
+        self.update_progress(
+            f"{AGENT_METADATA[agent]['icon']} {AGENT_METADATA[agent]['name']}: Traitement...", 
+            0.5
+        )
+        
+        # Les analyses par paires ou par extraits s'exécutent sur des threads éphémères :
+        # l'historique leur est transmis sous forme de texte si le mode contexte est activé
+        base_query = query
+        if self.thread_manager.is_context_enabled():
+            context = self.thread_manager.format_history_as_context(agent)
+            if context:
+                base_query = f"{context}\n\nNouvelle requête: {query}"
+        
+        # Plusieurs contrats à comparer : comparaisons par paire en parallèle ;
+        # documents trop longs : analyse intégrale par extraits
+        chunks = self._get_chunks(files)
+        prior_analysis = self._find_prior_analysis(agent, query, files)
+        if prior_analysis is not None:
+            response, _, _ = await self._execute_prior_analysis_update(agent, query, prior_analysis)
+        elif self._uses_comparison_fanout(agent, files):
+            response = await self.comparison_runner.compare_documents(base_query, st.session_state.processed_documents)
+        elif chunks:
+            response = await self.agent_manager.execute_agent_map_reduce(agent, base_query, chunks)
+        else:
+            # Le thread persistant de l'agent contient déjà les échanges précédents
+            response = await self._execute_agent_in_context(agent, processed_query)
+        self._save_analysis(agent, query, response, files)
+        
+        # Sauvegarder dans l'historique si le mode contexte est activé
+        if self.thread_manager.is_context_enabled():
+            self.thread_manager.add_to_history(agent, 'user', query)
+            self.thread_manager.add_to_history(agent, 'assistant', response)
+        
+        return response
+    
+    async def _single_agent_result_step(self, ctx: WorkflowContext, agent: str) -> Dict[str, Any]:
+        """
+        Étape de mise en forme de la réponse de l'agent unique.
+        
+        Args:
+            ctx: Le contexte du workflow
+            agent: L'agent utilisé
+            
+        Returns:
+            Dict[str, Any]: Résultat d'orchestration avec réponse de l'agent
+        """
+        response = ctx.results['agent']
+        self.update_progress("Traitement terminé", 1.0)
+        return {
+            "selected_agent": agent,
+            "agent_name": AGENT_METADATA[agent]['name'],
+            "agent_icon": AGENT_METADATA[agent]['icon'],
+            "combined": response,
+            agent: response
+        }
+    
+    def build_single_agent_workflow(self, agent: str) -> Workflow:
+        """
+        Workflow avec un agent unique : traitement des documents, puis exécution de l'agent.
+        
+        Args:
+            agent: Agent à utiliser
+            
+        Returns:
+            Workflow: Le workflow
+        """
+        return Workflow("single", [
+            WorkflowStep("documents", self._documents_step),
+            WorkflowStep(
+                "agent", lambda ctx: self._single_agent_step(ctx, agent), depends_on=["documents"],
+                timeout=WORKFLOW_AGENT_TIMEOUT
+            ),
+            WorkflowStep("result", lambda ctx: self._single_agent_result_step(ctx, agent), depends_on=["agent"])
+        ])
+    
+    async def _with_repository_contracts(self, query: str, files: Optional[List[Any]]) -> List[Any]:
+        """
+        Joint aux fichiers uploadés les contrats du référentiel sélectionnés ou cités dans la requête.
+        Appelé dans le workflow protégé de chaque mode : une erreur du référentiel devient une erreur d'orchestration.
+        
+        Args:
+            query: Requête utilisateur
+            files: Liste des fichiers uploadés
+            
+        Returns:
+            List[Any]: Les fichiers uploadés suivis des contrats du référentiel
+        """
+        return list(files or []) + await run_in_thread(self.document_processor.get_repository_contracts, query)
+    
+    async def run_workflow(self, workflow: Workflow, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Exécute un workflow (intégré ou personnalisé) et ajoute à son résultat la durée de chaque étape.
+        
+        Args:
+            workflow: Le workflow, dont l'étape de sortie retourne le résultat d'orchestration
+            inputs: Les entrées du workflow ('query', 'files', 'ocr_enabled'...)
+            
+        Returns:
+            Dict[str, Any]: Résultat d'orchestration
+            
+        Raises:
+            WorkflowStepError: Si une étape obligatoire échoue
+        """
+        with ExitStack() as texts:
+            def on_step(name: str, timing: Dict[str, Any]) -> None:
+                # Les textes des documents sont décompressés une seule fois pour toutes les étapes suivantes
+                if name == "documents":
+                    texts.enter_context(open_texts(st.session_state.get('processed_documents', [])))
+            
+            context = await WorkflowExecutor(on_step).run(workflow, inputs)
+        result = context.results[workflow.output]
+        if isinstance(result, dict) and "error" not in result:
+            metrics = result.setdefault("metrics", {})
+            metrics["steps"] = context.timings
+            metrics.setdefault("elapsed_seconds", round(time.perf_counter() - context.started_at, 2))
+        return result
+    
     async def orchestrate_intelligent_workflow(
         self, 
         query: str, 
@@ -41,7 +720,7 @@ class Orchestrator:
         ocr_enabled: bool = False
     ) -> Dict[str, Any]:
         """
-        Exécute le workflow d'orchestration intelligente.
+        Exécute le workflow d'orchestration intelligente (voir build_intelligent_workflow).
         
         Args:
             query: Requête utilisateur
@@ -52,74 +731,11 @@ class Orchestrator:
             Dict[str, Any]: Résultat d'orchestration avec réponses des agents
         """
         try:
-            # Traitement des documents
-            if files:
-                self.update_progress("Traitement des documents...", 0.1)
-                processed_query = await self.document_processor.process_documents(query, files, ocr_enabled)
-            else:
-                processed_query = query
-                
-            # Détermination des agents appropriés
-            self.update_progress("Analyse de votre requête...", 0.2)
-            selected_agents, selection_method, router_response = await self.agent_manager.determine_agents(processed_query)
-            
-            if not selected_agents:
-                return {
-                    "error": "Aucun agent approprié n'a pu être identifié pour cette requête."
-                }
-                
-            self.update_progress(
-                f"Agents sélectionnés: {', '.join(AGENT_METADATA[agent]['name'] for agent in selected_agents)}", 
-                0.3
+            files = await self._with_repository_contracts(query, files)
+            return await self.run_workflow(
+                self.build_intelligent_workflow(),
+                {"query": query, "files": files, "ocr_enabled": ocr_enabled}
             )
-            
-            # Exécution préliminaire de l'agent Qualité si nécessaire
-            context = None
-            if "quality" not in selected_agents:
-                self.update_progress("Analyse préliminaire de qualité...", 0.4)
-                context = await self.agent_manager.execute_quality_analysis(processed_query)
-            
-            # Exécution des agents sélectionnés
-            responses = {}
-            for i, agent in enumerate(selected_agents):
-                progress = 0.5 + (i / len(selected_agents) * 0.4)
-                self.update_progress(
-                    f"{AGENT_METADATA[agent]['icon']} {AGENT_METADATA[agent]['name']}: Traitement...", 
-                    progress
-                )
-                
-                agent_query = processed_query
-                if context:
-                    agent_query = f"En tenant compte de cette analyse: {context}\n\n{processed_query}"
-                
-                response = await self.agent_manager.execute_agent(agent, agent_query)
-                responses[agent] = response
-                
-                # Sauvegarder dans l'historique si le mode contexte est activé
-                if self.thread_manager.is_context_enabled():
-                    self.thread_manager.add_to_history(agent, 'user', processed_query)
-                    self.thread_manager.add_to_history(agent, 'assistant', response)
-            
-            # Combinaison des réponses
-            self.update_progress("Finalisation des résultats...", 0.9)
-            combined_response = ""
-            for agent in selected_agents:
-                combined_response += f"{AGENT_METADATA[agent]['name']}:\n{responses[agent]}\n\n"
-            
-            # Formatage du résultat final
-            self.update_progress("Traitement terminé", 1.0)
-            result = {
-                "selected_agents": selected_agents,
-                "agent_names": [AGENT_METADATA[agent]['name'] for agent in selected_agents],
-                "agent_icons": [AGENT_METADATA[agent]['icon'] for agent in selected_agents],
-                "combined": combined_response,
-                "selection_method": selection_method,
-                "router_response": router_response,
-                **responses
-            }
-            
-            return result
-            
         except Exception as e:
             return {"error": f"Erreur d'orchestration: {str(e)}"}
     
@@ -128,16 +744,18 @@ class Orchestrator:
         query: str, 
         sequence: List[str],
         files: Optional[List[Any]] = None,
-        ocr_enabled: bool = False
+        ocr_enabled: bool = False,
+        handoff_policy: Optional[str] = None
     ) -> Dict[str, Any]:
         """
-        Exécute un workflow séquentiel avec les agents spécifiés.
+        Exécute un workflow séquentiel avec les agents spécifiés (voir build_sequential_workflow).
         
         Args:
             query: Requête utilisateur
             sequence: Séquence d'agents à exécuter
             files: Liste des fichiers uploadés
             ocr_enabled: Indique si l'OCR est activé
+            handoff_policy: Politique de transmission entre agents (celle de chaque agent si None)
             
         Returns:
             Dict[str, Any]: Résultat d'orchestration avec réponses des agents
@@ -151,29 +769,11 @@ class Orchestrator:
                 if agent not in AGENT_METADATA:
                     return {"error": f"Agent inconnu dans la séquence: {agent}"}
             
-            # Traitement des documents
-            if files:
-                self.update_progress("Traitement des documents...", 0.1)
-                processed_query = await self.document_processor.process_documents(query, files, ocr_enabled)
-            else:
-                processed_query = query
-            
-            # Exécution séquentielle
-            responses = await self.agent_manager.execute_agents_in_sequence(processed_query, sequence)
-            
-            # Combinaison des réponses
-            combined_response = ""
-            for agent in sequence:
-                combined_response += f"{AGENT_METADATA[agent]['name']}:\n{responses[agent]}\n\n"
-            
-            self.update_progress("Traitement terminé", 1.0)
-            return {
-                "selected_agents": sequence,
-                "agent_names": [AGENT_METADATA[agent]['name'] for agent in sequence],
-                "agent_icons": [AGENT_METADATA[agent]['icon'] for agent in sequence],
-                "combined": combined_response,
-                **responses
-            }
+            files = await self._with_repository_contracts(query, files)
+            return await self.run_workflow(
+                self.build_sequential_workflow(sequence, handoff_policy),
+                {"query": query, "files": files, "ocr_enabled": ocr_enabled}
+            )
             
         except Exception as e:
             return {"error": f"Erreur d'orchestration séquentielle: {str(e)}"}
@@ -186,7 +786,7 @@ class Orchestrator:
         ocr_enabled: bool = False
     ) -> Dict[str, Any]:
         """
-        Exécute un workflow avec un agent unique.
+        Exécute un workflow avec un agent unique (voir build_single_agent_workflow).
         
         Args:
             query: Requête utilisateur
@@ -202,44 +802,76 @@ class Orchestrator:
             if agent not in AGENT_METADATA:
                 return {"error": f"Agent inconnu: {agent}"}
             
-            # Traitement des documents
-            if files:
-                self.update_progress("Traitement des documents...", 0.1)
-                processed_query = await self.document_processor.process_documents(query, files, ocr_enabled)
-            else:
-                processed_query = query
-            
-            # Exécution de l'agent
-            self.update_progress(
-                f"{AGENT_METADATA[agent]['icon']} {AGENT_METADATA[agent]['name']}: Traitement...", 
-                0.5
+            files = await self._with_repository_contracts(query, files)
+            return await self.run_workflow(
+                self.build_single_agent_workflow(agent),
+                {"query": query, "files": files, "ocr_enabled": ocr_enabled}
             )
             
-            # Récupérer l'historique si le mode contexte est activé
-            if self.thread_manager.is_context_enabled():
-                context = self.thread_manager.format_history_as_context(agent)
-                if context:
-                    processed_query = f"{context}\n\nNouvelle requête: {processed_query}"
-            
-            response = await self.agent_manager.execute_agent(agent, processed_query)
-            
-            # Sauvegarder dans l'historique si le mode contexte est activé
-            if self.thread_manager.is_context_enabled():
-                self.thread_manager.add_to_history(agent, 'user', query)
-                self.thread_manager.add_to_history(agent, 'assistant', response)
-            
-            self.update_progress("Traitement terminé", 1.0)
-            return {
-                "selected_agent": agent,
-                "agent_name": AGENT_METADATA[agent]['name'],
-                "agent_icon": AGENT_METADATA[agent]['icon'],
-                "combined": response,
-                agent: response
-            }
-            
         except Exception as e:
             return {"error": f"Erreur d'exécution de l'agent {agent}: {str(e)}"}
     
+    async def _run_cancellable(
+        self,
+        coroutine: Any,
+        request_id: Optional[str] = None,
+        heartbeat: Optional[Callable[[], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Exécute une orchestration dans une tâche que cancel() peut annuler.
+        
+        Args:
+            coroutine: L'orchestration
+            request_id: L'identifiant de la requête (orchestration non annulable si None)
+            heartbeat: Fonction appelée régulièrement pendant l'exécution (rafraîchissement de l'interface) ;
+                si elle lève une exception, l'orchestration est annulée et l'exception propagée
+            
+        Returns:
+            Dict[str, Any]: Résultat d'orchestration ('cancelled' à True si la requête a été annulée)
+        """
+        registry = get_cancellation_registry()
+        # Les exécutions lancées par la tâche (et ses sous-tâches) sont rattachées à la requête
+        token = current_request_id.set(request_id)
+        try:
+            task = asyncio.ensure_future(coroutine)
+        finally:
+            current_request_id.reset(token)
+        if request_id is not None:
+            registry.attach(request_id, task)
+        
+        try:
+            while not task.done():
+                await asyncio.wait({task}, timeout=CANCELLATION_POLL_SECONDS)
+                if heartbeat is not None and not task.done():
+                    heartbeat()
+        except BaseException:
+            # Interruption de l'appelant (y compris son annulation) : annuler l'orchestration
+            # et ses exécutions distantes avant de propager
+            task.cancel()
+            await asyncio.wait({task})
+            raise
+        finally:
+            if request_id is not None:
+                registry.detach(request_id)
+        
+        # Seule l'annulation de la requête elle-même (voir cancel) donne un résultat annulé
+        if task.cancelled():
+            return {"error": "Requête annulée.", "cancelled": True}
+        return task.result()
+    
+    def cancel(self, request_id: str) -> bool:
+        """
+        Annule une requête en cours : ses tâches asyncio et, côté service, les exécutions des agents.
+        Peut être appelé depuis n'importe quel thread (par exemple une autre exécution du script).
+        
+        Args:
+            request_id: L'identifiant de la requête
+            
+        Returns:
+            bool: True si la requête était en cours
+        """
+        return get_cancellation_registry().cancel(request_id)
+    
     def orchestrate(
         self, 
         query: str, 
@@ -247,7 +879,10 @@ class Orchestrator:
         agent_sequence: Optional[List[str]] = None,
         single_agent: Optional[str] = None,
         files: Optional[List[Any]] = None,
-        ocr_enabled: bool = False
+        ocr_enabled: bool = False,
+        handoff_policy: Optional[str] = None,
+        request_id: Optional[str] = None,
+        heartbeat: Optional[Callable[[], None]] = None
     ) -> Dict[str, Any]:
         """
         Point d'entrée principal pour l'orchestration basée sur le mode.
@@ -259,19 +894,37 @@ class Orchestrator:
             single_agent: Agent unique pour le mode 'single'
             files: Liste des fichiers uploadés
             ocr_enabled: Indique si l'OCR est activé
+            handoff_policy: Politique de transmission entre agents pour le mode 'sequence'
+            request_id: Identifiant de la requête, qui permet de l'annuler (voir cancel)
+            heartbeat: Fonction appelée régulièrement pendant l'exécution (voir _run_cancellable)
             
         Returns:
             Dict[str, Any]: Résultat d'orchestration
         """
         if mode == "intelligent":
-            return run_async(self.orchestrate_intelligent_workflow(query, files, ocr_enabled))
+            coroutine = self.orchestrate_intelligent_workflow(query, files, ocr_enabled)
         elif mode == "sequence":
             if not agent_sequence:
                 return {"error": "Séquence d'agents non spécifiée pour le mode séquentiel."}
-            return run_async(self.orchestrate_sequential_workflow(query, agent_sequence, files, ocr_enabled))
+            coroutine = self.orchestrate_sequential_workflow(query, agent_sequence, files, ocr_enabled, handoff_policy)
         elif mode == "single":
             if not single_agent:
                 return {"error": "Agent non spécifié pour le mode agent unique."}
-            return run_async(self.orchestrate_single_agent(query, single_agent, files, ocr_enabled))
+            coroutine = self.orchestrate_single_agent(query, single_agent, files, ocr_enabled)
         else:
-            return {"error": f"Mode d'orchestration non reconnu: {mode}"}
\ No newline at end of file
+            return {"error": f"Mode d'orchestration non reconnu: {mode}"}
+        
+        return run_async(self._run_cancellable(coroutine, request_id, heartbeat))
+    
+    def submit(self, **orchestration_args: Any) -> Future:
+        """
+        Lance l'orchestration dans un thread d'arrière-plan, qu'une nouvelle exécution du script
+        Streamlit n'interrompt pas : la requête se poursuit jusqu'à son terme ou jusqu'à cancel().
+        
+        Args:
+            **orchestration_args: Les arguments d'orchestrate
+            
+        Returns:
+            Future: Le résultat d'orchestration
+        """
+        return start_in_thread(functools.partial(self.orchestrate, **orchestration_args))
@@ -0,0 +1,146 @@
+"""
+Index local de passages (BM25) construit sur les clauses des documents de la session.
+"""
+
+import re
+import math
+import unicodedata
+from collections import Counter, defaultdict
+from typing import List, Dict, Any
+
+from core.chunking import split_clause_spans
+from config.settings import PASSAGE_MAX_CHARS
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Mots vides français ignorés à l'indexation
+STOPWORDS = {
+    "le", "la", "les", "un", "une", "des", "du", "de", "d", "l", "et", "ou", "a", "au", "aux",
+    "en", "dans", "par", "pour", "sur", "avec", "sans", "ce", "cet", "cette", "ces", "qui", "que",
+    "quoi", "dont", "est", "sont", "sera", "seront", "etre", "il", "elle", "ils", "elles", "se",
+    "sa", "son", "ses", "leur", "leurs", "ne", "pas", "plus", "tout", "tous", "toute", "toutes",
+    "y", "s", "n", "c", "qu", "j", "m", "t", "nous", "vous", "je", "tu", "on", "ainsi", "comme"
+}
+
+def tokenize(text: str) -> List[str]:
+    """
+    Découpe un texte en termes normalisés (minuscules, sans accents, sans pluriel simple).
+
+    Args:
+        text: Le texte à découper
+
+    Returns:
+        List[str]: Les termes indexables
+    """
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text):
+        if token in STOPWORDS or len(token) < 2:
+            continue
+        if len(token) > 3 and token[-1] in "sx":
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+class PassageIndex:
+    """
+    Index inversé BM25 sur les clauses des documents traités. Les passages sont repérés par
+    leurs positions dans le texte de leur document, extrait seulement pour les passages retenus.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        Initialise un index vide.
+
+        Args:
+            k1: Paramètre de saturation de la fréquence des termes
+            b: Paramètre de normalisation par la longueur des passages
+        """
+        self.k1 = k1
+        self.b = b
+        self.passages = []
+        self.postings = defaultdict(list)
+        self.outline = {}
+        self.total_length = 0
+
+    def add_document(self, document: Any, max_chars: int = PASSAGE_MAX_CHARS) -> None:
+        """
+        Indexe les clauses d'un document.
+
+        Args:
+            document: Le document (core.document.Document)
+            max_chars: Taille maximale d'un passage
+        """
+        text = document.content
+        headings = []
+
+        for start, end, heading in split_clause_spans(text, max_chars):
+            passage_id = len(self.passages)
+            term_counts = Counter(tokenize(text[start:end]))
+            length = sum(term_counts.values())
+
+            self.passages.append({
+                'document': document,
+                'name': document.name,
+                'heading': heading,
+                'start': start,
+                'end': end,
+                'length': length
+            })
+            self.total_length += length
+            for term, count in term_counts.items():
+                self.postings[term].append((passage_id, count))
+
+            if not headings or headings[-1] != heading:
+                headings.append(heading)
+
+        self.outline[document.name] = headings
+
+    def search(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+        """
+        Recherche les passages les plus pertinents pour une requête.
+
+        Args:
+            query: La requête utilisateur
+            top_k: Nombre maximal de passages retournés
+
+        Returns:
+            List[Dict[str, Any]]: Passages retenus (avec leur contenu), dans l'ordre des documents
+        """
+        if not self.passages:
+            return []
+
+        passage_count = len(self.passages)
+        average_length = self.total_length / passage_count or 1
+        scores = defaultdict(float)
+
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (passage_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for passage_id, count in postings:
+                length_norm = 1 - self.b + self.b * self.passages[passage_id]['length'] / average_length
+                scores[passage_id] += idf * count * (self.k1 + 1) / (count + self.k1 * length_norm)
+
+        # Sans terme commun, le début des documents reste le contexte le plus utile
+        if scores:
+            best = sorted(scores, key=scores.get, reverse=True)[:top_k]
+        else:
+            best = range(min(top_k, passage_count))
+        # Texte de chaque document lu une seule fois
+        texts = {}
+        results = []
+        for passage_id in sorted(best):
+            passage = self.passages[passage_id]
+            document = passage['document']
+            if id(document) not in texts:
+                texts[id(document)] = document.content
+            results.append({
+                **passage,
+                'content': texts[id(document)][passage['start']:passage['end']],
+                'score': scores[passage_id]
+            })
+        return results
@@ -0,0 +1,264 @@
+"""
+Entrepôt colonnaire des termes clés de tous les contrats traités, pour les statistiques de marché.
+"""
+
+import os
+import glob
+import time
+import uuid
+import threading
+import numpy as np
+from typing import List, Dict, Any, Optional
+
+from core.key_terms import CONTRACT_CATEGORIES
+from config.settings import TERM_STORE_DIR, TERM_STORE_MAX_SEGMENTS
+
+# Schéma : une colonne NumPy par champ
+CATEGORIES = list(CONTRACT_CATEGORIES) + ["autre"]
+CURRENCY_CODES = ["EUR", "USD", "GBP", "CHF"]
+COLUMNS = {
+    'contract_id': 'S64',      # SHA-256 du texte du contrat
+    'category': 'i1',          # Indice dans CATEGORIES
+    'notice_days': 'f4',       # Préavis en jours (NaN si absent)
+    'term_days': 'f4',         # Durée en jours (NaN si absente)
+    'amount': 'f8',            # Montant le plus élevé du contrat (NaN si absent)
+    'currency': 'i1',          # Indice dans CURRENCY_CODES (-1 si inconnue)
+    'added_at': 'f8'           # Horodatage d'ajout
+}
+
+class TermStore:
+    """
+    Stocke les fiches de termes clés sous forme de colonnes NumPy ajoutées par segments.
+    Chaque ajout écrit un nouveau segment (écriture atomique, sans conflit entre processus) ;
+    les doublons sont éliminés à la lecture en gardant la version la plus récente d'un contrat.
+    """
+
+    def __init__(self, store_dir: str = TERM_STORE_DIR):
+        """
+        Initialise l'entrepôt.
+
+        Args:
+            store_dir: Répertoire des segments
+        """
+        self.store_dir = store_dir
+        self._columns = None
+        self._loaded_segments = None
+        self._lock = threading.Lock()
+        os.makedirs(store_dir, exist_ok=True)
+
+    def _segment_paths(self) -> List[str]:
+        """
+        Liste les segments de l'entrepôt.
+
+        Returns:
+            List[str]: Chemins des segments, du plus ancien au plus récent
+        """
+        return sorted(glob.glob(os.path.join(self.store_dir, "segment-*.npz")))
+
+    def _write_segment(self, columns: Dict[str, np.ndarray]) -> None:
+        """
+        Écrit un segment de manière atomique.
+
+        Args:
+            columns: Colonnes du segment
+        """
+        name = f"segment-{time.time():017.6f}-{uuid.uuid4().hex[:8]}"
+        tmp_path = os.path.join(self.store_dir, f".{name}.tmp.npz")
+        np.savez(tmp_path, **columns)
+        os.replace(tmp_path, os.path.join(self.store_dir, f"{name}.npz"))
+
+    def append(self, term_sheets: List[Dict[str, Any]], documents: List[Any]) -> None:
+        """
+        Ajoute les fiches de termes clés d'un lot de documents.
+
+        Args:
+            term_sheets: Fiches de termes clés (voir core.key_terms)
+            documents: Documents correspondants (voir core.document.Document)
+        """
+        if not term_sheets:
+            return
+
+        rows = {name: [] for name in COLUMNS}
+        now = time.time()
+
+        for sheet, doc in zip(term_sheets, documents):
+            amounts = [a for a in sheet.get('amounts', []) if a['value'] is not None]
+            largest = max(amounts, key=lambda a: a['value']) if amounts else None
+
+            rows['contract_id'].append(doc.id)
+            rows['category'].append(CATEGORIES.index(sheet.get('category', 'autre')) if sheet.get('category') in CATEGORIES else len(CATEGORIES) - 1)
+            rows['notice_days'].append((sheet.get('notice_period') or {}).get('days', np.nan))
+            rows['term_days'].append((sheet.get('term') or {}).get('days', np.nan))
+            rows['amount'].append(largest['value'] if largest else np.nan)
+            rows['currency'].append(CURRENCY_CODES.index(largest['currency']) if largest and largest['currency'] in CURRENCY_CODES else -1)
+            rows['added_at'].append(now)
+
+        self._write_segment({name: np.array(values, dtype=COLUMNS[name]) for name, values in rows.items()})
+
+        if len(self._segment_paths()) > TERM_STORE_MAX_SEGMENTS:
+            self.compact()
+
+    def _load(self) -> Dict[str, np.ndarray]:
+        """
+        Charge les colonnes de l'entrepôt (avec cache tant que les segments ne changent pas).
+
+        Returns:
+            Dict[str, np.ndarray]: Les colonnes dédupliquées par contrat
+        """
+        with self._lock:
+            paths = self._segment_paths()
+            if self._columns is not None and paths == self._loaded_segments:
+                return self._columns
+
+            parts = {name: [] for name in COLUMNS}
+            for path in paths:
+                try:
+                    with np.load(path) as segment:
+                        for name in COLUMNS:
+                            parts[name].append(segment[name])
+                except (OSError, ValueError, KeyError):
+                    # Segment supprimé par une compaction concurrente
+                    continue
+
+            columns = {
+                name: np.concatenate(arrays) if arrays else np.empty(0, dtype=COLUMNS[name])
+                for name, arrays in parts.items()
+            }
+
+            # Dédupliquer en gardant l'ajout le plus récent de chaque contrat
+            if len(columns['contract_id']):
+                order = np.argsort(columns['added_at'], kind='stable')[::-1]
+                _, first = np.unique(columns['contract_id'][order], return_index=True)
+                keep = np.sort(order[first])
+                columns = {name: values[keep] for name, values in columns.items()}
+
+            self._columns = columns
+            self._loaded_segments = paths
+            return columns
+
+    def compact(self) -> None:
+        """Fusionne tous les segments en un seul."""
+        paths = self._segment_paths()
+        columns = self._load()
+        self._write_segment(columns)
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def count(self) -> int:
+        """
+        Compte les contrats de l'entrepôt.
+
+        Returns:
+            int: Le nombre de contrats distincts
+        """
+        return len(self._load()['contract_id'])
+
+    def median_by_category(self, column: str) -> Dict[str, float]:
+        """
+        Calcule la médiane d'une colonne numérique par catégorie de fournisseur.
+
+        Args:
+            column: Colonne à agréger ('notice_days', 'term_days' ou 'amount')
+
+        Returns:
+            Dict[str, float]: Médiane par catégorie (catégories sans valeur omises)
+        """
+        columns = self._load()
+        values = columns[column].astype('f8')
+        codes = columns['category']
+        valid = ~np.isnan(values)
+        values, codes = values[valid], codes[valid]
+
+        if not len(values):
+            return {}
+
+        # Regroupement vectorisé : tri par catégorie puis découpage aux changements de code
+        order = np.argsort(codes, kind='stable')
+        codes, values = codes[order], values[order]
+        boundaries = np.flatnonzero(np.diff(codes)) + 1
+        return {
+            CATEGORIES[group_codes[0]]: float(np.median(group_values))
+            for group_codes, group_values in zip(np.split(codes, boundaries), np.split(values, boundaries))
+        }
+
+    def percentiles(
+        self,
+        column: str,
+        percentiles: List[float] = (10, 25, 50, 75, 90),
+        category: Optional[str] = None,
+        currency: Optional[str] = None
+    ) -> Dict[float, float]:
+        """
+        Calcule les percentiles d'une colonne numérique.
+
+        Args:
+            column: Colonne à agréger
+            percentiles: Percentiles à calculer
+            category: Catégorie de fournisseur à filtrer (toutes si None)
+            currency: Devise à filtrer pour les montants (toutes si None)
+
+        Returns:
+            Dict[float, float]: Valeur de chaque percentile (vide si aucune donnée)
+        """
+        columns = self._load()
+        values = columns[column].astype('f8')
+        mask = ~np.isnan(values)
+        if category is not None:
+            mask &= columns['category'] == CATEGORIES.index(category)
+        if currency is not None:
+            mask &= columns['currency'] == CURRENCY_CODES.index(currency)
+
+        if not mask.any():
+            return {}
+        return dict(zip(percentiles, np.percentile(values[mask], percentiles).tolist()))
+
+    def statistics_table(self, categories: Optional[List[str]] = None) -> str:
+        """
+        Construit un tableau compact des statistiques de marché par catégorie.
+
+        Args:
+            categories: Catégories à inclure (toutes si None)
+
+        Returns:
+            str: Tableau Markdown (vide si l'entrepôt est vide)
+        """
+        columns = self._load()
+        if not len(columns['contract_id']):
+            return ""
+
+        counts = np.bincount(columns['category'], minlength=len(CATEGORIES))
+        notice = self.median_by_category('notice_days')
+        term = self.median_by_category('term_days')
+
+        table = (
+            "| Catégorie | Contrats | Préavis médian (j) | Durée médiane (j) | Montant P25 / P50 / P75 (EUR) |\n"
+            "|-----------|----------|--------------------|-------------------|-------------------------------|\n"
+        )
+        for code, category in enumerate(CATEGORIES):
+            if counts[code] == 0 or (categories and category not in categories):
+                continue
+            amounts = self.percentiles('amount', (25, 50, 75), category=category, currency="EUR")
+            amount_text = " / ".join(f"{value:,.0f}".replace(",", " ") for value in amounts.values()) or "-"
+            notice_text = f"{notice[category]:.0f}" if category in notice else "-"
+            term_text = f"{term[category]:.0f}" if category in term else "-"
+            table += f"| {category} | {counts[code]} | {notice_text} | {term_text} | {amount_text} |\n"
+        return table
+
+_term_store = None
+_term_store_lock = threading.Lock()
+
+def get_term_store() -> TermStore:
+    """
+    Obtient l'instance de l'entrepôt partagée par le processus.
+
+    Returns:
+        TermStore: L'instance de l'entrepôt
+    """
+    global _term_store
+    with _term_store_lock:
+        if _term_store is None:
+            _term_store = TermStore()
+        return _term_store
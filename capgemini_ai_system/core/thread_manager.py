@@ -3,11 +3,19 @@ Gestionnaire des threads de conversation pour les agents.
 """
 
 import streamlit as st
-from typing import Dict, Optional, List, Any
+from typing import Dict, Optional, List, Any, Iterator
 import datetime
+import time
+import asyncio
 
-from integrations.azure_client import AzureAIFoundryClient
-from config.agents import AGENT_IDS, AGENT_METADATA
+from integrations.azure_client import AzureAIFoundryClient, get_agent_client
+from integrations.thread_registry import get_thread_registry
+from config.agents import AGENT_IDS, AGENT_METADATA, HISTORY_SUMMARY_AGENT
+from config.settings import THREAD_VALIDATION_TTL_SECONDS
+from utils.compressed_text import get_session_text_store
+from core.history_compactor import HistoryCompactor
+from core.history_store import AgentHistory, HistoryMessage
+from core.agent_manager import AgentManager
 
 class ThreadManager:
     """
@@ -26,6 +34,12 @@ class ThreadManager:
             st.session_state.thread_history = {}
         if 'thread_timestamps' not in st.session_state:
             st.session_state.thread_timestamps = {}
+        if 'thread_validated_at' not in st.session_state:
+            st.session_state.thread_validated_at = {}
+        if 'history_summaries' not in st.session_state:
+            st.session_state.history_summaries = {}
+        
+        self.compactor = HistoryCompactor(summarize=self._summarize)
     
     async def _get_client(self) -> AzureAIFoundryClient:
         """
@@ -35,9 +49,69 @@ class ThreadManager:
             AzureAIFoundryClient: Une instance du client
         """
         if self.client is None:
-            self.client = AzureAIFoundryClient()
+            self.client = get_agent_client()
         return self.client
     
+    def _summarize(self, prompt: str) -> str:
+        """
+        Fait résumer l'historique par l'agent de résumé (exécuté en arrière-plan par le compacteur).
+        
+        Args:
+            prompt: La demande de résumé
+            
+        Returns:
+            str: Le résumé
+        """
+        return asyncio.run(self._run_summary(prompt))
+    
+    async def _run_summary(self, prompt: str) -> str:
+        """
+        Exécute l'agent de résumé dans un thread dédié, supprimé ensuite.
+        
+        Args:
+            prompt: La demande de résumé
+            
+        Returns:
+            str: Le résumé
+        """
+        client = await self._get_client()
+        thread_id = await client.create_thread()
+        try:
+            return await AgentManager().execute_agent(HISTORY_SUMMARY_AGENT, prompt, thread_id)
+        finally:
+            try:
+                await client.delete_thread(thread_id)
+                get_thread_registry().forget([thread_id])
+            except Exception as e:
+                # Le thread reste enregistré : le ramasseur le supprimera (voir core/thread_reaper.py)
+                print(f"Erreur lors de la suppression du thread de résumé {thread_id}: {str(e)}")
+    
+    def _agent_name(self, agent_key: str) -> str:
+        """
+        Nom de l'agent affiché dans le contexte.
+        
+        Args:
+            agent_key: La clé de l'agent
+            
+        Returns:
+            str: Le nom de l'agent
+        """
+        return AGENT_METADATA.get(agent_key, {}).get('name', 'Assistant')
+    
+    def _summary_state(self, agent_key: str) -> dict:
+        """
+        Récupère l'état de compactage de l'historique d'un agent.
+        
+        Args:
+            agent_key: La clé de l'agent
+            
+        Returns:
+            dict: Le résumé courant et le résumé en cours de génération
+        """
+        if agent_key not in st.session_state.history_summaries:
+            st.session_state.history_summaries[agent_key] = HistoryCompactor.new_state()
+        return st.session_state.history_summaries[agent_key]
+    
     async def get_thread_for_agent(self, agent_key: str, create_if_missing: bool = True) -> Optional[str]:
         """
         Obtient l'ID du thread associé à un agent.
@@ -54,28 +128,75 @@ class ThreadManager:
         if agent_key in st.session_state.agent_threads:
             thread_id = st.session_state.agent_threads[agent_key]
             
-            # Vérifier si le thread existe toujours dans Azure
+            # Un thread utilisé récemment est supposé exister encore : s'il a expiré entre-temps,
+            # l'exécution échoue avec ThreadNotFoundError et il est remplacé (voir replace_thread)
+            validated_at = st.session_state.thread_validated_at.get(agent_key)
+            if validated_at is not None and time.monotonic() - validated_at < THREAD_VALIDATION_TTL_SECONDS:
+                st.session_state.thread_timestamps[agent_key] = datetime.datetime.now()
+                return thread_id
+            
+            # Au-delà, vérifier si le thread existe toujours dans Azure
             client = await self._get_client()
             thread_exists = await client.get_thread(thread_id)
             
             if thread_exists:
                 # Mettre à jour le timestamp
                 st.session_state.thread_timestamps[agent_key] = datetime.datetime.now()
+                self.mark_thread_valid(agent_key)
                 return thread_id
         
         # Créer un nouveau thread si nécessaire
         if create_if_missing:
-            client = await self._get_client()
-            thread_id = await client.create_thread()
-            
-            st.session_state.agent_threads[agent_key] = thread_id
-            st.session_state.thread_timestamps[agent_key] = datetime.datetime.now()
-            st.session_state.thread_history[agent_key] = []
-            
+            thread_id = await self._create_thread(agent_key)
+            st.session_state.thread_history[agent_key] = AgentHistory()
+            st.session_state.history_summaries.pop(agent_key, None)
             return thread_id
         
         return None
     
+    async def _create_thread(self, agent_key: str) -> str:
+        """
+        Crée un thread pour un agent et l'enregistre dans la session.
+        
+        Args:
+            agent_key: La clé de l'agent
+            
+        Returns:
+            str: L'ID du thread créé
+        """
+        client = await self._get_client()
+        thread_id = await client.create_thread()
+        
+        st.session_state.agent_threads[agent_key] = thread_id
+        st.session_state.thread_timestamps[agent_key] = datetime.datetime.now()
+        self.mark_thread_valid(agent_key)
+        
+        return thread_id
+    
+    async def replace_thread(self, agent_key: str) -> str:
+        """
+        Remplace le thread d'un agent qui n'existe plus côté service.
+        L'historique local est conservé pour être renvoyé sous forme de texte sur le nouveau thread.
+        
+        Args:
+            agent_key: La clé de l'agent
+            
+        Returns:
+            str: L'ID du nouveau thread
+        """
+        return await self._create_thread(agent_key)
+    
+    def mark_thread_valid(self, agent_key: str) -> None:
+        """
+        Enregistre que le thread d'un agent existe (création, vérification ou exécution réussie).
+        Le thread est conservé PERSISTENT_THREAD_RETENTION_SECONDS après sa dernière utilisation.
+        
+        Args:
+            agent_key: La clé de l'agent
+        """
+        st.session_state.thread_validated_at[agent_key] = time.monotonic()
+        get_thread_registry().record(st.session_state.agent_threads[agent_key], persistent=True)
+    
     def reset_thread(self, agent_key: str) -> None:
         """
         Réinitialise le thread pour un agent spécifique.
@@ -89,12 +210,16 @@ class ThreadManager:
             del st.session_state.thread_history[agent_key]
         if agent_key in st.session_state.thread_timestamps:
             del st.session_state.thread_timestamps[agent_key]
+        st.session_state.thread_validated_at.pop(agent_key, None)
+        st.session_state.history_summaries.pop(agent_key, None)
     
     def reset_all_threads(self) -> None:
         """Réinitialise tous les threads de conversation."""
         st.session_state.agent_threads = {}
         st.session_state.thread_history = {}
         st.session_state.thread_timestamps = {}
+        st.session_state.thread_validated_at = {}
+        st.session_state.history_summaries = {}
     
     def add_to_history(self, agent_key: str, role: str, content: str) -> None:
         """
@@ -106,57 +231,48 @@ class ThreadManager:
             content: Le contenu du message
         """
         if agent_key not in st.session_state.thread_history:
-            st.session_state.thread_history[agent_key] = []
+            st.session_state.thread_history[agent_key] = AgentHistory()
         
-        st.session_state.thread_history[agent_key].append({
-            'role': role,
-            'content': content,
-            'timestamp': datetime.datetime.now()
-        })
-        
-        # Limiter la taille de l'historique (garder les 10 derniers messages)
-        if len(st.session_state.thread_history[agent_key]) > 10:
-            st.session_state.thread_history[agent_key] = st.session_state.thread_history[agent_key][-10:]
+        # Le résumé des messages anciens n'est généré qu'à la construction du contexte de secours
+        # (voir format_history_as_context) : le thread persistant de l'agent contient déjà la conversation
+        st.session_state.thread_history[agent_key].append(role, get_session_text_store().wrap(content))
     
-    def get_history(self, agent_key: str, max_messages: int = 5) -> List[Dict]:
+    def get_history(self, agent_key: str, max_messages: int = 5) -> Iterator[HistoryMessage]:
         """
-        Récupère l'historique des messages pour un agent.
+        Récupère les derniers messages de l'historique d'un agent, sans copie.
         
         Args:
             agent_key: La clé de l'agent
             max_messages: Nombre maximum de messages à récupérer
             
         Returns:
-            List[Dict]: Liste des messages d'historique
+            Iterator[HistoryMessage]: Les derniers messages, du plus ancien au plus récent
         """
         if agent_key not in st.session_state.thread_history:
-            return []
+            return iter(())
         
-        # Retourner les n derniers messages
-        return st.session_state.thread_history[agent_key][-max_messages:]
+        return st.session_state.thread_history[agent_key].last(max_messages)
     
-    def format_history_as_context(self, agent_key: str, max_messages: int = 3) -> str:
+    def format_history_as_context(self, agent_key: str, max_messages: Optional[int] = None) -> str:
         """
-        Formate l'historique des messages comme contexte pour un agent.
+        Formate l'historique des messages comme contexte pour un agent :
+        résumé des échanges anciens, puis derniers messages tels quels.
+        Le résumé des échanges anciens n'est lancé qu'ici, en arrière-plan, lorsque ce contexte
+        de secours est effectivement construit.
         
         Args:
             agent_key: La clé de l'agent
-            max_messages: Nombre maximum de messages à inclure
+            max_messages: Nombre de messages récents repris tels quels (HISTORY_RECENT_MESSAGES par défaut)
             
         Returns:
             str: Contexte formaté pour l'agent
         """
-        history = self.get_history(agent_key, max_messages)
-        
-        if not history:
-            return ""
-        
-        context = "Contexte des échanges précédents :\n\n"
-        for msg in history:
-            role_name = "Utilisateur" if msg['role'] == 'user' else f"Agent {AGENT_METADATA.get(agent_key, {}).get('name', 'Assistant')}"
-            context += f"{role_name}: {msg['content']}\n\n"
-        
-        return context
+        return self.compactor.build_context(
+            self._summary_state(agent_key),
+            st.session_state.thread_history.get(agent_key, AgentHistory()),
+            self._agent_name(agent_key),
+            max_messages
+        )
     
     def is_context_enabled(self) -> bool:
         """
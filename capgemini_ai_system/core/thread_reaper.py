@@ -0,0 +1,178 @@
+"""
+Suppression des threads distants dont la durée de conservation est écoulée.
+
+Chaque exécution d'agent sans thread persistant (et chaque analyse du router) crée un thread
+qui n'est plus utilisé ensuite. Le registre des threads (voir integrations/thread_registry.py)
+les enregistre à leur création ; le ramasseur les supprime par lots, à débit limité,
+en arrière-plan de l'application ou en ligne de commande :
+
+    python -m core.thread_reaper [--retention SECONDES] [--limit N] [--dry-run]
+"""
+
+import time
+import asyncio
+import argparse
+import threading
+from typing import Any, Dict, List, Optional
+
+from integrations.azure_client import get_agent_client
+from integrations.errors import ThreadNotFoundError
+from integrations.thread_registry import ThreadRegistry, get_thread_registry
+from config.settings import (
+    THREAD_RETENTION_SECONDS, PERSISTENT_THREAD_RETENTION_SECONDS, THREAD_REAPER_INTERVAL_SECONDS,
+    THREAD_REAPER_BATCH_SIZE, THREAD_REAPER_MAX_DELETES_PER_SECOND
+)
+
+class ThreadReaper:
+    """
+    Supprime par lots les threads expirés du registre, sans dépasser un débit maximal.
+    """
+
+    def __init__(
+        self,
+        client: Any = None,
+        registry: Optional[ThreadRegistry] = None,
+        batch_size: int = THREAD_REAPER_BATCH_SIZE,
+        max_deletes_per_second: float = THREAD_REAPER_MAX_DELETES_PER_SECOND
+    ):
+        """
+        Initialise le ramasseur.
+
+        Args:
+            client: Le client des agents (client partagé du processus par défaut)
+            registry: Le registre des threads (registre partagé du processus par défaut)
+            batch_size: Nombre de threads supprimés simultanément
+            max_deletes_per_second: Débit maximal de suppression
+        """
+        self.client = client
+        self.registry = registry
+        self.batch_size = batch_size
+        self.max_deletes_per_second = max_deletes_per_second
+
+    async def reap(
+        self,
+        retention_seconds: int = THREAD_RETENTION_SECONDS,
+        persistent_retention_seconds: int = PERSISTENT_THREAD_RETENTION_SECONDS,
+        limit: Optional[int] = None,
+        dry_run: bool = False
+    ) -> Dict[str, int]:
+        """
+        Supprime les threads dont la durée de conservation est écoulée.
+        Un thread déjà absent du service est retiré du registre ; en cas d'échec,
+        il y reste pour la passe suivante.
+
+        Args:
+            retention_seconds: Durée de conservation des threads d'une seule exécution
+            persistent_retention_seconds: Durée de conservation des threads persistants, depuis leur dernière utilisation
+            limit: Nombre maximal de threads supprimés (tous si None)
+            dry_run: Compter les threads expirés sans les supprimer
+
+        Returns:
+            Dict[str, int]: Threads expirés, supprimés, déjà absents, récupérés (supprimés ou absents) et en échec
+        """
+        registry = self.registry or get_thread_registry()
+        now = time.time()
+        expired = registry.expired(now - retention_seconds, now - persistent_retention_seconds, limit)
+
+        stats = {'expired': len(expired), 'deleted': 0, 'missing': 0, 'reclaimed': 0, 'failed': 0}
+        if dry_run or not expired:
+            return stats
+
+        client = self.client or get_agent_client()
+        for start in range(0, len(expired), self.batch_size):
+            batch_started = time.monotonic()
+            batch = expired[start:start + self.batch_size]
+
+            results = await asyncio.gather(
+                *(client.delete_thread(thread_id) for thread_id in batch),
+                return_exceptions=True
+            )
+
+            reclaimed: List[str] = []
+            for thread_id, result in zip(batch, results):
+                if isinstance(result, ThreadNotFoundError):
+                    stats['missing'] += 1
+                    reclaimed.append(thread_id)
+                elif isinstance(result, Exception):
+                    stats['failed'] += 1
+                    print(f"Erreur lors de la suppression du thread {thread_id}: {str(result)}")
+                else:
+                    stats['deleted'] += 1
+                    reclaimed.append(thread_id)
+            registry.forget(reclaimed)
+
+            # Limiter le débit : un lot de n threads occupe au moins n / max_deletes_per_second secondes
+            if start + self.batch_size < len(expired):
+                remaining = len(batch) / self.max_deletes_per_second - (time.monotonic() - batch_started)
+                if remaining > 0:
+                    await asyncio.sleep(remaining)
+
+        stats['reclaimed'] = stats['deleted'] + stats['missing']
+        return stats
+
+_reaper_thread = None
+_reaper_lock = threading.Lock()
+
+def _run_reaper(interval_seconds: int) -> None:
+    """
+    Boucle du ramasseur en arrière-plan : une passe toutes les interval_seconds.
+
+    Args:
+        interval_seconds: Intervalle entre deux passes
+    """
+    reaper = ThreadReaper()
+    while True:
+        try:
+            stats = asyncio.run(reaper.reap())
+            if stats['reclaimed'] or stats['failed']:
+                print(f"Threads récupérés: {stats['reclaimed']} (échecs: {stats['failed']})")
+        except Exception as e:
+            print(f"Erreur lors de la suppression des threads expirés: {str(e)}")
+        time.sleep(interval_seconds)
+
+def start_thread_reaper(interval_seconds: int = THREAD_REAPER_INTERVAL_SECONDS) -> None:
+    """
+    Démarre le ramasseur en arrière-plan, une seule fois par processus.
+
+    Args:
+        interval_seconds: Intervalle entre deux passes
+    """
+    global _reaper_thread
+    with _reaper_lock:
+        if _reaper_thread is None:
+            _reaper_thread = threading.Thread(
+                target=_run_reaper, args=(interval_seconds,), name="thread-reaper", daemon=True
+            )
+            _reaper_thread.start()
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Supprime les threads expirés en ligne de commande et affiche le nombre de threads récupérés.
+
+    Args:
+        argv: Arguments de la ligne de commande (sys.argv par défaut)
+    """
+    parser = argparse.ArgumentParser(description="Supprime les threads distants dont la durée de conservation est écoulée.")
+    parser.add_argument(
+        "--retention", type=int, default=THREAD_RETENTION_SECONDS,
+        help="Durée de conservation des threads d'une seule exécution, en secondes"
+    )
+    parser.add_argument(
+        "--persistent-retention", type=int, default=PERSISTENT_THREAD_RETENTION_SECONDS,
+        help="Durée de conservation des threads persistants depuis leur dernière utilisation, en secondes"
+    )
+    parser.add_argument("--limit", type=int, default=None, help="Nombre maximal de threads supprimés")
+    parser.add_argument("--dry-run", action="store_true", help="Compter les threads expirés sans les supprimer")
+    args = parser.parse_args(argv)
+
+    stats = asyncio.run(ThreadReaper().reap(args.retention, args.persistent_retention, args.limit, args.dry_run))
+
+    print(f"Threads expirés: {stats['expired']}")
+    if not args.dry_run:
+        print(f"Threads récupérés: {stats['reclaimed']} (supprimés: {stats['deleted']}, déjà absents: {stats['missing']})")
+        print(f"Échecs: {stats['failed']}")
+    remaining = get_thread_registry().stats()
+    print(f"Threads enregistrés: {remaining['ephemeral']} d'une seule exécution, {remaining['persistent']} persistants")
+
+if __name__ == "__main__":
+    main()
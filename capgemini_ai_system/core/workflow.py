@@ -0,0 +1,286 @@
+"""
+Moteur de workflows déclaratifs : étapes asynchrones, dépendances, exécution conditionnelle,
+répartition sur plusieurs éléments (fan-out), concurrence et délai maximal par étape.
+
+Un workflow est décrit en Python par la liste de ses étapes :
+
+    Workflow("exemple", [
+        WorkflowStep("documents", process_documents),
+        WorkflowStep("routing", determine_agents),
+        WorkflowStep("agents", run_agent, depends_on=["documents", "routing"],
+                     fan_out=lambda ctx: ctx.results["routing"], max_concurrency=4, timeout=600),
+        WorkflowStep("result", combine, depends_on=["agents"])
+    ])
+
+Chaque étape démarre dès que ses dépendances sont terminées : les branches indépendantes
+s'exécutent en parallèle, et la durée de chaque étape est mesurée.
+"""
+
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+class WorkflowStepError(RuntimeError):
+    """Échec (erreur ou délai dépassé) d'une étape obligatoire d'un workflow."""
+
+    def __init__(self, step: str, error: Exception):
+        """
+        Initialise l'erreur.
+
+        Args:
+            step: Le nom de l'étape
+            error: L'erreur d'origine
+        """
+        super().__init__(f"Étape '{step}': {str(error)}")
+        self.step = step
+        self.error = error
+
+class WorkflowContext:
+    """
+    État partagé par les étapes d'une exécution : entrées du workflow, résultat
+    et mesures de chaque étape terminée.
+    """
+
+    def __init__(self, inputs: Dict[str, Any]):
+        """
+        Initialise le contexte.
+
+        Args:
+            inputs: Les entrées du workflow
+        """
+        self.inputs = dict(inputs)
+        self.results: Dict[str, Any] = {}
+        self.timings: Dict[str, Dict[str, Any]] = {}
+        self.started_at = time.perf_counter()
+
+class WorkflowStep:
+    """
+    Étape d'un workflow.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable[..., Awaitable[Any]],
+        depends_on: Iterable[str] = (),
+        when: Optional[Callable[[WorkflowContext], bool]] = None,
+        fan_out: Optional[Callable[[WorkflowContext], List[Any]]] = None,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        required: bool = True,
+        on_item_error: Optional[Callable[[Any, Exception], Any]] = None
+    ):
+        """
+        Initialise l'étape.
+
+        Args:
+            name: Le nom de l'étape (clé de son résultat dans le contexte)
+            run: Fonction asynchrone appelée avec le contexte (et l'élément, pour une étape répartie)
+            depends_on: Les étapes dont le résultat est nécessaire
+            when: Condition d'exécution, évaluée une fois les dépendances terminées
+                (résultat None si l'étape est ignorée)
+            fan_out: Fonction qui retourne les éléments sur lesquels répartir l'étape ;
+                le résultat est la liste des résultats, dans l'ordre des éléments
+            max_concurrency: Nombre maximal d'éléments traités simultanément (tous si None)
+            timeout: Délai maximal d'exécution en secondes, par élément pour une étape répartie
+            required: Faire échouer le workflow si l'étape échoue (sinon son résultat est None)
+            on_item_error: Pour une étape répartie, fonction appelée avec l'élément et l'erreur
+                (ou le délai dépassé) d'un élément en échec, dont elle retourne le résultat ;
+                les autres éléments se poursuivent. Sans elle, l'échec d'un élément fait échouer l'étape
+        """
+        self.name = name
+        self.run = run
+        self.depends_on = list(depends_on)
+        self.when = when
+        self.fan_out = fan_out
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.required = required
+        self.on_item_error = on_item_error
+
+class Workflow:
+    """
+    Ensemble d'étapes formant un graphe sans cycle.
+    """
+
+    def __init__(self, name: str, steps: List[WorkflowStep], output: Optional[str] = None):
+        """
+        Initialise le workflow et vérifie ses dépendances.
+
+        Args:
+            name: Le nom du workflow
+            steps: Les étapes
+            output: L'étape dont le résultat est celui du workflow (la dernière par défaut)
+
+        Raises:
+            ValueError: Si une étape est dupliquée ou inconnue, ou si les dépendances forment un cycle
+        """
+        self.name = name
+        self.steps = self._order(steps)
+        self.output = output or steps[-1].name
+        if self.output not in {step.name for step in steps}:
+            raise ValueError(f"Étape de sortie inconnue: {self.output}")
+
+    @staticmethod
+    def _order(steps: List[WorkflowStep]) -> List[WorkflowStep]:
+        """
+        Ordonne les étapes de sorte que chacune suive ses dépendances.
+
+        Args:
+            steps: Les étapes
+
+        Returns:
+            List[WorkflowStep]: Les étapes ordonnées
+
+        Raises:
+            ValueError: Si une étape est dupliquée ou inconnue, ou si les dépendances forment un cycle
+        """
+        by_name = {}
+        for step in steps:
+            if step.name in by_name:
+                raise ValueError(f"Étape dupliquée: {step.name}")
+            by_name[step.name] = step
+        for step in steps:
+            for dependency in step.depends_on:
+                if dependency not in by_name:
+                    raise ValueError(f"Dépendance inconnue de l'étape {step.name}: {dependency}")
+
+        ordered, visiting, visited = [], set(), set()
+
+        def visit(step: WorkflowStep) -> None:
+            if step.name in visited:
+                return
+            if step.name in visiting:
+                raise ValueError(f"Cycle de dépendances autour de l'étape {step.name}")
+            visiting.add(step.name)
+            for dependency in step.depends_on:
+                visit(by_name[dependency])
+            visiting.discard(step.name)
+            visited.add(step.name)
+            ordered.append(step)
+
+        for step in steps:
+            visit(step)
+        return ordered
+
+class WorkflowExecutor:
+    """
+    Exécute un workflow avec le maximum de parallélisme permis par ses dépendances.
+    """
+
+    def __init__(self, on_step: Optional[Callable[[str, Dict[str, Any]], None]] = None):
+        """
+        Initialise l'exécuteur.
+
+        Args:
+            on_step: Fonction appelée à la fin de chaque étape avec son nom et ses mesures
+        """
+        self.on_step = on_step
+
+    async def run(self, workflow: Workflow, inputs: Dict[str, Any]) -> WorkflowContext:
+        """
+        Exécute un workflow.
+
+        Args:
+            workflow: Le workflow
+            inputs: Les entrées du workflow
+
+        Returns:
+            WorkflowContext: Le contexte, avec le résultat et les mesures de chaque étape
+
+        Raises:
+            WorkflowStepError: Si une étape obligatoire échoue (les étapes en cours sont annulées)
+        """
+        context = WorkflowContext(inputs)
+        tasks: Dict[str, asyncio.Task] = {}
+        for step in workflow.steps:
+            tasks[step.name] = asyncio.ensure_future(
+                self._run_step(step, context, [tasks[dependency] for dependency in step.depends_on])
+            )
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        return context
+
+    async def _call(self, step: WorkflowStep, coroutine: Awaitable[Any]) -> Any:
+        """
+        Attend une exécution de l'étape, dans la limite de son délai maximal.
+
+        Args:
+            step: L'étape
+            coroutine: L'exécution
+
+        Returns:
+            Any: Le résultat de l'exécution
+        """
+        if step.timeout is None:
+            return await coroutine
+        return await asyncio.wait_for(coroutine, step.timeout)
+
+    async def _run_step(self, step: WorkflowStep, context: WorkflowContext, dependencies: List[asyncio.Task]) -> None:
+        """
+        Exécute une étape une fois ses dépendances terminées et enregistre son résultat et ses mesures.
+
+        Args:
+            step: L'étape
+            context: Le contexte de l'exécution
+            dependencies: Les tâches des étapes dont elle dépend
+        """
+        if dependencies:
+            await asyncio.gather(*dependencies)
+
+        started = time.perf_counter()
+        timing = {'start': round(started - context.started_at, 3), 'duration': 0.0, 'status': "completed"}
+        result, error = None, None
+
+        if step.when is not None and not step.when(context):
+            timing['status'] = "skipped"
+        else:
+            try:
+                if step.fan_out is not None:
+                    items = step.fan_out(context)
+                    semaphore = asyncio.Semaphore(step.max_concurrency or max(len(items), 1))
+
+                    failed_items = []
+
+                    async def run_item(item: Any) -> Any:
+                        async with semaphore:
+                            if step.on_item_error is None:
+                                return await self._call(step, step.run(context, item))
+                            try:
+                                return await self._call(step, step.run(context, item))
+                            except asyncio.TimeoutError:
+                                error = TimeoutError(f"délai de {step.timeout} s dépassé")
+                            except Exception as e:
+                                error = e
+                            failed_items.append(item)
+                            return step.on_item_error(item, error)
+
+                    result = list(await asyncio.gather(*(run_item(item) for item in items)))
+                    timing['items'] = len(items)
+                    if failed_items:
+                        timing['failed_items'] = len(failed_items)
+                else:
+                    result = await self._call(step, step.run(context))
+            except asyncio.TimeoutError:
+                timing['status'] = "timeout"
+                error = TimeoutError(f"délai de {step.timeout} s dépassé")
+            except Exception as e:
+                timing['status'] = "failed"
+                error = e
+
+        timing['duration'] = round(time.perf_counter() - started, 3)
+        context.timings[step.name] = timing
+        if self.on_step is not None:
+            self.on_step(step.name, timing)
+
+        if error is not None:
+            if step.required:
+                raise WorkflowStepError(step.name, error)
+            print(f"Erreur dans l'étape facultative {step.name}: {str(error)}")
+        context.results[step.name] = result
@@ -3,12 +3,19 @@ Client pour interagir avec les agents Azure AI Foundry.
 """
 import os
 import time
+import asyncio
+import threading
+from azure.core.exceptions import ResourceNotFoundError
 from azure.identity import DefaultAzureCredential
 from semantic_kernel.agents import AzureAIAgent
 from typing import Dict, List, Optional, Tuple, Any
 
 from config.agents import AGENT_IDS
-from config.settings import AZURE_AI_PROJECT_CONNECTION_STRING, AGENT_TIMEOUT
+from config.settings import AZURE_AI_PROJECT_CONNECTION_STRING, AGENT_TIMEOUT, USE_MOCK
+from integrations.mock_azure_client import MockAzureClient
+from integrations.errors import ThreadNotFoundError
+from integrations.thread_registry import get_thread_registry
+from core.cancellation import get_cancellation_registry
 
 class AzureAIFoundryClient:
     """
@@ -34,19 +41,65 @@ class AzureAIFoundryClient:
         # Pas besoin de fermer le client explicitement
         pass
     
-    def create_thread(self) -> str:
+    def _agents(self) -> Any:
+        """
+        Obtient le client des agents, en se connectant au premier appel.
+        
+        Returns:
+            Any: Le client des opérations sur les agents
+        """
+        if self.agent_client is None:
+            self.__enter__()
+        return self.agent_client.agents
+    
+    async def create_thread(self) -> str:
         """
         Crée un nouveau thread de conversation.
         
         Returns:
             str: L'identifiant du thread créé
         """
-        if USE_MOCK:  # Ajoutez ces lignes
-            return await self.mock_client.create_thread()
-        thread = self.agent_client.agents.create_thread()
+        thread = await asyncio.to_thread(self._agents().create_thread)
+        # Chaque thread est enregistré pour être supprimé une fois sa durée de conservation écoulée
+        get_thread_registry().record(thread.id)
         return thread.id
     
-    def get_thread(self, thread_id: str) -> bool:
+    async def delete_thread(self, thread_id: str) -> None:
+        """
+        Supprime un thread.
+        
+        Args:
+            thread_id: L'identifiant du thread
+            
+        Raises:
+            ThreadNotFoundError: Si le thread n'existe plus
+        """
+        try:
+            await asyncio.to_thread(self._agents().delete_thread, thread_id)
+        except ResourceNotFoundError as e:
+            raise ThreadNotFoundError(f"Thread {thread_id} introuvable: {str(e)}")
+    
+    def cancel_run_sync(self, thread_id: str, run_id: str) -> None:
+        """
+        Annule une exécution en cours (appel bloquant, utilisable à l'arrêt du processus).
+        
+        Args:
+            thread_id: L'identifiant du thread
+            run_id: L'identifiant de l'exécution
+        """
+        self._agents().cancel_run(thread_id=thread_id, run_id=run_id)
+    
+    async def cancel_run(self, thread_id: str, run_id: str) -> None:
+        """
+        Annule une exécution en cours.
+        
+        Args:
+            thread_id: L'identifiant du thread
+            run_id: L'identifiant de l'exécution
+        """
+        await asyncio.to_thread(self.cancel_run_sync, thread_id, run_id)
+    
+    async def get_thread(self, thread_id: str) -> bool:
         """
         Vérifie si un thread existe.
         
@@ -57,26 +110,33 @@ class AzureAIFoundryClient:
             bool: True si le thread existe, False sinon
         """
         try:
-            self.agent_client.agents.get_thread(thread_id)
+            await asyncio.to_thread(self._agents().get_thread, thread_id)
             return True
         except Exception:
             return False
     
-    def add_message(self, thread_id: str, content: str) -> None:
+    async def add_message(self, thread_id: str, content: str) -> None:
         """
         Ajoute un message à un thread.
         
         Args:
             thread_id: L'identifiant du thread
             content: Le contenu du message
+            
+        Raises:
+            ThreadNotFoundError: Si le thread n'existe plus
         """
-        self.agent_client.agents.create_message(
-            thread_id=thread_id,
-            role="user",
-            content=content
-        )
+        try:
+            await asyncio.to_thread(
+                self._agents().create_message,
+                thread_id=thread_id,
+                role="user",
+                content=content
+            )
+        except ResourceNotFoundError as e:
+            raise ThreadNotFoundError(f"Thread {thread_id} introuvable: {str(e)}")
     
-    def run_agent(self, thread_id: str, agent_key: str) -> str:
+    async def run_agent(self, thread_id: str, agent_key: str) -> str:
         """
         Exécute un agent spécifique sur un thread.
         
@@ -89,47 +149,52 @@ class AzureAIFoundryClient:
             
         Raises:
             ValueError: Si l'agent spécifié n'existe pas
+            ThreadNotFoundError: Si le thread n'existe plus
             RuntimeError: Si l'exécution échoue
         """
         if agent_key not in AGENT_IDS:
             raise ValueError(f"Agent '{agent_key}' non reconnu")
         
         agent_id = AGENT_IDS[agent_key]
+        agents = self._agents()
         
         try:
             # Créer et démarrer l'exécution
-            run = self.agent_client.agents.create_run(
+            run = await asyncio.to_thread(
+                agents.create_run,
                 thread_id=thread_id,
                 agent_id=agent_id
             )
             
-            # Attendre la fin de l'exécution avec timeout
+            # Attendre la fin de l'exécution avec timeout (annulée côté service si la requête est annulée)
             start_time = time.time()
-            while True:
-                run = self.agent_client.agents.get_run(
-                    thread_id=thread_id, 
-                    run_id=run.id
-                )
-                if run.status == "completed":
-                    break
-                elif run.status in ["failed", "cancelled", "expired"]:
-                    raise RuntimeError(f"Exécution terminée avec statut: {run.status}")
-                
-                # Vérifier le timeout
-                if time.time() - start_time > AGENT_TIMEOUT:
-                    raise TimeoutError(f"Timeout lors de l'exécution de l'agent {agent_key}")
-                
-                time.sleep(1)
+            async with get_cancellation_registry().active_run(self, thread_id, run.id):
+                while True:
+                    run = await asyncio.to_thread(
+                        agents.get_run,
+                        thread_id=thread_id, 
+                        run_id=run.id
+                    )
+                    if run.status == "completed":
+                        break
+                    elif run.status in ["failed", "cancelled", "expired"]:
+                        raise RuntimeError(f"Exécution terminée avec statut: {run.status}")
+                    
+                    # Vérifier le timeout
+                    if time.time() - start_time > AGENT_TIMEOUT:
+                        raise TimeoutError(f"Timeout lors de l'exécution de l'agent {agent_key}")
+                    
+                    await asyncio.sleep(1)
             
-            # Récupérer les messages
-            messages = self.agent_client.agents.list_messages(thread_id=thread_id)
-            assistant_messages = [m for m in messages.data if m.role == "assistant"]
+            # Récupérer les messages de cette exécution (le thread peut contenir les échanges précédents)
+            messages = await asyncio.to_thread(agents.list_messages, thread_id=thread_id)
+            assistant_messages = [m for m in messages.data if m.role == "assistant" and m.run_id == run.id]
             
             if not assistant_messages:
                 return "Pas de réponse de l'agent"
             
-            # Extraire le contenu de la dernière réponse
-            latest_message = assistant_messages[-1]
+            # Extraire le contenu de la réponse
+            latest_message = assistant_messages[0]
             response = ""
             
             if latest_message.content:
@@ -139,10 +204,12 @@ class AzureAIFoundryClient:
             
             return response
             
+        except ResourceNotFoundError as e:
+            raise ThreadNotFoundError(f"Thread {thread_id} introuvable: {str(e)}")
         except Exception as e:
             raise RuntimeError(f"Erreur lors de l'exécution de l'agent {agent_key}: {str(e)}")
     
-    def router_analysis(self, query: str) -> Tuple[List[str], str]:
+    async def router_analysis(self, query: str) -> Tuple[List[str], str]:
         """
         Utilise le Router Agent pour déterminer les agents appropriés.
         
@@ -152,7 +219,7 @@ class AzureAIFoundryClient:
         Returns:
             Tuple[List[str], str]: Liste des agents sélectionnés et réponse brute
         """
-        thread_id = self.create_thread()
+        thread_id = await self.create_thread()
         
         router_prompt = f"""
         Analyze this query and determine the most appropriate agents to handle it.
@@ -171,12 +238,29 @@ class AzureAIFoundryClient:
         Your comma-separated list of agents:
         """
         
-        self.add_message(thread_id, router_prompt)
+        await self.add_message(thread_id, router_prompt)
         
-        raw_response = self.run_agent(thread_id, "router")
+        raw_response = await self.run_agent(thread_id, "router")
         selected_agents = [
             agent.strip() for agent in raw_response.split(",")
             if agent.strip() in AGENT_IDS
         ]
         
-        return selected_agents, raw_response
\ No newline at end of file
+        return selected_agents, raw_response
+
+_agent_client = None
+_agent_client_lock = threading.Lock()
+
+def get_agent_client() -> Any:
+    """
+    Obtient le client des agents partagé par le processus (client simulé si USE_MOCK est activé).
+    Un seul client permet aux gestionnaires d'agents et de threads de partager les mêmes threads.
+
+    Returns:
+        Any: Le client Azure AI Foundry ou le client simulé
+    """
+    global _agent_client
+    with _agent_client_lock:
+        if _agent_client is None:
+            _agent_client = MockAzureClient() if USE_MOCK else AzureAIFoundryClient()
+        return _agent_client
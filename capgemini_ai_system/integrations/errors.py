@@ -0,0 +1,6 @@
+"""
+Exceptions communes aux clients des agents.
+"""
+
+class ThreadNotFoundError(RuntimeError):
+    """Le thread n'existe plus côté service (expiré ou supprimé)."""
@@ -6,12 +6,17 @@ import asyncio
 import uuid
 from typing import List, Tuple, Dict, Any
 
+from integrations.errors import ThreadNotFoundError
+from integrations.thread_registry import get_thread_registry
+from core.cancellation import get_cancellation_registry
+
 class MockAzureClient:
     """Client simulé pour l'API Azure AI Foundry."""
     
     def __init__(self):
         """Initialise le client simulé."""
         self.threads = {}
+        self.cancelled_runs = []
     
     async def create_thread(self) -> str:
         """
@@ -22,8 +27,42 @@ class MockAzureClient:
         """
         thread_id = str(uuid.uuid4())
         self.threads[thread_id] = []
+        get_thread_registry().record(thread_id)
         return thread_id
     
+    async def delete_thread(self, thread_id: str) -> None:
+        """
+        Supprime un thread simulé.
+        
+        Args:
+            thread_id: L'identifiant du thread
+            
+        Raises:
+            ThreadNotFoundError: Si le thread n'existe pas (ou plus)
+        """
+        if self.threads.pop(thread_id, None) is None:
+            raise ThreadNotFoundError(f"Thread {thread_id} introuvable")
+    
+    def cancel_run_sync(self, thread_id: str, run_id: str) -> None:
+        """
+        Annule une exécution simulée (appel bloquant).
+        
+        Args:
+            thread_id: L'identifiant du thread
+            run_id: L'identifiant de l'exécution
+        """
+        self.cancelled_runs.append((thread_id, run_id))
+    
+    async def cancel_run(self, thread_id: str, run_id: str) -> None:
+        """
+        Annule une exécution simulée.
+        
+        Args:
+            thread_id: L'identifiant du thread
+            run_id: L'identifiant de l'exécution
+        """
+        self.cancel_run_sync(thread_id, run_id)
+    
     async def get_thread(self, thread_id: str) -> bool:
         """
         Vérifie si un thread existe.
@@ -43,9 +82,12 @@ class MockAzureClient:
         Args:
             thread_id: L'identifiant du thread
             content: Le contenu du message
+            
+        Raises:
+            ThreadNotFoundError: Si le thread n'existe pas (ou plus)
         """
         if thread_id not in self.threads:
-            self.threads[thread_id] = []
+            raise ThreadNotFoundError(f"Thread {thread_id} introuvable")
         self.threads[thread_id].append({"role": "user", "content": content})
     
     async def run_agent(self, thread_id: str, agent_key: str) -> str:
@@ -59,7 +101,9 @@ class MockAzureClient:
         Returns:
             str: La réponse simulée de l'agent
         """
-        await asyncio.sleep(2)  # Simuler un délai
+        run_id = str(uuid.uuid4())
+        async with get_cancellation_registry().active_run(self, thread_id, run_id):
+            await asyncio.sleep(2)  # Simuler un délai
         
         query = self.threads[thread_id][-1]["content"] if self.threads[thread_id] else ""
         
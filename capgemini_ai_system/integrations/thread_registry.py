@@ -0,0 +1,148 @@
+"""
+Registre des threads créés par les clients des agents, pour les supprimer
+une fois leur durée de conservation écoulée (voir core/thread_reaper.py).
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from config.settings import THREAD_REGISTRY_PATH
+
+class ThreadRegistry:
+    """
+    Enregistre dans SQLite (mode WAL) chaque thread créé et sa dernière utilisation.
+    Partagé entre les processus de l'application et la commande de suppression.
+    """
+
+    def __init__(self, db_path: str = THREAD_REGISTRY_PATH):
+        """
+        Initialise le registre.
+
+        Args:
+            db_path: Chemin de la base SQLite
+        """
+        self.db_path = db_path
+
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS threads (
+                    thread_id TEXT PRIMARY KEY,
+                    persistent INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS threads_last_used ON threads (persistent, last_used_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Ouvre une connexion au registre.
+
+        Returns:
+            sqlite3.Connection: La connexion ouverte
+        """
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def record(self, thread_id: str, persistent: bool = False) -> None:
+        """
+        Enregistre l'utilisation d'un thread (ou sa création).
+        Un thread marqué persistant le reste.
+
+        Args:
+            thread_id: L'identifiant du thread
+            persistent: Thread persistant d'un agent (conservé plus longtemps)
+        """
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    """
+                    INSERT INTO threads (thread_id, persistent, created_at, last_used_at)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(thread_id) DO UPDATE SET
+                        persistent = MAX(persistent, excluded.persistent),
+                        last_used_at = excluded.last_used_at
+                    """,
+                    (thread_id, int(persistent), now, now)
+                )
+        except sqlite3.Error as e:
+            print(f"Erreur d'écriture dans le registre des threads: {str(e)}")
+
+    def expired(self, used_before: float, persistent_used_before: float, limit: Optional[int] = None) -> List[str]:
+        """
+        Liste les threads dont la durée de conservation est écoulée, les plus anciens d'abord.
+
+        Args:
+            used_before: Date limite de dernière utilisation des threads d'une seule exécution
+            persistent_used_before: Date limite de dernière utilisation des threads persistants
+            limit: Nombre maximal de threads (tous si None)
+
+        Returns:
+            List[str]: Les identifiants des threads
+        """
+        try:
+            with self._connect() as conn:
+                rows = conn.execute(
+                    """
+                    SELECT thread_id FROM threads
+                    WHERE (persistent = 0 AND last_used_at < ?) OR (persistent = 1 AND last_used_at < ?)
+                    ORDER BY last_used_at LIMIT ?
+                    """,
+                    (used_before, persistent_used_before, -1 if limit is None else limit)
+                ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Erreur de lecture du registre des threads: {str(e)}")
+            return []
+        return [thread_id for (thread_id,) in rows]
+
+    def forget(self, thread_ids: Iterable[str]) -> None:
+        """
+        Retire du registre des threads supprimés.
+
+        Args:
+            thread_ids: Les identifiants des threads
+        """
+        try:
+            with self._connect() as conn:
+                conn.executemany("DELETE FROM threads WHERE thread_id = ?", [(thread_id,) for thread_id in thread_ids])
+        except sqlite3.Error as e:
+            print(f"Erreur d'écriture dans le registre des threads: {str(e)}")
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Compte les threads enregistrés.
+
+        Returns:
+            Dict[str, int]: Nombre de threads d'une seule exécution et de threads persistants
+        """
+        try:
+            with self._connect() as conn:
+                counts = dict(conn.execute("SELECT persistent, COUNT(*) FROM threads GROUP BY persistent").fetchall())
+        except sqlite3.Error:
+            counts = {}
+        return {'ephemeral': counts.get(0, 0), 'persistent': counts.get(1, 0)}
+
+_thread_registry = None
+_thread_registry_lock = threading.Lock()
+
+def get_thread_registry() -> ThreadRegistry:
+    """
+    Obtient l'instance du registre des threads partagée par le processus.
+
+    Returns:
+        ThreadRegistry: L'instance du registre
+    """
+    global _thread_registry
+    with _thread_registry_lock:
+        if _thread_registry is None:
+            _thread_registry = ThreadRegistry()
+        return _thread_registry
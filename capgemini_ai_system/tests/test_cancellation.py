@@ -0,0 +1,58 @@
+"""
+Tests de l'annulation des requêtes.
+"""
+
+import asyncio
+
+from core.cancellation import CancellationRegistry
+
+class FakeClient:
+    """Client qui enregistre les exécutions annulées."""
+
+    def __init__(self):
+        self.cancelled_runs = []
+
+    async def cancel_run(self, thread_id, run_id):
+        self.cancelled_runs.append(run_id)
+
+    def cancel_run_sync(self, thread_id, run_id):
+        self.cancelled_runs.append(run_id)
+
+def test_cancel_cancels_the_task_and_its_remote_runs():
+    registry, client = CancellationRegistry(), FakeClient()
+
+    async def request():
+        async with registry.active_run(client, "thread", "run"):
+            await asyncio.sleep(10)
+
+    async def main():
+        task = asyncio.ensure_future(request())
+        registry.attach("r1", task)
+        await asyncio.sleep(0)
+        assert registry.active_runs() == 1
+        assert registry.cancel("r1")
+        await asyncio.wait({task})
+        registry.detach("r1")
+        return task
+
+    task = asyncio.run(main())
+
+    assert task.cancelled()
+    assert client.cancelled_runs == ["run"]
+    assert registry.active_runs() == 0
+
+def test_cancel_of_unknown_request_is_not_recorded():
+    registry = CancellationRegistry()
+
+    assert not registry.cancel("r1")
+    assert not registry.is_cancelled("r1")
+
+def test_drain_cancels_remaining_runs():
+    registry, client = CancellationRegistry(), FakeClient()
+
+    async def main():
+        # Exécution enregistrée dont la tâche ne répond plus : drain l'annule directement
+        await registry.active_run(client, "thread", "run").__aenter__()
+        return registry.drain(timeout=0.1), list(client.cancelled_runs)
+
+    assert asyncio.run(main()) == (1, ["run"])
@@ -0,0 +1,64 @@
+"""
+Tests du découpage des contrats en clauses.
+"""
+
+from core.chunking import (
+    TRUNCATION_MARKER, chunk_text, find_clause_spans, normalize_heading, split_clause_spans,
+    split_clauses, truncate_at_clause_boundary
+)
+
+CONTRACT = (
+    "Entre les parties soussignées.\n\n"
+    "Article 1 - Objet\n"
+    "Le prestataire s'engage à :\n"
+    "1. Livrer les équipements\n"
+    "2. Former le personnel\n\n"
+    "2.1 Durée\n"
+    "Trois ans.\n\n"
+    "ARTICLE II : Prix\n"
+    "Cent euros.\n"
+)
+
+def test_find_clause_spans():
+    spans = find_clause_spans(CONTRACT)
+
+    assert [heading for _, _, heading in spans] == ["Préambule", "Article 1 - Objet", "2.1 Durée", "ARTICLE II : Prix"]
+    # Les clauses couvrent tout le texte, sans chevauchement
+    assert spans[0][0] == 0 and spans[-1][1] == len(CONTRACT)
+    assert all(end == next_start for (_, end, _), (next_start, _, _) in zip(spans, spans[1:]))
+
+def test_list_items_stay_in_their_clause():
+    headings = [heading for _, _, heading in find_clause_spans(CONTRACT)]
+
+    assert not any(heading.startswith(("1.", "2. ")) for heading in headings)
+
+def test_normalize_heading():
+    assert normalize_heading("Article 4 - Durée") == "durée"
+    assert normalize_heading("ARTICLE IV :  Prix  du contrat") == "prix du contrat"
+    assert normalize_heading("Article 4") == "article 4"
+
+def test_split_clause_spans_bounds_passages():
+    text = "Article 1 - Objet\n" + "Une ligne de texte.\n" * 100
+
+    spans = split_clause_spans(text, 300)
+
+    assert len(spans) > 1
+    assert all(end - start <= 300 for start, end, _ in spans)
+    assert all(heading == "Article 1 - Objet" for _, _, heading in spans)
+    assert "".join(text[start:end] for start, end, _ in spans) == text
+    assert [clause['content'] for clause in split_clauses(text, 300)] == [text[start:end] for start, end, _ in spans]
+
+def test_chunk_text_groups_clauses():
+    chunks = chunk_text(CONTRACT, 1000)
+
+    assert len(chunks) == 1
+    assert chunks[0]['content'] == CONTRACT
+
+def test_truncate_at_clause_boundary():
+    text = "Article 1 - Objet\n" + "a" * 200 + "\n\nArticle 2 - Prix\n" + "b" * 200
+
+    truncated = truncate_at_clause_boundary(text, 300)
+
+    assert truncated.endswith(TRUNCATION_MARKER)
+    assert "Article 2" not in truncated
+    assert truncate_at_clause_boundary(text, len(text)) == text
@@ -0,0 +1,48 @@
+"""
+Tests de la comparaison de contrats clause par clause.
+"""
+
+from core.contract_diff import diff_clauses, diff_documents, format_diff_for_agent
+
+BASE = (
+    "Article 1 - Objet\nFourniture de serveurs.\n\n"
+    "Article 2 - Prix\nLe prix est de 100 euros par mois. Il est révisé chaque année.\n\n"
+    "Article 3 - Confidentialité\nLes parties gardent le secret.\n"
+)
+OTHER = (
+    "Article 1 - Objet\nFourniture de serveurs.\n\n"
+    "Article 2 - Prix\nLe prix est de 120 euros par mois. Il est révisé chaque année.\n\n"
+    "Article 4 - Assurance\nLe prestataire est assuré.\n"
+)
+
+def test_diff_documents():
+    diff = diff_documents(BASE, OTHER)
+
+    assert diff['identical'] == 1
+    assert [clause['base_heading'] for clause in diff['modified']] == ["Article 2 - Prix"]
+    assert [clause['heading'] for clause in diff['removed']] == ["Article 3 - Confidentialité"]
+    assert [clause['heading'] for clause in diff['added']] == ["Article 4 - Assurance"]
+
+def test_renumbered_clause_is_aligned():
+    base = BASE + "\nArticle 5 - Réversibilité\nEn fin de contrat, les données du client lui sont restituées dans un format ouvert.\n"
+    renumbered = base.replace("Article 5 - Réversibilité", "Article 6 - Restitution")
+
+    diff = diff_documents(base, renumbered)
+
+    assert diff['identical'] == 3
+    assert [clause['other_heading'] for clause in diff['modified']] == ["Article 6 - Restitution"]
+    assert not diff['removed'] and not diff['added']
+
+def test_diff_clauses_lists_changed_sentences():
+    changes = diff_clauses("Le prix est de 100 euros. Il est ferme.", "Le prix est de 120 euros. Il est ferme.")
+
+    assert changes == ["-Le prix est de 100 euros.", "+Le prix est de 120 euros."]
+
+def test_format_diff_for_agent():
+    text = format_diff_for_agent(diff_documents(BASE, OTHER), "a.pdf", "b.pdf", 10000)
+
+    assert text.startswith("=== a.pdf → b.pdf ===")
+    assert "[MODIFIÉE] Article 2 - Prix" in text
+    assert "[SUPPRIMÉE dans b.pdf] Article 3 - Confidentialité" in text
+    assert "[AJOUTÉE dans b.pdf] Article 4 - Assurance" in text
+    assert "Fourniture de serveurs" not in text
@@ -0,0 +1,40 @@
+"""
+Tests du référentiel de contrats.
+"""
+
+from core.contract_repository import ContractRepository
+
+CONTRACT = "Contrat de maintenance des serveurs.\n\nArticle 1 - Durée\nTrois ans."
+
+def test_add_and_get(tmp_path):
+    repository = ContractRepository(str(tmp_path / "contracts.sqlite3"))
+
+    contract_id = repository.add("maintenance.pdf", CONTRACT, {'category': "maintenance"})
+
+    assert contract_id == ContractRepository.make_id(CONTRACT)
+    contract = repository.get(contract_id)
+    assert contract['name'] == "maintenance.pdf"
+    assert contract['content'] == CONTRACT
+    assert contract['page_offsets'] == [0]
+    assert contract['term_sheet'] == {'category': "maintenance"}
+    assert repository.get("inconnu") is None
+
+def test_known_contract_is_renamed_not_duplicated(tmp_path):
+    repository = ContractRepository(str(tmp_path / "contracts.sqlite3"))
+    repository.add("v1.pdf", CONTRACT, {'category': "maintenance"})
+
+    contract_id = repository.add("v2.pdf", CONTRACT)
+
+    assert repository.count() == 1
+    assert repository.get(contract_id)['name'] == "v2.pdf"
+    assert repository.get(contract_id)['term_sheet'] == {'category': "maintenance"}
+
+def test_search_and_references(tmp_path):
+    repository = ContractRepository(str(tmp_path / "contracts.sqlite3"))
+    maintenance_id = repository.add("maintenance_serveurs.pdf", CONTRACT)
+    repository.add("bail_lyon.pdf", "Bail commercial de locaux à Lyon.")
+
+    assert [result['id'] for result in repository.search("serveur")] == [maintenance_id]
+    assert repository.search("") == []
+    assert repository.find_referenced("Résume maintenance_serveurs.pdf") == [maintenance_id]
+    assert repository.find_referenced("Résume le contrat") == []
@@ -0,0 +1,44 @@
+"""
+Tests du stockage des conversations.
+"""
+
+from core.conversation_store import ConversationStore
+from core.history_store import AgentHistory
+from utils.compressed_text import CompressedText
+
+def test_messages_are_paged(tmp_path):
+    store = ConversationStore(str(tmp_path / "conversations.sqlite3"))
+    for turn in range(3):
+        messages = [
+            {'role': "user", 'content': f"question {turn}"},
+            {'role': "assistant", 'content': f"réponse {turn}", 'agent_name': "Juridique"}
+        ]
+        assert store.save_turn("c1", messages, {}, {}, {})
+
+    assert store.count_messages("c1") == 6
+    assert store.count_messages("c2") == 0
+
+    latest = store.load_messages("c1", limit=2)
+    assert latest == [
+        {'role': "user", 'content': "question 2"},
+        {'role': "assistant", 'content': "réponse 2", 'agent_name': "Juridique"}
+    ]
+    earlier = store.load_messages("c1", limit=2, before=4)
+    assert [message['content'] for message in earlier] == ["question 1", "réponse 1"]
+
+def test_threads_and_histories_round_trip(tmp_path):
+    store = ConversationStore(str(tmp_path / "conversations.sqlite3"))
+    history = AgentHistory()
+    history.append("user", "question")
+    history.append("assistant", CompressedText("réponse détaillée " * 50))
+
+    store.save_turn("c1", [], {'legal': "thread-1", 'risk': "thread-2"}, {'legal': history}, {'legal': "résumé"})
+    store.save_turn("c1", [], {'legal': "thread-3"}, {'legal': history}, {})
+
+    agent_threads, histories, summaries = store.load_threads("c1", wrap=CompressedText)
+
+    assert agent_threads == {'legal': "thread-3", 'risk': "thread-2"}
+    assert [msg.text for msg in histories['legal']] == [msg.text for msg in history]
+    assert all(isinstance(msg.content, CompressedText) for msg in histories['legal'])
+    assert len(histories['risk']) == 0
+    assert summaries == {}
@@ -0,0 +1,42 @@
+"""
+Tests du cache d'extraction.
+"""
+
+import sqlite3
+
+from utils.extraction_cache import ExtractionCache
+
+def test_put_and_get_with_metadata(tmp_path):
+    cache = ExtractionCache(str(tmp_path))
+    key = ExtractionCache.make_key(b"%PDF-1.4", "pdf")
+
+    assert cache.get(key) is None
+    cache.put(key, "Texte extrait", {'page_numbers': 3})
+
+    assert cache.get_entry(key) == ("Texte extrait", {'page_numbers': 3})
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+    assert ExtractionCache.make_key(b"%PDF-1.4", "pdf-ocr") != key
+
+def test_lru_eviction(tmp_path):
+    cache = ExtractionCache(str(tmp_path), max_bytes=25)
+    cache.put("a", "x" * 10)
+    cache.put("b", "y" * 10)
+    cache.get("a")
+
+    cache.put("c", "z" * 10)
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+def test_migrates_cache_without_metadata(tmp_path):
+    with sqlite3.connect(str(tmp_path / "extraction_cache.sqlite3")) as conn:
+        conn.execute(
+            "CREATE TABLE entries (key TEXT PRIMARY KEY, content TEXT NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        conn.execute("INSERT INTO entries VALUES ('a', 'Ancien texte', 12, 0)")
+
+    cache = ExtractionCache(str(tmp_path))
+
+    assert cache.get_entry("a") == ("Ancien texte", {})
@@ -0,0 +1,48 @@
+"""
+Tests de l'historique borné des échanges avec un agent.
+"""
+
+from core.history_store import AgentHistory
+from utils.compressed_text import CompressedText
+
+def make_history(count, max_messages=5):
+    """Crée un historique de count messages alternant utilisateur et agent."""
+    history = AgentHistory(max_messages)
+    for i in range(count):
+        history.append("user" if i % 2 == 0 else "assistant", f"message {i}", timestamp=float(i))
+    return history
+
+def test_history_is_bounded():
+    history = make_history(8)
+
+    assert len(history) == 5
+    assert history.start == 3
+    assert [msg.text for msg in history] == [f"message {i}" for i in range(3, 8)]
+
+def test_first_and_last():
+    history = make_history(4)
+
+    assert [msg.text for msg in history.first(2)] == ["message 0", "message 1"]
+    assert [msg.text for msg in history.last(2)] == ["message 2", "message 3"]
+    assert [msg.text for msg in history.last(10)] == [f"message {i}" for i in range(4)]
+
+def test_drop_oldest_updates_start():
+    history = make_history(4)
+
+    history.drop_oldest(3)
+
+    assert [msg.text for msg in history] == ["message 3"]
+    assert history.start == 3
+
+def test_round_trip_with_compression():
+    history = make_history(7)
+    history.append("assistant", CompressedText("réponse " * 100))
+
+    restored = AgentHistory.from_dict(history.to_dict(), wrap=CompressedText)
+
+    assert restored.start == history.start
+    assert restored.max_messages == history.max_messages
+    assert [(msg.role, msg.text, msg.timestamp) for msg in restored] == [
+        (msg.role, msg.text, msg.timestamp) for msg in history
+    ]
+    assert all(isinstance(msg.content, CompressedText) for msg in restored)
@@ -0,0 +1,47 @@
+"""
+Tests de l'extraction locale des termes clés.
+"""
+
+from core.key_terms import classify_contract, extract_key_terms, format_term_sheets
+
+CONTRACT = (
+    "CONTRAT DE MAINTENANCE\n"
+    "Entre la société Acme Services, ci-après dénommée « le Prestataire », et le Client.\n\n"
+    "Article 1 - Durée\n"
+    "Le contrat prend effet le 1er janvier 2024 et est conclu pour une durée de trois (3) ans.\n\n"
+    "Article 2 - Prix\n"
+    "La redevance annuelle de maintenance est de 1 250 000,50 € HT.\n\n"
+    "Article 3 - Résiliation\n"
+    "Chaque partie peut résilier le contrat moyennant un préavis de 90 jours.\n"
+    "Tout retard donne lieu à des pénalités de 1 % par semaine.\n"
+)
+
+def test_extract_key_terms():
+    terms = extract_key_terms(CONTRACT)
+
+    assert terms['category'] == "maintenance"
+    assert terms['effective_date'] == "1er janvier 2024"
+    assert terms['term'] == {'raw': "trois (3) ans", 'days': 3 * 365}
+    assert terms['notice_period'] == {'raw': "90 jours", 'days': 90}
+    assert {'value': 1250000.5, 'currency': "EUR"} in terms['amounts']
+    assert "le Prestataire" in terms['parties']
+    assert "Acme Services" in terms['parties']
+    assert len(terms['penalties']) == 1
+
+def test_extract_key_terms_without_terms():
+    terms = extract_key_terms("Simple note sans engagement.")
+
+    assert terms['category'] == "autre"
+    assert terms['term'] is None
+    assert terms['notice_period'] is None
+    assert terms['amounts'] == []
+
+def test_classify_contract():
+    assert classify_contract("Licence du logiciel en mode SaaS") == "logiciel"
+    assert classify_contract("Transport et entreposage des marchandises") == "transport et logistique"
+
+def test_format_term_sheets_drops_empty_fields():
+    formatted = format_term_sheets([{'name': "a.pdf", 'term': None, 'amounts': [], 'category': "autre"}])
+
+    assert formatted == '[{"name":"a.pdf","category":"autre"}]'
+    assert format_term_sheets(None) == ""
@@ -0,0 +1,31 @@
+"""
+Tests de la détection des contrats quasi identiques.
+"""
+
+from core.near_duplicates import NearDuplicateIndex, compute_signature, estimate_similarity
+
+TEXT = " ".join(f"Le prestataire fournit le service numéro {i} selon les conditions de l'annexe." for i in range(60))
+
+def test_similarity_of_near_duplicates():
+    near_copy = TEXT.replace("numéro 59", "numéro 99")
+
+    assert estimate_similarity(compute_signature(TEXT), compute_signature(TEXT)) == 1.0
+    assert estimate_similarity(compute_signature(TEXT), compute_signature(near_copy)) > 0.9
+    assert estimate_similarity(compute_signature(TEXT), compute_signature("Bail commercial de locaux à Lyon.")) < 0.2
+
+def test_index_finds_similar_contracts(tmp_path):
+    index = NearDuplicateIndex(str(tmp_path / "repository.sqlite3"))
+    index.add("a", compute_signature(TEXT))
+    index.add("b", compute_signature("Bail commercial de locaux à Lyon, loyer trimestriel payable d'avance."))
+
+    matches = index.find_similar(compute_signature(TEXT.replace("numéro 59", "numéro 99")), 0.8)
+
+    assert [contract_id for contract_id, _ in matches] == ["a"]
+
+def test_analyses_are_kept_per_documents_agent_and_query(tmp_path):
+    index = NearDuplicateIndex(str(tmp_path / "repository.sqlite3"))
+    index.save_analysis(["a", "b"], "legal", "Quels sont les risques ?", "Aucun risque majeur.")
+
+    assert index.get_analysis(["a", "b"], "legal", "Quels sont les risques ?") == "Aucun risque majeur."
+    assert index.get_analysis(["b", "a"], "legal", "Quels sont les risques ?") is None
+    assert index.get_analysis(["a", "b"], "risk", "Quels sont les risques ?") is None
@@ -0,0 +1,32 @@
+"""
+Tests de l'index de passages.
+"""
+
+from core.document import Document
+from core.passage_index import PassageIndex, tokenize
+
+CONTRACT = (
+    "Entre les parties.\n\n"
+    "Article 1 - Durée\nLe contrat est conclu pour trois ans.\n\n"
+    "Article 2 - Prix\nLe prix mensuel est de cent euros.\n\n"
+    "Article 3 - Résiliation\nLa résiliation exige un préavis de trois mois.\n"
+)
+
+def test_tokenize():
+    assert tokenize("Les Résiliations du contrat") == ["resiliation", "contrat"]
+
+def test_search_returns_the_relevant_passage():
+    index = PassageIndex()
+    index.add_document(Document("a.txt", CONTRACT))
+
+    passages = index.search("Quel est le prix ?", top_k=1)
+
+    assert [passage['heading'] for passage in passages] == ["Article 2 - Prix"]
+    assert passages[0]['content'] == CONTRACT[passages[0]['start']:passages[0]['end']]
+    assert index.outline == {'a.txt': ["Préambule", "Article 1 - Durée", "Article 2 - Prix", "Article 3 - Résiliation"]}
+
+def test_passages_keep_offsets_only():
+    index = PassageIndex()
+    index.add_document(Document("a.txt", CONTRACT))
+
+    assert all('content' not in passage for passage in index.passages)
@@ -0,0 +1,52 @@
+"""
+Tests de l'entrepôt des termes clés.
+"""
+
+from core.term_store import TermStore
+
+class FakeDocument:
+    """Document réduit à son identifiant."""
+
+    def __init__(self, id):
+        self.id = id
+
+def sheet(category, notice_days=None, amount=None):
+    """Crée une fiche de termes clés."""
+    return {
+        'category': category,
+        'notice_period': {'days': notice_days} if notice_days is not None else None,
+        'term': None,
+        'amounts': [{'value': amount, 'currency': "EUR"}] if amount is not None else []
+    }
+
+def test_medians_and_percentiles(tmp_path):
+    store = TermStore(str(tmp_path))
+    store.append(
+        [sheet("maintenance", 30, 1000), sheet("maintenance", 90, 3000), sheet("logiciel", amount=500)],
+        [FakeDocument("a"), FakeDocument("b"), FakeDocument("c")]
+    )
+
+    assert store.count() == 3
+    assert store.median_by_category('notice_days') == {'maintenance': 60.0}
+    assert store.percentiles('amount', (50,), category="maintenance", currency="EUR") == {50: 2000.0}
+    assert store.percentiles('amount', (50,), category="fourniture") == {}
+
+def test_latest_version_of_a_contract_wins(tmp_path):
+    store = TermStore(str(tmp_path))
+    store.append([sheet("maintenance", 30)], [FakeDocument("a")])
+    store.append([sheet("maintenance", 60)], [FakeDocument("a")])
+
+    assert store.count() == 1
+    assert store.median_by_category('notice_days') == {'maintenance': 60.0}
+
+    store.compact()
+    assert len(store._segment_paths()) == 1
+    assert store.median_by_category('notice_days') == {'maintenance': 60.0}
+
+def test_statistics_table_marks_missing_medians(tmp_path):
+    store = TermStore(str(tmp_path))
+    assert store.statistics_table() == ""
+
+    store.append([sheet("logiciel", amount=500)], [FakeDocument("a")])
+
+    assert "| logiciel | 1 | - | - | 500 / 500 / 500 |" in store.statistics_table()
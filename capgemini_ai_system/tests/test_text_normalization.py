@@ -0,0 +1,51 @@
+"""
+Tests du nettoyage des textes extraits des PDF.
+"""
+
+from utils.text_normalization import normalize_extracted_text
+
+SEPARATOR = "\n\f\n"
+
+def make_pages(bodies, header="ACME - Contrat cadre confidentiel", footer=None):
+    """Assemble des pages avec un en-tête répété et un pied de page par page."""
+    pages = []
+    for number, body in enumerate(bodies, start=1):
+        lines = [header, body]
+        if footer is not None:
+            lines.append(footer(number))
+        pages.append("\n".join(lines))
+    return SEPARATOR.join(pages)
+
+BODIES = [f"Clause {i} : le prestataire livre le lot numéro {i} au client." for i in range(1, 6)]
+
+def test_removes_repeated_headers_and_page_numbers():
+    text = make_pages(BODIES, footer=lambda number: f"Page {number} / 5")
+
+    cleaned, stats = normalize_extracted_text(text, SEPARATOR)
+
+    assert "ACME" not in cleaned
+    assert "Page" not in cleaned
+    assert all(body in cleaned for body in BODIES)
+    assert cleaned.count(SEPARATOR) == 4
+    assert stats['repeated_lines'] == 5
+    assert stats['page_numbers'] == 5
+    assert stats['saved_chars'] == len(text) - len(cleaned)
+
+def test_removes_sequential_lone_numbers():
+    cleaned, stats = normalize_extracted_text(make_pages(BODIES, footer=str), SEPARATOR)
+
+    assert stats['page_numbers'] == 5
+    assert [line for line in cleaned.split("\n") if line.strip().isdigit()] == []
+
+def test_keeps_lone_numbers_that_are_not_page_numbers():
+    years = ["2019", "2024", "1998", "2031", "2007"]
+
+    cleaned, stats = normalize_extracted_text(make_pages(BODIES, footer=lambda number: years[number - 1]), SEPARATOR)
+
+    assert stats['page_numbers'] == 0
+    assert all(year in cleaned for year in years)
+
+def test_joins_hyphenated_words_and_spaces():
+    cleaned, _ = normalize_extracted_text("La résilia-\ntion   du contrat\n\n\n\nest possible.", SEPARATOR)
+
+    assert cleaned == "La résiliation du contrat\n\nest possible."
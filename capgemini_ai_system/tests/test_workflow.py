@@ -0,0 +1,112 @@
+"""
+Tests du moteur de workflows.
+"""
+
+import asyncio
+
+import pytest
+
+from core.workflow import Workflow, WorkflowExecutor, WorkflowStep, WorkflowStepError
+
+def run(workflow, inputs=None):
+    """Exécute un workflow et renvoie son contexte."""
+    return asyncio.run(WorkflowExecutor().run(workflow, inputs or {}))
+
+def test_steps_run_after_their_dependencies():
+    async def first(ctx):
+        return ctx.inputs['value'] + 1
+
+    async def second(ctx):
+        return ctx.results['first'] * 2
+
+    context = run(Workflow("test", [
+        WorkflowStep("second", second, depends_on=["first"]),
+        WorkflowStep("first", first)
+    ], output="second"), {'value': 1})
+
+    assert context.results == {'first': 2, 'second': 4}
+    assert context.timings['second']['status'] == "completed"
+
+def test_independent_steps_run_in_parallel():
+    async def wait(ctx):
+        await asyncio.sleep(0.2)
+
+    context = run(Workflow("test", [WorkflowStep("a", wait), WorkflowStep("b", wait)]))
+
+    assert context.timings['b']['start'] < 0.1
+
+def test_invalid_workflows_are_rejected():
+    async def step(ctx):
+        return None
+
+    with pytest.raises(ValueError):
+        Workflow("test", [WorkflowStep("a", step, depends_on=["b"]), WorkflowStep("b", step, depends_on=["a"])])
+    with pytest.raises(ValueError):
+        Workflow("test", [WorkflowStep("a", step, depends_on=["missing"])])
+    with pytest.raises(ValueError):
+        Workflow("test", [WorkflowStep("a", step), WorkflowStep("a", step)])
+
+def test_skipped_and_optional_steps():
+    async def fail(ctx):
+        raise RuntimeError("indisponible")
+
+    async def done(ctx):
+        return "ok"
+
+    context = run(Workflow("test", [
+        WorkflowStep("skipped", done, when=lambda ctx: False),
+        WorkflowStep("optional", fail, required=False),
+        WorkflowStep("result", done, depends_on=["skipped", "optional"])
+    ]))
+
+    assert context.results['skipped'] is None
+    assert context.results['optional'] is None
+    assert context.timings['skipped']['status'] == "skipped"
+    assert context.timings['optional']['status'] == "failed"
+    assert context.results['result'] == "ok"
+
+def test_required_step_failure_raises():
+    async def fail(ctx):
+        raise RuntimeError("indisponible")
+
+    with pytest.raises(WorkflowStepError) as error:
+        run(Workflow("test", [WorkflowStep("a", fail)]))
+
+    assert error.value.step == "a"
+
+def test_fan_out_keeps_item_order_and_limits_concurrency():
+    running, peak = 0, 0
+
+    async def square(ctx, item):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01 * (5 - item))
+        running -= 1
+        return item * item
+
+    context = run(Workflow("test", [
+        WorkflowStep("squares", square, fan_out=lambda ctx: [1, 2, 3, 4], max_concurrency=2)
+    ]))
+
+    assert context.results['squares'] == [1, 4, 9, 16]
+    assert context.timings['squares']['items'] == 4
+    assert peak == 2
+
+def test_fan_out_item_errors_and_timeouts():
+    async def agent(ctx, item):
+        if item == "failing":
+            raise RuntimeError("erreur")
+        if item == "slow":
+            await asyncio.sleep(1)
+        return f"réponse de {item}"
+
+    context = run(Workflow("test", [
+        WorkflowStep(
+            "agents", agent, fan_out=lambda ctx: ["legal", "failing", "slow"], timeout=0.1,
+            on_item_error=lambda item, error: f"Erreur: {error}"
+        )
+    ]))
+
+    assert context.results['agents'] == ["réponse de legal", "Erreur: erreur", "Erreur: délai de 0.1 s dépassé"]
+    assert context.timings['agents']['failed_items'] == 2
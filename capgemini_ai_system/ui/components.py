@@ -147,6 +147,106 @@ def render_debug_info(selection_method: str, router_response: str):
     </div>
     """, unsafe_allow_html=True)
 
+def render_prompt_metrics(metrics: Dict[str, Any]):
+    """
+    Affiche la taille des prompts envoyés aux agents et la durée de traitement.
+    
+    Args:
+        metrics: Mesures de la requête (tailles de prompt, politiques de contexte
+            ou de transmission entre agents, durée de chaque étape du workflow)
+    """
+    full_chars = metrics.get("full_prompt_chars", 0)
+    prompt_chars = metrics.get("prompt_chars", 0)
+    reduction = 1 - prompt_chars / full_chars if full_chars else 0
+    steps = ", ".join(
+        f"{name}: {timing['duration']} s" + (f" ({timing['status']})" if timing['status'] != "completed" else "")
+        + (f" ({timing['failed_items']}/{timing['items']} en échec)" if timing.get('failed_items') else "")
+        for name, timing in metrics.get("steps", {}).items()
+    )
+    
+    if "hops" in metrics:
+        # Mode séquence : taille du prompt de chaque étape et partie transmise de la réponse précédente
+        hops = " → ".join(
+            f"{hop['agent']}: {hop['prompt_chars']} car." + (f" ({hop['policy']})" if hop['policy'] else "")
+            for hop in metrics["hops"]
+        )
+        details = f"""<b>Prompts agents:</b> {prompt_chars} caractères 
+        (réponses complètes: {full_chars} caractères, réduction: {reduction:.0%})<br>
+        <b>Prompts par étape:</b> {hops}<br>"""
+    elif "prompt_chars" in metrics:
+        policies = ", ".join(f"{agent}: {policy}" for agent, policy in metrics.get("policies", {}).items())
+        preanalysis = {"skipped": "ignorée", "cached": "réutilisée", "computed": "exécutée"}.get(
+            metrics.get("preanalysis"), "Non disponible"
+        )
+        latency = metrics.get("latency", {})
+        latencies = " / ".join(
+            f"{label}: {latency[kind][0]} s ({latency[kind][1]} requêtes)"
+            for kind, label in (("reduced", "contexte réduit"), ("baseline", "documents complets"))
+            if kind in latency
+        )
+        details = f"""<b>Prompts agents:</b> {prompt_chars} caractères 
+        (documents complets: {full_chars} caractères, réduction: {reduction:.0%})<br>
+        <b>Politiques de contexte:</b> {policies or "Non disponible"}<br>
+        <b>Analyse préliminaire:</b> {preanalysis}<br>
+        <b>Latence moyenne:</b> {latencies or "Non disponible"}<br>"""
+    else:
+        details = ""
+    
+    st.markdown(f"""
+    <div class="debug-info">
+        {details}
+        <b>Étapes:</b> {steps or "Non disponible"}<br>
+        <b>Durée totale:</b> {metrics.get("elapsed_seconds", 0)} s
+    </div>
+    """, unsafe_allow_html=True)
+
+def render_term_sheets(term_sheets: List[Dict[str, Any]]):
+    """
+    Affiche les termes clés extraits de chaque document.
+    
+    Args:
+        term_sheets: Fiches de termes clés (parties, dates, durées, montants, pénalités)
+    """
+    if not term_sheets:
+        return
+    
+    with st.expander("📋 Termes clés des documents", expanded=False):
+        for sheet in term_sheets:
+            st.markdown(f"**{sheet['name']}**")
+            
+            amounts = ", ".join(
+                f"{amount['value']:,.2f} {amount['currency']}".replace(",", " ")
+                for amount in sheet.get('amounts', []) if amount['value'] is not None
+            )
+            rows = [
+                ("Parties", ", ".join(sheet.get('parties', []))),
+                ("Date d'effet", sheet.get('effective_date')),
+                ("Durée", (sheet.get('term') or {}).get('raw')),
+                ("Préavis", (sheet.get('notice_period') or {}).get('raw')),
+                ("Montants", amounts),
+                ("Pénalités", " / ".join(sheet.get('penalties', [])))
+            ]
+            st.markdown("\n".join(f"- {label}: {value}" for label, value in rows if value))
+
+def render_near_duplicates(documents: List[Any], near_duplicates: List[Optional[Dict[str, Any]]]):
+    """
+    Signale les documents quasi identiques à des contrats déjà traités.
+    
+    Args:
+        documents: Les documents traités (voir core.document.Document)
+        near_duplicates: Pour chaque document, le contrat déjà traité le plus similaire (ou None)
+    """
+    for doc, match in zip(documents, near_duplicates):
+        if match is None:
+            continue
+        if match['id'] == doc.id:
+            st.info(f"♻️ {doc.name} a déjà été traité : les analyses précédentes seront réutilisées.")
+        else:
+            st.info(
+                f"♻️ {doc.name} est similaire à {match['similarity']:.0%} à un contrat déjà traité : "
+                f"seules les différences seront analysées."
+            )
+
 def render_download_buttons(content: str):
     """
     Affiche des boutons de téléchargement pour le contenu généré.
@@ -241,6 +341,60 @@ def render_context_info(threads_info: List[Dict[str, Any]]):
     
     st.markdown("</div>", unsafe_allow_html=True)
 
+def render_cache_stats(stats: Dict[str, Any], normalization_stats: Optional[Dict[str, int]] = None):
+    """
+    Affiche les statistiques du cache d'extraction.
+    
+    Args:
+        stats: Statistiques du cache (succès, échecs, taux, entrées, taille)
+        normalization_stats: Statistiques cumulées du nettoyage des textes extraits
+    """
+    normalization = ""
+    if normalization_stats and normalization_stats['original_chars']:
+        saved = normalization_stats['saved_chars'] / normalization_stats['original_chars']
+        normalization = (
+            f"<br><b>Nettoyage:</b> {normalization_stats['saved_chars']} caractères retirés "
+            f"sur {normalization_stats['original_chars']} ({saved:.0%}) dans {normalization_stats['documents']} documents, "
+            f"{normalization_stats['repeated_lines']} en-têtes/pieds de page, {normalization_stats['page_numbers']} numéros de page"
+        )
+    
+    st.markdown(f"""
+    <style>
+        .cache-info {{
+            background-color: #fff8e8;
+            padding: 0.5rem;
+            border-radius: 5px;
+            margin-top: 0.5rem;
+            border-left: 3px solid #ffc107;
+            font-size: 0.8rem;
+        }}
+    </style>
+    <div class="cache-info">
+        <b>Cache d'extraction:</b> {stats['hits']} succès / {stats['misses']} échecs 
+        (taux de succès: {stats['hit_rate']:.0%})<br>
+        {stats['entries']} documents en cache ({stats['size_bytes'] / (1024 * 1024):.1f} Mo){normalization}
+    </div>
+    """, unsafe_allow_html=True)
+
+def render_memory_stats(usage: Dict[str, int], text_stats: Dict[str, Any]):
+    """
+    Affiche la mémoire occupée par la session.
+    
+    Args:
+        usage: Taille estimée en octets par entrée de l'état de session
+        text_stats: Statistiques des textes compressés (nombre, taille d'origine, en mémoire, sur disque)
+    """
+    total = sum(usage.values())
+    largest = ", ".join(f"{key}: {size / 1024:.0f} Ko" for key, size in list(usage.items())[:5])
+    
+    st.markdown(f"""
+    <div class="cache-info">
+        <b>Mémoire de la session:</b> {total / (1024 * 1024):.2f} Mo ({largest})<br>
+        <b>Textes compressés:</b> {text_stats['entries']} textes, {text_stats['raw_chars']} caractères d'origine, 
+        {text_stats['memory_bytes'] / 1024:.0f} Ko en mémoire, {text_stats['spilled_bytes'] / 1024:.0f} Ko sur disque
+    </div>
+    """, unsafe_allow_html=True)
+
 def create_custom_download_button(content: bytes, filename: str, button_text: str) -> str:
     """
     Crée un bouton de téléchargement personnalisé en HTML.
@@ -5,10 +5,13 @@ Gestion de la mise en page de l'application Streamlit.
 import streamlit as st
 import os
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Callable, Dict, List, Any, Optional, Tuple
 
 from config.agents import AGENT_METADATA
-from ui.components import render_header, render_agent_card, render_message, render_debug_info, render_download_buttons, render_context_info
+from ui.components import render_header, render_agent_card, render_message, render_debug_info, render_download_buttons, render_context_info, render_cache_stats, render_prompt_metrics, render_term_sheets, render_near_duplicates, render_memory_stats
+from ui.state import get_conversation_id, start_new_conversation
+from utils.compressed_text import as_text
+from config.settings import CONVERSATION_PAGE_SIZE
 
 def setup_page_config():
     """Configure les paramètres de la page Streamlit."""
@@ -85,6 +88,22 @@ def render_sidebar():
                     key="agent_sequence_select"
                 )
                 st.session_state.agent_sequence = sequence
+            
+            # Partie de la réponse de chaque agent transmise à l'agent suivant
+            handoff_options = {
+                "Selon l'agent suivant": None,
+                "Réponse complète": "full",
+                "Extrait structuré": "extract",
+                "Résumé": "summary",
+                "Besoins de l'agent suivant": "needs"
+            }
+            handoff_label = st.selectbox(
+                "Transmission entre agents:",
+                list(handoff_options),
+                key="handoff_policy_select",
+                help="Partie de la réponse de chaque agent transmise à l'agent suivant"
+            )
+            st.session_state.handoff_policy = handoff_options[handoff_label]
         
         # Si mode agent unique, sélecteur d'agent
         if st.session_state.orchestration_mode == "single":
@@ -96,12 +115,20 @@ def render_sidebar():
                     if st.button(f"{agent_info['icon']} {agent_info['name']}", help=agent_info['description'], key=f"btn_{agent_key}"):
                         st.session_state.selected_agents = [agent_key]
         
+        # Contrats déjà traités lors de sessions précédentes
+        render_contract_repository()
+        
         # Activation/désactivation du mode contexte
         st.session_state.context_mode = st.checkbox("Maintenir le contexte", value=True, 
                                                  help="Active/désactive la mémoire des conversations précédentes")
         
         # Mode debug
         st.session_state.debug_mode = st.checkbox("Mode debug", value=st.session_state.get("debug_mode", False))
+        st.session_state.full_context_baseline = st.session_state.debug_mode and st.checkbox(
+            "Mesurer la référence (documents complets)",
+            value=st.session_state.get("full_context_baseline", False),
+            help="Envoie les documents complets à tous les agents, pour comparer la latence à celle du contexte réduit"
+        )
         
         # Affichage des agents disponibles
         st.markdown("### Agents disponibles")
@@ -113,35 +140,118 @@ def render_sidebar():
         
         # Bouton de réinitialisation
         if st.button("🔄 Réinitialiser la conversation", help="Effacer l'historique de conversation"):
-            st.session_state.messages = []
+            start_new_conversation()
             st.session_state.current_results = None
             st.session_state.agent_sequence = []
             st.session_state.selected_agents = []
             st.session_state.processed_documents = []
+            st.session_state.attached_contracts = []
             st.rerun()
 
+def render_contract_repository():
+    """Affiche la recherche dans le référentiel de contrats et la sélection des contrats à joindre."""
+    from core.contract_repository import get_contract_repository
+    repository = get_contract_repository()
+    
+    st.markdown("### Contrats enregistrés")
+    search = st.text_input("Rechercher par nom ou contenu", key="contract_search")
+    results = repository.search(search) if search else repository.list_recent()
+    
+    if search and not results:
+        st.caption("Aucun contrat trouvé.")
+    for result in results:
+        if result.get('snippet'):
+            st.caption(f"**{result['name']}** : {result['snippet']}")
+    
+    # Les contrats déjà joints restent sélectionnables même s'ils ne font plus partie des résultats
+    options = {result['id']: result['name'] for result in results}
+    for contract_id, name in st.session_state.get('contract_names', {}).items():
+        if contract_id in st.session_state.attached_contracts:
+            options.setdefault(contract_id, name)
+    
+    st.session_state.attached_contracts = st.multiselect(
+        "Joindre à la conversation:",
+        options=list(options),
+        default=[contract_id for contract_id in st.session_state.attached_contracts if contract_id in options],
+        format_func=lambda contract_id: options[contract_id],
+        help="Les contrats joints sont transmis aux agents sans nouvel upload ni nouvelle extraction"
+    )
+    st.session_state.contract_names = {contract_id: options[contract_id] for contract_id in st.session_state.attached_contracts}
+
 def render_conversation():
-    """Affiche la conversation en cours."""
-    for message in st.session_state.get("messages", []):
+    """Affiche la fenêtre visible de la conversation : derniers messages enregistrés et messages du tour en cours."""
+    from core.conversation_store import get_conversation_store
+    store = get_conversation_store()
+    conversation_id = get_conversation_id()
+    
+    window = st.session_state.get("conversation_window") or CONVERSATION_PAGE_SIZE
+    if store.count_messages(conversation_id) > window:
+        if st.button("⬆️ Afficher les messages précédents"):
+            window += CONVERSATION_PAGE_SIZE
+            st.session_state.conversation_window = window
+    
+    messages = store.load_messages(conversation_id, window) + st.session_state.get("pending_messages", [])
+    for message in messages:
         if message["role"] == "user":
-            render_message("user", message["content"])
+            render_message("user", as_text(message["content"]))
         else:
             agent_info = {
                 "name": message.get("agent_name", "Assistant"),
                 "icon": message.get("agent_icon", "🤖")
             } if "agent_name" in message else None
             
-            render_message("assistant", message["content"], agent_info)
+            render_message("assistant", as_text(message["content"]), agent_info)
             
             # Affichage des informations de débogage si nécessaire
             if st.session_state.get("debug_mode", False) and "selection_method" in message:
                 render_debug_info(message["selection_method"], message.get("router_response", "Non disponible"))
+                if "metrics" in message:
+                    render_prompt_metrics(message["metrics"])
 
-def render_progress():
-    """Affiche la barre de progression."""
-    if st.session_state.get("processing", False):
-        st.markdown(f"<div class='progress-container'>{st.session_state.get('progress_text', 'Traitement en cours...')}</div>", unsafe_allow_html=True)
-        st.progress(st.session_state.get("progress_value", 0))
+def render_progress() -> Optional[Callable[[], None]]:
+    """
+    Affiche la barre de progression et, pendant une requête, le bouton qui l'annule.
+    
+    Returns:
+        Optional[Callable[[], None]]: Fonction qui rafraîchit la barre de progression (None hors traitement)
+    """
+    from ui.state import request_cancellation
+    
+    if not st.session_state.get("processing", False):
+        return None
+    
+    placeholder = st.empty()
+    insights_placeholder = st.empty()
+    previous_term_sheets = st.session_state.get("term_sheets")
+    
+    def refresh_progress():
+        with placeholder.container():
+            st.markdown(f"<div class='progress-container'>{st.session_state.get('progress_text', 'Traitement en cours...')}</div>", unsafe_allow_html=True)
+            st.progress(st.session_state.get("progress_value", 0))
+        # Termes clés et documents déjà traités, affichés une fois, dès la fin du traitement des documents
+        nonlocal previous_term_sheets
+        if st.session_state.get("term_sheets") is not previous_term_sheets:
+            previous_term_sheets = st.session_state.get("term_sheets")
+            with insights_placeholder.container():
+                render_document_insights()
+    
+    refresh_progress()
+    
+    # Seul ce bouton annule la requête : les autres interactions relancent le script, qui reprend son attente
+    if st.session_state.get("pending_request"):
+        st.button(
+            "⏹️ Annuler la requête",
+            key="cancel_request",
+            on_click=request_cancellation
+        )
+    return refresh_progress
+
+def render_document_insights():
+    """Affiche les documents quasi identiques à des contrats déjà traités et les termes clés des documents."""
+    render_near_duplicates(
+        st.session_state.get("processed_documents", []), st.session_state.get("near_duplicates", [])
+    )
+    render_term_sheets(st.session_state.get("term_sheets", []))
 
 def render_results():
     """Affiche les résultats et les options de téléchargement."""
@@ -151,12 +261,16 @@ def render_results():
     current_results = st.session_state.current_results
     
     if "error" in current_results:
-        st.error(current_results["error"])
+        st.error(as_text(current_results["error"]))
         return
     
+    # Affichage des termes clés extraits des documents (pendant une requête, voir render_progress)
+    if not st.session_state.get("processing", False):
+        render_document_insights()
+    
     # Affichage des options de téléchargement si un document a été généré
     if "drafter" in current_results:
-        render_download_buttons(current_results["drafter"])
+        render_download_buttons(as_text(current_results["drafter"]))
     
     # Affichage des réponses détaillées par agent en mode expandable
     if all(agent in current_results for agent in ["quality", "drafter", "contracts_compare"]):
@@ -165,15 +279,15 @@ def render_results():
             
             with col1:
                 st.markdown("#### 🔍 Agent Qualité")
-                st.markdown(current_results["quality"])
+                st.markdown(as_text(current_results["quality"]))
             
             with col2:
                 st.markdown("#### 📝 Agent Rédacteur")
-                st.markdown(current_results["drafter"])
+                st.markdown(as_text(current_results["drafter"]))
             
             with col3:
                 st.markdown("#### ⚖️ Agent Comparaison")
-                st.markdown(current_results["contracts_compare"])
+                st.markdown(as_text(current_results["contracts_compare"]))
 
 def render_context_debug():
     """Affiche les informations de contexte en mode debug."""
@@ -187,6 +301,22 @@ def render_context_debug():
     if threads_info:
         render_context_info(threads_info)
 
+def render_extraction_cache_debug():
+    """Affiche les statistiques du cache d'extraction et du nettoyage des textes en mode debug."""
+    if not st.session_state.get("debug_mode", False):
+        return
+    
+    from utils.extraction_cache import get_extraction_cache
+    render_cache_stats(get_extraction_cache().stats(), st.session_state.get("normalization_stats"))
+
+def render_memory_debug():
+    """Affiche la mémoire occupée par la session en mode debug."""
+    if not st.session_state.get("debug_mode", False):
+        return
+    
+    from utils.compressed_text import get_session_text_store, measure_session_memory
+    render_memory_stats(measure_session_memory(), get_session_text_store().stats())
+
 def render_footer():
     """Affiche le pied de page."""
     st.markdown("""
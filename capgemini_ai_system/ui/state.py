@@ -2,14 +2,18 @@
 Gestion de l'état de session Streamlit.
 """
 
+import uuid
 import streamlit as st
 from typing import Dict, List, Any, Optional
 
+from utils.compressed_text import get_session_text_store
+
 def initialize_session_state():
     """Initialise les variables d'état de session nécessaires."""
-    # Variables pour les messages et résultats
-    if "messages" not in st.session_state:
-        st.session_state.messages = []
+    # Variables pour les messages et résultats : les messages enregistrés sont lus page par page
+    # dans le stockage des conversations, seuls ceux du tour en cours sont gardés en mémoire
+    if "pending_messages" not in st.session_state:
+        st.session_state.pending_messages = []
     if "current_results" not in st.session_state:
         st.session_state.current_results = None
     
@@ -20,6 +24,10 @@ def initialize_session_state():
         st.session_state.progress_text = ""
     if "progress_value" not in st.session_state:
         st.session_state.progress_value = 0
+    # Requête soumise, traitée à l'exécution suivante du script (qui affiche le bouton d'annulation)
+    # et conservée jusqu'à son terme, une nouvelle exécution du script reprenant son attente
+    if "pending_request" not in st.session_state:
+        st.session_state.pending_request = None
     
     # Variables pour la configuration
     if "orchestration_mode" not in st.session_state:
@@ -38,10 +46,60 @@ def initialize_session_state():
     # Variables pour les documents
     if "processed_documents" not in st.session_state:
         st.session_state.processed_documents = []
+    if "attached_contracts" not in st.session_state:
+        st.session_state.attached_contracts = []
+    
+    # Threads et historiques des agents : repris du stockage des conversations après un redémarrage
+    if "agent_threads" not in st.session_state:
+        restore_agent_threads()
+
+def get_conversation_id() -> str:
+    """
+    Récupère l'identifiant de la conversation, conservé dans l'URL pour la retrouver
+    après un redémarrage de l'application.
+    
+    Returns:
+        str: L'identifiant de la conversation
+    """
+    if "conversation_id" not in st.session_state:
+        conversation_id = st.query_params.get("conversation")
+        if not conversation_id:
+            conversation_id = uuid.uuid4().hex
+            st.query_params["conversation"] = conversation_id
+        st.session_state.conversation_id = conversation_id
+    return st.session_state.conversation_id
+
+def restore_agent_threads():
+    """Reprend du stockage des conversations les threads, historiques et résumés des agents."""
+    from core.conversation_store import get_conversation_store
+    from core.history_compactor import HistoryCompactor
+    
+    # Messages compressés comme ceux ajoutés pendant la session (voir ThreadManager.add_to_history)
+    agent_threads, thread_history, summaries = get_conversation_store().load_threads(
+        get_conversation_id(), get_session_text_store().wrap
+    )
+    st.session_state.agent_threads = agent_threads
+    st.session_state.thread_history = thread_history
+    st.session_state.history_summaries = {
+        agent: {**HistoryCompactor.new_state(), 'summary': summary} for agent, summary in summaries.items()
+    }
+
+def start_new_conversation():
+    """Démarre une nouvelle conversation ; la précédente reste enregistrée."""
+    conversation_id = uuid.uuid4().hex
+    st.query_params["conversation"] = conversation_id
+    st.session_state.conversation_id = conversation_id
+    st.session_state.pending_messages = []
+    st.session_state.conversation_window = None
+    st.session_state.agent_threads = {}
+    st.session_state.thread_history = {}
+    st.session_state.history_summaries = {}
+    st.session_state.thread_timestamps = {}
+    st.session_state.thread_validated_at = {}
 
 def add_message(role: str, content: str, **kwargs):
     """
-    Ajoute un message à l'historique de conversation.
+    Ajoute un message à la conversation (enregistré à la fin du tour, voir save_turn).
     
     Args:
         role: Rôle du message ('user' ou 'assistant')
@@ -50,11 +108,41 @@ def add_message(role: str, content: str, **kwargs):
     """
     message = {
         "role": role,
-        "content": content,
+        "content": get_session_text_store().wrap(content),
         **kwargs
     }
     
-    st.session_state.messages.append(message)
+    st.session_state.pending_messages.append(message)
+
+def save_turn():
+    """
+    Enregistre le tour de conversation en une seule écriture : messages du tour,
+    threads, historiques et résumés des agents.
+    """
+    from core.conversation_store import get_conversation_store
+    
+    saved = get_conversation_store().save_turn(
+        get_conversation_id(),
+        st.session_state.pending_messages,
+        st.session_state.get("agent_threads", {}),
+        st.session_state.get("thread_history", {}),
+        {agent: state['summary'] for agent, state in st.session_state.get("history_summaries", {}).items()}
+    )
+    if saved:
+        st.session_state.pending_messages = []
+
+def set_current_results(result: Dict[str, Any]):
+    """
+    Enregistre les résultats de la dernière orchestration, les réponses volumineuses étant compressées.
+    
+    Args:
+        result: Résultat d'orchestration
+    """
+    text_store = get_session_text_store()
+    st.session_state.current_results = {
+        key: text_store.wrap(value) if isinstance(value, str) else value
+        for key, value in result.items()
+    }
 
 def set_processing(state: bool, text: str = "", value: float = 0):
     """
@@ -74,6 +162,14 @@ def set_processing(state: bool, text: str = "", value: float = 0):
         st.session_state.progress_text = ""
         st.session_state.progress_value = 0
 
+def request_cancellation():
+    """
+    Demande l'annulation de la requête en cours (rappel du bouton d'annulation). L'exécution
+    suivante du script, qui reprend l'attente de la requête, transmet l'annulation.
+    """
+    if st.session_state.get("pending_request"):
+        st.session_state.pending_request["cancel_requested"] = True
+
 def get_current_mode() -> tuple:
     """
     Récupère le mode actuel et les informations associées.
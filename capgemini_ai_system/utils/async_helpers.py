@@ -3,8 +3,16 @@ Utilitaires pour exécuter des fonctions asynchrones dans Streamlit.
 """
 
 import asyncio
+import threading
+from concurrent.futures import Future
 from typing import Any, Callable, Coroutine
 
+try:
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+except ImportError:
+    add_script_run_ctx = None
+    get_script_run_ctx = None
+
 def run_async(coroutine: Coroutine) -> Any:
     """
     Exécute une coroutine de manière synchrone.
@@ -37,4 +45,62 @@ def run_async(coroutine: Coroutine) -> Any:
     except Exception as e:
         # Capture et renvoie toute exception pour éviter les crashs silencieux
         print(f"Erreur asyncio: {str(e)}")
-        raise
\ No newline at end of file
+        raise
+
+async def run_in_thread(func: Callable, *args: Any) -> Any:
+    """
+    Exécute une fonction bloquante dans un thread sans bloquer la boucle d'événements.
+    Le contexte Streamlit est transmis au thread, qui peut donc utiliser st.session_state
+    et afficher des éléments dans la page.
+    
+    Args:
+        func: La fonction à exécuter
+        *args: Ses arguments
+        
+    Returns:
+        Le résultat de la fonction
+    """
+    ctx = get_script_run_ctx() if get_script_run_ctx is not None else None
+    
+    def run_with_context() -> Any:
+        if ctx is not None:
+            add_script_run_ctx(ctx=ctx)
+        return func(*args)
+    
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, run_with_context)
+
+def start_in_thread(func: Callable, *args: Any) -> Future:
+    """
+    Lance une fonction dans un thread d'arrière-plan doté de sa propre boucle d'événements.
+    Contrairement à l'exécution du script Streamlit, le thread n'est pas interrompu par une
+    nouvelle exécution du script : celle-ci peut reprendre l'attente du résultat.
+    Le contexte Streamlit est transmis au thread, qui peut donc utiliser st.session_state.
+    
+    Args:
+        func: La fonction à exécuter (elle peut appeler run_async)
+        *args: Ses arguments
+        
+    Returns:
+        Future: Le résultat de la fonction, ou l'exception qu'elle a levée
+    """
+    ctx = get_script_run_ctx() if get_script_run_ctx is not None else None
+    future = Future()
+    
+    def run_with_context():
+        if ctx is not None:
+            add_script_run_ctx(ctx=ctx)
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            future.set_result(func(*args))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+    
+    # Thread démon : il n'empêche pas l'arrêt du processus, dont les requêtes en cours
+    # sont annulées (voir core.cancellation.get_cancellation_registry)
+    threading.Thread(target=run_with_context, daemon=True).start()
+    return future
@@ -0,0 +1,234 @@
+"""
+Stockage compressé des textes volumineux de la session (documents extraits, réponses des agents).
+"""
+
+import os
+import sys
+import zlib
+import uuid
+import weakref
+from collections import deque
+from typing import Dict, Any, Union
+import streamlit as st
+
+from config.settings import TEXT_COMPRESSION_MIN_CHARS, SESSION_TEXT_MEMORY_MAX_BYTES, TEXT_SPILL_DIR
+
+def _remove_spill_file(path: str) -> None:
+    """
+    Supprime le fichier d'un texte déchargé sur disque.
+
+    Args:
+        path: Chemin du fichier
+    """
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+class CompressedText:
+    """
+    Texte compressé (zlib), décompressé à chaque accès.
+    Les données compressées peuvent être déchargées sur disque puis relues à la demande.
+    """
+
+    __slots__ = ('_data', '_path', 'length', 'compressed_size', '__weakref__')
+
+    def __init__(self, text: str):
+        """
+        Compresse un texte.
+
+        Args:
+            text: Le texte à compresser
+        """
+        self._data = zlib.compress(text.encode('utf-8'), 6)
+        self._path = None
+        self.length = len(text)
+        self.compressed_size = len(self._data)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __str__(self) -> str:
+        data = self._data
+        if data is None:
+            with open(self._path, 'rb') as f:
+                data = f.read()
+        return zlib.decompress(data).decode('utf-8')
+
+    @property
+    def in_memory(self) -> bool:
+        """Indique si les données compressées sont en mémoire (et non sur disque)."""
+        return self._data is not None
+
+    def spill(self, directory: str) -> None:
+        """
+        Décharge les données compressées sur disque.
+
+        Args:
+            directory: Répertoire des fichiers déchargés
+        """
+        if self._data is None:
+            return
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{uuid.uuid4().hex}.z")
+        with open(path, 'wb') as f:
+            f.write(self._data)
+        self._path = path
+        self._data = None
+        # Le fichier disparaît avec le texte
+        weakref.finalize(self, _remove_spill_file, path)
+
+def as_text(value: Union[str, CompressedText, None]) -> str:
+    """
+    Renvoie le texte d'une valeur éventuellement compressée.
+
+    Args:
+        value: Un texte, un texte compressé ou None
+
+    Returns:
+        str: Le texte (vide pour None)
+    """
+    if value is None:
+        return ""
+    return value if isinstance(value, str) else str(value)
+
+class SessionTextStore:
+    """
+    Compresse les textes volumineux d'une session et décharge sur disque les plus anciens
+    lorsque leur taille compressée en mémoire dépasse la limite de la session.
+    """
+
+    def __init__(
+        self,
+        min_chars: int = TEXT_COMPRESSION_MIN_CHARS,
+        max_memory_bytes: int = SESSION_TEXT_MEMORY_MAX_BYTES,
+        spill_dir: str = TEXT_SPILL_DIR
+    ):
+        """
+        Initialise le stockage.
+
+        Args:
+            min_chars: Taille à partir de laquelle un texte est compressé
+            max_memory_bytes: Taille compressée maximale gardée en mémoire
+            spill_dir: Répertoire des textes déchargés sur disque
+        """
+        self.min_chars = min_chars
+        self.max_memory_bytes = max_memory_bytes
+        self.spill_dir = spill_dir
+        self._entries = []
+
+    def wrap(self, text: Union[str, CompressedText]) -> Union[str, CompressedText]:
+        """
+        Compresse un texte s'il est assez volumineux.
+
+        Args:
+            text: Le texte
+
+        Returns:
+            Union[str, CompressedText]: Le texte compressé, ou le texte inchangé s'il est court
+        """
+        if not isinstance(text, str) or len(text) < self.min_chars:
+            return text
+
+        compressed = CompressedText(text)
+        self._entries.append(weakref.ref(compressed))
+        self._enforce_limit()
+        return compressed
+
+    def _live_entries(self) -> list:
+        """
+        Renvoie les textes compressés encore référencés, du plus ancien au plus récent.
+
+        Returns:
+            list: Les textes compressés vivants
+        """
+        entries = [ref() for ref in self._entries]
+        self._entries = [ref for ref, entry in zip(self._entries, entries) if entry is not None]
+        return [entry for entry in entries if entry is not None]
+
+    def _enforce_limit(self) -> None:
+        """Décharge sur disque les textes les plus anciens au-delà de la limite mémoire."""
+        entries = self._live_entries()
+        excess = sum(entry.compressed_size for entry in entries if entry.in_memory) - self.max_memory_bytes
+        for entry in entries:
+            if excess <= 0:
+                break
+            if entry.in_memory:
+                entry.spill(self.spill_dir)
+                excess -= entry.compressed_size
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Récupère les statistiques du stockage.
+
+        Returns:
+            Dict[str, Any]: Nombre de textes, taille d'origine, taille compressée en mémoire et sur disque
+        """
+        entries = self._live_entries()
+        return {
+            'entries': len(entries),
+            'raw_chars': sum(entry.length for entry in entries),
+            'memory_bytes': sum(entry.compressed_size for entry in entries if entry.in_memory),
+            'spilled_bytes': sum(entry.compressed_size for entry in entries if not entry.in_memory)
+        }
+
+def get_session_text_store() -> SessionTextStore:
+    """
+    Obtient le stockage compressé de la session courante.
+
+    Returns:
+        SessionTextStore: Le stockage de la session
+    """
+    if 'text_store' not in st.session_state:
+        st.session_state.text_store = SessionTextStore()
+    return st.session_state.text_store
+
+def _deep_size(obj: Any, seen: set) -> int:
+    """
+    Estime la mémoire occupée par un objet et ce qu'il contient.
+
+    Args:
+        obj: L'objet à mesurer
+        seen: Identifiants des objets déjà comptés
+
+    Returns:
+        int: La taille estimée en octets
+    """
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, CompressedText):
+        return size + (obj.compressed_size if obj.in_memory else 0)
+    if isinstance(obj, (str, bytes, int, float, bool)) or obj is None:
+        return size
+    if isinstance(obj, SessionTextStore):
+        return size
+    if isinstance(obj, dict):
+        return size + sum(_deep_size(key, seen) + _deep_size(value, seen) for key, value in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset, deque)):
+        return size + sum(_deep_size(item, seen) for item in obj)
+
+    for slot in getattr(type(obj), '__slots__', ()):
+        if slot != '__weakref__' and hasattr(obj, slot):
+            size += _deep_size(getattr(obj, slot), seen)
+    if hasattr(obj, '__dict__'):
+        size += _deep_size(vars(obj), seen)
+    return size
+
+def measure_session_memory() -> Dict[str, int]:
+    """
+    Estime la mémoire occupée par chaque entrée de l'état de session.
+
+    Returns:
+        Dict[str, int]: Taille estimée en octets par clé, de la plus grande à la plus petite
+    """
+    seen = set()
+    sizes = {}
+    for key, value in st.session_state.items():
+        try:
+            sizes[key] = _deep_size(value, seen)
+        except RecursionError:
+            sizes[key] = sys.getsizeof(value)
+    return dict(sorted(sizes.items(), key=lambda item: item[1], reverse=True))
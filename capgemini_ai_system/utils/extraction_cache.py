@@ -0,0 +1,203 @@
+"""
+Cache disque des textes extraits, partagé entre les sessions et les processus.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, Any, Optional, Tuple
+
+from config.settings import EXTRACTION_CACHE_DIR, EXTRACTION_CACHE_MAX_BYTES
+
+class ExtractionCache:
+    """
+    Cache des textes extraits, indexé par le SHA-256 du fichier et le mode d'extraction.
+    Stocké dans une base SQLite (mode WAL) pour supporter les accès concurrents
+    de plusieurs processus, avec une éviction LRU bornée en taille.
+    """
+
+    def __init__(self, cache_dir: str = EXTRACTION_CACHE_DIR, max_bytes: int = EXTRACTION_CACHE_MAX_BYTES):
+        """
+        Initialise le cache d'extraction.
+
+        Args:
+            cache_dir: Répertoire du cache
+            max_bytes: Taille maximale du cache en octets
+        """
+        self.max_bytes = max_bytes
+        self.db_path = os.path.join(cache_dir, "extraction_cache.sqlite3")
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(cache_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    content TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL,
+                    metadata TEXT
+                )
+                """
+            )
+            # Bases créées avant l'ajout des métadonnées (statistiques de nettoyage)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(entries)")}
+            if "metadata" not in columns:
+                conn.execute("ALTER TABLE entries ADD COLUMN metadata TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access)")
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Ouvre une connexion à la base du cache.
+
+        Returns:
+            sqlite3.Connection: La connexion ouverte
+        """
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    @staticmethod
+    def make_key(file_bytes: bytes, mode: str) -> str:
+        """
+        Calcule la clé de cache d'un fichier.
+
+        Args:
+            file_bytes: Contenu brut du fichier
+            mode: Mode d'extraction (ex: 'pdf', 'pdf-ocr', 'text')
+
+        Returns:
+            str: La clé de cache
+        """
+        return f"{hashlib.sha256(file_bytes).hexdigest()}:{mode}"
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Récupère un texte extrait depuis le cache.
+
+        Args:
+            key: La clé de cache
+
+        Returns:
+            Optional[str]: Le texte extrait, ou None en cas d'absence
+        """
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Récupère un texte extrait et les métadonnées enregistrées avec lui.
+
+        Args:
+            key: La clé de cache
+
+        Returns:
+            Optional[Tuple[str, Dict[str, Any]]]: Le texte extrait et ses métadonnées, ou None en cas d'absence
+        """
+        try:
+            with self._connect() as conn:
+                row = conn.execute("SELECT content, metadata FROM entries WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+        except sqlite3.Error as e:
+            print(f"Erreur de lecture du cache d'extraction: {str(e)}")
+            row = None
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if row is None:
+            return None
+        return row[0], json.loads(row[1]) if row[1] else {}
+
+    def put(self, key: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Enregistre un texte extrait dans le cache et applique l'éviction LRU.
+
+        Args:
+            key: La clé de cache
+            content: Le texte extrait
+            metadata: Données associées au texte (statistiques de nettoyage...)
+        """
+        size = len(content.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+
+        try:
+            with self._connect() as conn:
+                # Verrou d'écriture immédiat pour sérialiser l'éviction entre processus
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, content, size, last_access, metadata) VALUES (?, ?, ?, ?, ?)",
+                    (key, content, size, time.time(), json.dumps(metadata) if metadata else None)
+                )
+                self._evict(conn)
+        except sqlite3.Error as e:
+            print(f"Erreur d'écriture dans le cache d'extraction: {str(e)}")
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """
+        Supprime les entrées les moins récemment utilisées au-delà de la taille maximale.
+
+        Args:
+            conn: Connexion avec une transaction d'écriture ouverte
+        """
+        total_size = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        excess = total_size - self.max_bytes
+        if excess <= 0:
+            return
+
+        to_delete = []
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_access"):
+            to_delete.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+
+        conn.executemany("DELETE FROM entries WHERE key = ?", to_delete)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Récupère les statistiques du cache.
+
+        Returns:
+            Dict[str, Any]: Succès, échecs, taux de succès, nombre d'entrées et taille
+        """
+        try:
+            with self._connect() as conn:
+                entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        except sqlite3.Error:
+            entries, size = 0, 0
+
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': entries,
+            'size_bytes': size
+        }
+
+_extraction_cache = None
+_extraction_cache_lock = threading.Lock()
+
+def get_extraction_cache() -> ExtractionCache:
+    """
+    Obtient l'instance du cache d'extraction partagée par le processus.
+
+    Returns:
+        ExtractionCache: L'instance du cache
+    """
+    global _extraction_cache
+    with _extraction_cache_lock:
+        if _extraction_cache is None:
+            _extraction_cache = ExtractionCache()
+        return _extraction_cache
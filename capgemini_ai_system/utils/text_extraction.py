@@ -8,6 +8,32 @@ from PyPDF2 import PdfReader
 from typing import List, Dict, Any, Optional, Tuple, BinaryIO
 import streamlit as st
 
+from utils.extraction_cache import get_extraction_cache
+from utils.text_normalization import normalize_extracted_text
+
+# Séparateur inséré entre les pages des PDF (saut de page), pour retrouver les numéros de page
+PAGE_SEPARATOR = "\n\f\n"
+
+# Version du format des textes extraits, à incrémenter quand il change pour invalider le cache
+EXTRACTION_FORMAT_VERSION = 4
+
+def get_page_offsets(text: str) -> List[int]:
+    """
+    Calcule la position de début de chaque page d'un texte extrait.
+    
+    Args:
+        text: Le texte extrait
+        
+    Returns:
+        List[int]: Les positions de début de page (une seule page pour les fichiers texte)
+    """
+    offsets = [0]
+    position = text.find(PAGE_SEPARATOR)
+    while position != -1:
+        offsets.append(position + len(PAGE_SEPARATOR))
+        position = text.find(PAGE_SEPARATOR, offsets[-1])
+    return offsets
+
 def extract_text_from_pdf(file_object: BinaryIO, use_ocr: bool = False) -> str:
     """
     Extrait le texte d'un fichier PDF.
@@ -24,29 +50,30 @@ def extract_text_from_pdf(file_object: BinaryIO, use_ocr: bool = False) -> str:
             # Utiliser PyMuPDF avec OCR
             file_content = file_object.read()
             pdf_document = fitz.open(stream=file_content, filetype="pdf")
-            text = ""
+            pages = []
             for page_num in range(pdf_document.page_count):
                 page = pdf_document.load_page(page_num)
-                text += page.get_text()
-            return text
+                pages.append(page.get_text())
+            return PAGE_SEPARATOR.join(pages)
         else:
             # Utiliser PyPDF2 pour l'extraction standard
             reader = PdfReader(file_object)
-            text = ""
+            pages = []
             for page in reader.pages:
-                page_text = page.extract_text()
-                if page_text:  # Vérifier que l'extraction a fonctionné
-                    text += page_text + "\n"
+                # Conserver les pages vides pour que la numérotation reste exacte
+                pages.append(page.extract_text() or "")
+            text = PAGE_SEPARATOR.join(pages)
             
             # Si PyPDF2 n'a pas pu extraire de texte, essayer PyMuPDF
             if not text.strip():
                 file_object.seek(0)  # Réinitialiser la position dans le fichier
                 file_content = file_object.read()
                 pdf_document = fitz.open(stream=file_content, filetype="pdf")
-                text = ""
+                pages = []
                 for page_num in range(pdf_document.page_count):
                     page = pdf_document.load_page(page_num)
-                    text += page.get_text()
+                    pages.append(page.get_text())
+                text = PAGE_SEPARATOR.join(pages)
             
             return text
     except Exception as e:
@@ -75,6 +102,20 @@ def extract_text_from_text_file(file_object: BinaryIO) -> str:
         st.error(f"Erreur lors de la lecture du fichier texte: {str(e)}")
         return f"Erreur de lecture: {str(e)}"
 
+def record_normalization_stats(stats: Dict[str, int]) -> None:
+    """
+    Cumule dans la session les statistiques de nettoyage des textes extraits.
+    
+    Args:
+        stats: Statistiques d'un texte nettoyé (voir utils.text_normalization.normalize_extracted_text)
+    """
+    totals = st.session_state.setdefault('normalization_stats', {
+        'documents': 0, 'original_chars': 0, 'saved_chars': 0, 'repeated_lines': 0, 'page_numbers': 0
+    })
+    totals['documents'] += 1
+    for key, value in stats.items():
+        totals[key] = totals.get(key, 0) + value
+
 def extract_text_from_file(uploaded_file: Any, use_ocr: bool = False) -> Tuple[str, str]:
     """
     Extrait le texte d'un fichier téléchargé, quel que soit son type.
@@ -94,12 +135,38 @@ def extract_text_from_file(uploaded_file: Any, use_ocr: bool = False) -> Tuple[s
     
     try:
         if file_type == "application/pdf":
-            extracted_text = extract_text_from_pdf(uploaded_file, use_ocr)
+            mode = "pdf-ocr" if use_ocr else "pdf"
         elif file_type == "text/plain":
-            extracted_text = extract_text_from_text_file(uploaded_file)
+            mode = "text"
         else:
-            extracted_text = f"Type de fichier non pris en charge: {file_type}"
             st.warning(f"Le type de fichier {file_type} n'est pas pris en charge pour l'extraction de texte.")
+            return f"Type de fichier non pris en charge: {file_type}", file_name
+        
+        # Un fichier déjà extrait (même contenu, même mode) n'est pas ré-analysé
+        cache = get_extraction_cache()
+        cache_key = cache.make_key(uploaded_file.getvalue(), f"{mode}-v{EXTRACTION_FORMAT_VERSION}")
+        cached = cache.get_entry(cache_key)
+        if cached is not None:
+            cached_text, metadata = cached
+            # Les statistiques de nettoyage sont conservées avec le texte : un fichier déjà extrait les compte aussi
+            if 'normalization' in metadata:
+                record_normalization_stats(metadata['normalization'])
+            return cached_text, file_name
+        
+        metadata = {}
+        if mode == "text":
+            extracted_text = extract_text_from_text_file(uploaded_file)
+        else:
+            extracted_text = extract_text_from_pdf(uploaded_file, use_ocr)
+            if not extracted_text.startswith("Erreur"):
+                # En-têtes, pieds de page et espaces superflus sont retirés une fois pour toutes avant la mise en cache
+                extracted_text, stats = normalize_extracted_text(extracted_text, PAGE_SEPARATOR)
+                record_normalization_stats(stats)
+                metadata['normalization'] = stats
+        
+        # Ne pas mettre en cache les erreurs d'extraction
+        if not extracted_text.startswith("Erreur"):
+            cache.put(cache_key, extracted_text, metadata)
         
         return extracted_text, file_name
     except Exception as e:
@@ -0,0 +1,183 @@
+"""
+Nettoyage des textes extraits des PDF : en-têtes et pieds de page répétés, numéros de page,
+césures et espaces superflus. Toutes les étapes sont linéaires en la taille du texte.
+"""
+
+import re
+from collections import Counter
+from typing import List, Dict, Tuple
+
+# Nombre de lignes non vides examinées en haut et en bas de chaque page
+EDGE_LINES = 3
+# Part minimale des pages sur lesquelles une ligne doit se répéter pour être un en-tête ou un pied de page
+REPEATED_LINE_MIN_RATIO = 0.5
+REPEATED_LINE_MIN_PAGES = 3
+
+PAGE_NUMBER_PATTERN = re.compile(
+    r'^[\s\-–—]*(?:page|p\.)?\s*\d{1,4}(?:\s*(?:/|sur|of)\s*\d{1,4})?[\s\-–—]*$',
+    re.IGNORECASE
+)
+# Numéro de page explicite ("Page 3", "p. 3", "3 / 12") ; un nombre seul sur sa ligne (année,
+# numéro de clause) n'est un numéro de page que s'il se suit d'une page à l'autre
+EXPLICIT_PAGE_NUMBER_PATTERN = re.compile(r'page|p\.|\d\s*(?:/|sur|of)\s*\d', re.IGNORECASE)
+HYPHENATION_PATTERN = re.compile(r'(\w)-[ \t]*\n[ \t]*(?=[a-zà-ÿ])')
+SPACES_PATTERN = re.compile(r'[ \t ]+')
+TRAILING_SPACES_PATTERN = re.compile(r' *\n *')
+BLANK_LINES_PATTERN = re.compile(r'\n{3,}')
+DIGITS_PATTERN = re.compile(r'\d+')
+# Un en-tête d'article en haut de page n'est jamais un en-tête répété, même numéroté différemment
+CLAUSE_KEY_PATTERN = re.compile(r'^(?:article|clause|section|chapitre|titre|annexe) #')
+
+def _line_key(line: str, ignore_digits: bool = False) -> str:
+    """
+    Normalise une ligne pour reconnaître un en-tête ou pied de page répété.
+
+    Args:
+        line: La ligne
+        ignore_digits: Ignorer les chiffres (en-têtes numérotés, "Page 3 / 12")
+
+    Returns:
+        str: La ligne sans casse ni espaces superflus (ni chiffres si demandé)
+    """
+    key = " ".join(line.lower().split())
+    return DIGITS_PATTERN.sub("#", key) if ignore_digits else key
+
+def _outer_indices(indices: List[int]) -> set:
+    """
+    Renvoie la première et la dernière ligne non vide d'une page.
+
+    Args:
+        indices: Les indices des lignes de bord
+
+    Returns:
+        set: Les indices des deux lignes extrêmes
+    """
+    return {indices[0], indices[-1]} if indices else set()
+
+def _page_keys(lines: List[str], indices: List[int]) -> Dict[int, set]:
+    """
+    Calcule les clés de comparaison des lignes de bord d'une page.
+    Les chiffres ne sont ignorés que pour les lignes extrêmes, afin de ne pas confondre
+    un paragraphe du corps avec un en-tête numéroté, et jamais pour un nombre seul
+    (voir _sequential_page_numbers).
+
+    Args:
+        lines: Les lignes de la page
+        indices: Les indices des lignes de bord
+
+    Returns:
+        Dict[int, set]: Les clés de chaque ligne de bord
+    """
+    outer = _outer_indices(indices)
+    return {
+        i: {_line_key(lines[i]), _line_key(lines[i], ignore_digits=True)}
+        if i in outer and not PAGE_NUMBER_PATTERN.match(lines[i]) else {_line_key(lines[i])}
+        for i in indices
+    }
+
+def _edge_indices(lines: List[str]) -> List[int]:
+    """
+    Repère les premières et dernières lignes non vides d'une page.
+
+    Args:
+        lines: Les lignes de la page
+
+    Returns:
+        List[int]: Les indices des lignes de bord
+    """
+    non_empty = [i for i, line in enumerate(lines) if line.strip()]
+    return sorted(set(non_empty[:EDGE_LINES] + non_empty[-EDGE_LINES:]))
+
+def _sequential_page_numbers(pages: List[List[str]], edges: List[List[int]]) -> List[set]:
+    """
+    Repère les numéros de page : lignes de bord au format d'un numéro de page, explicites
+    ("Page 3", "3 / 12") ou dont le nombre se suit d'une page à l'autre au même endroit
+    (haut ou bas de page). Un nombre isolé ("2024", numéro de clause) est conservé.
+
+    Args:
+        pages: Les lignes de chaque page
+        edges: Les indices des lignes de bord de chaque page
+
+    Returns:
+        List[set]: Pour chaque page, les indices des lignes à retirer
+    """
+    candidates = []
+    for lines, indices in zip(pages, edges):
+        page_candidates = {}
+        for i in indices:
+            if PAGE_NUMBER_PATTERN.match(lines[i]):
+                position = "top" if i < len(lines) / 2 else "bottom"
+                page_candidates[i] = (position, int(DIGITS_PATTERN.search(lines[i]).group()))
+        candidates.append(page_candidates)
+
+    page_numbers = []
+    for page, page_candidates in enumerate(candidates):
+        previous = set(candidates[page - 1].values()) if page > 0 else set()
+        following = set(candidates[page + 1].values()) if page + 1 < len(candidates) else set()
+        page_numbers.append({
+            i for i, (position, number) in page_candidates.items()
+            if EXPLICIT_PAGE_NUMBER_PATTERN.search(pages[page][i])
+            or (position, number - 1) in previous
+            or (position, number + 1) in following
+        })
+    return page_numbers
+
+def normalize_extracted_text(text: str, page_separator: str) -> Tuple[str, Dict[str, int]]:
+    """
+    Nettoie le texte extrait d'un PDF en conservant ses sauts de page.
+
+    Args:
+        text: Le texte extrait
+        page_separator: Le séparateur des pages (voir utils.text_extraction.PAGE_SEPARATOR)
+
+    Returns:
+        Tuple[str, Dict[str, int]]: Le texte nettoyé et les statistiques (taille d'origine,
+        caractères supprimés, lignes répétées et numéros de page retirés)
+    """
+    pages = [page.split("\n") for page in text.split(page_separator)]
+
+    edges = [_edge_indices(lines) for lines in pages]
+    keys = [_page_keys(lines, indices) for lines, indices in zip(pages, edges)]
+    numbered = _sequential_page_numbers(pages, edges)
+
+    # 1. Lignes répétées en haut ou en bas de nombreuses pages (en-têtes, pieds de page)
+    repeated = set()
+    if len(pages) >= REPEATED_LINE_MIN_PAGES:
+        counts = Counter(key for page_keys in keys for key in set().union(*page_keys.values()))
+        min_pages = max(REPEATED_LINE_MIN_PAGES, int(len(pages) * REPEATED_LINE_MIN_RATIO))
+        repeated = {
+            key for key, count in counts.items()
+            if count >= min_pages and not CLAUSE_KEY_PATTERN.match(key)
+        }
+
+    # Seules les lignes de bord sont retirées : le corps des pages reste intact
+    removed_lines = 0
+    page_numbers = 0
+    cleaned_pages = []
+    for lines, page_keys, page_numbered in zip(pages, keys, numbered):
+        dropped = set()
+        for i, line_keys in page_keys.items():
+            if line_keys & repeated:
+                dropped.add(i)
+                removed_lines += 1
+            elif i in page_numbered:
+                dropped.add(i)
+                page_numbers += 1
+        page = "\n".join(line for i, line in enumerate(lines) if i not in dropped)
+
+        # 2. Mots coupés en fin de ligne ("résilia-\ntion" -> "résiliation")
+        page = HYPHENATION_PATTERN.sub(r'\1', page)
+
+        # 3. Espaces superflus et lignes vides répétées
+        page = SPACES_PATTERN.sub(" ", page)
+        page = TRAILING_SPACES_PATTERN.sub("\n", page)
+        page = BLANK_LINES_PATTERN.sub("\n\n", page).strip()
+        cleaned_pages.append(page)
+
+    cleaned = page_separator.join(cleaned_pages)
+    return cleaned, {
+        'original_chars': len(text),
+        'saved_chars': len(text) - len(cleaned),
+        'repeated_lines': removed_lines,
+        'page_numbers': page_numbers
+    }
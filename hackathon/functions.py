@@ -384,6 +384,30 @@ async def run_orchestrated_workflow(query):
     except Exception as e:
         return {"error": f"Erreur lors de l'exécution du workflow: {str(e)}"}
 
+# Transmission entre agents du pipeline séquentiel : "full" (réponse complète),
+# "extract" (titres, listes, tableaux, lignes chiffrées) ou "summary" (première phrase de chaque paragraphe)
+HANDOFF_POLICY = os.environ.get("HANDOFF_POLICY", "summary")
+HANDOFF_MAX_CHARS = 1600
+
+def build_handoff(response, policy=HANDOFF_POLICY):
+    """
+    Construit la partie de la réponse d'un agent transmise à l'agent suivant, plafonnée à HANDOFF_MAX_CHARS
+    """
+    if policy == "full":
+        return response
+    
+    paragraphs = [p.strip() for p in re.split(r'\n\s*\n', response) if p.strip()]
+    lines = []
+    if policy == "extract":
+        lines = [line.rstrip() for line in response.splitlines() if re.search(r'^\s*(#|[-*•]\s|\d+[.)]\s|\|)|\d', line)]
+    if not lines:
+        lines = [re.split(r'(?<=[.!?])\s', " ".join(p.split()), maxsplit=1)[0] for p in paragraphs]
+    
+    handoff = "\n".join(lines)
+    if len(handoff) > HANDOFF_MAX_CHARS:
+        handoff = handoff[:HANDOFF_MAX_CHARS] + "..."
+    return handoff
+
 # Fonction pour exécuter un pipeline séquentiel
 async def run_sequential_pipeline(query):
     """
@@ -398,9 +422,12 @@ async def run_sequential_pipeline(query):
                 return {"error": "Aucune séquence d'agents définie. Veuillez définir une séquence dans la barre latérale."}
 
             responses = {}
+            # Taille du prompt de chaque étape, dans l'ordre : un agent peut apparaître plusieurs fois
+            hop_prompt_chars = []
             current_input = query
 
             for i, agent_key in enumerate(sequence):
+                hop_prompt_chars.append((agent_key, len(current_input)))
                 try:
                     agent_info = AGENTS[agent_key]
                     st.session_state.progress_text = f"{agent_info['icon']} {agent_info['name']}: Traitement en cours..."
@@ -414,7 +441,7 @@ async def run_sequential_pipeline(query):
                     )
 
                     responses[agent_key] = response
-                    current_input = f"Tenant compte de la réponse précédente: {response}\n\nQuestion initiale: {query}"
+                    current_input = f"Tenant compte de la réponse précédente: {build_handoff(response)}\n\nQuestion initiale: {query}"
                 
                 except Exception as agent_error:
                     error_message = f"Erreur: {str(agent_error)}"
@@ -432,6 +459,7 @@ async def run_sequential_pipeline(query):
                 "agent_name": "Multi-Agent Séquentiel",
                 "agent_icon": "🔄",
                 "combined": combined_response,
+                "hop_prompt_chars": hop_prompt_chars,
                 **responses
             }
 
@@ -560,12 +588,52 @@ def prompt_constructor(user_input, ocr):
         
     # Ajout d'un résumé de l'historique pour maintenir le contexte
     if "messages" in st.session_state and len(st.session_state.messages) > 0:
-        context = "Voici l'historique de notre conversation :\n"
-        for msg in st.session_state.messages[-5:]:  # Utiliser les 5 derniers messages
-            role = "Utilisateur" if msg["role"] == "user" else "Assistant"
-            content = msg["content"]
-            context += f"{role}: {content}\n"
-        
+        context = build_history_context()
         user_prompt = f"{context}\n\nNouvelle demande: {user_prompt}"
     
-    return user_prompt
\ No newline at end of file
+    return user_prompt
+
+# Compactage de l'historique : les derniers messages sont repris tels quels (tronqués),
+# les plus anciens sont intégrés une seule fois à un résumé courant de taille plafonnée
+HISTORY_RECENT_MESSAGES = 4
+HISTORY_MESSAGE_MAX_CHARS = 4000
+HISTORY_SUMMARY_MAX_CHARS = int(os.environ.get("HISTORY_SUMMARY_MAX_TOKENS", 500)) * 4
+
+def update_history_summary():
+    """
+    Intègre au résumé courant les messages sortis des derniers messages repris tels quels.
+    Chaque message n'est résumé qu'une fois, par sa première phrase.
+    """
+    messages = st.session_state.messages
+    summarized = st.session_state.get("history_summarized_count", 0)
+    older_count = len(messages) - HISTORY_RECENT_MESSAGES
+    if older_count <= summarized:
+        return
+    
+    summary = st.session_state.get("history_summary", "")
+    for msg in messages[summarized:older_count]:
+        role = "Utilisateur" if msg["role"] == "user" else "Assistant"
+        first_sentence = re.split(r'(?<=[.!?])\s', " ".join(str(msg["content"]).split()), maxsplit=1)[0]
+        summary += f"{role}: {first_sentence[:200]}\n"
+    
+    st.session_state.history_summary = summary[-HISTORY_SUMMARY_MAX_CHARS:]
+    st.session_state.history_summarized_count = older_count
+
+def build_history_context():
+    """
+    Construit le contexte de la conversation : résumé des échanges anciens, puis derniers messages.
+    """
+    update_history_summary()
+    
+    context = "Voici l'historique de notre conversation :\n"
+    summary = st.session_state.get("history_summary", "")
+    if summary:
+        context += f"Résumé des échanges plus anciens:\n{summary}\n"
+    for msg in st.session_state.messages[-HISTORY_RECENT_MESSAGES:]:
+        role = "Utilisateur" if msg["role"] == "user" else "Assistant"
+        content = str(msg["content"])
+        if len(content) > HISTORY_MESSAGE_MAX_CHARS:
+            content = content[:HISTORY_MESSAGE_MAX_CHARS] + "..."
+        context += f"{role}: {content}\n"
+    
+    return context
\ No newline at end of file
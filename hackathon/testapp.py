@@ -197,6 +197,8 @@ with st.sidebar:
 
     if st.button("🔄 Réinitialiser la conversation", help="Effacer l'historique de conversation"):
         st.session_state.messages = []
+        st.session_state.history_summary = ""
+        st.session_state.history_summarized_count = 0
         st.session_state.current_results = None
         st.session_state.agent_sequence = []
         st.session_state.selected_agents = []
@@ -350,6 +352,14 @@ with main_container:
                             <div class="router-response">{result.get("router_response", "Non disponible")}</div>
                         </div>
                         """, unsafe_allow_html=True)
+                    
+                    if st.session_state.debug_mode and "hop_prompt_chars" in result:
+                        hops = " → ".join(f"{agent}: {chars} car." for agent, chars in result["hop_prompt_chars"])
+                        st.markdown(f"""
+                        <div class="debug-info">
+                            <b>Prompts par étape:</b> {hops}
+                        </div>
+                        """, unsafe_allow_html=True)
 
                     message_data = {
                         "role": "assistant",